@@ -0,0 +1,34 @@
+"""
+API-only settings for deployments that serve nothing but /api/tasks/.
+
+The task endpoints are stateless JSON views (csrf_exempt, no login), so
+this profile drops the admin, auth, sessions, messages and static files
+apps along with their middleware, templates and context processors. Fewer
+apps means less work in django.setup() when a worker starts, and every
+request skips the session, CSRF, auth, messages and clickjacking
+middleware.
+
+Use it with DJANGO_SETTINGS_MODULE=backend.settings_api.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'corsheaders',
+    'tasks',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'backend.urls_api'
+
+# No HTML is rendered and nobody logs in
+TEMPLATES = []
+AUTH_PASSWORD_VALIDATORS = []
+
+# Error messages are English only; skips loading translation catalogs
+USE_I18N = False
@@ -0,0 +1,6 @@
+"""URL configuration for backend.settings_api: the task API and nothing else."""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/tasks/', include('tasks.urls')),
+]
@@ -0,0 +1,145 @@
+"""
+Compare the sync and async scoring views under concurrent ASGI load.
+
+Usage:
+    python -m benchmarks.bench_async --requests 2000 --concurrency 32
+
+Drives Django's ASGI application in-process (no network, no server) with
+a mix of small /analyze/ payloads and occasional large ones, once with the
+sync views and once with tasks.async_views, and prints throughput plus
+p50/p99 latency of the small requests as JSON. Large payloads are where the
+sync path hurts: Django runs sync views on one shared thread under ASGI, so
+small requests queue behind them.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+
+def install_urlconf(name, scoring_views):
+    # A throwaway ROOT_URLCONF mounting one flavour of the scoring views
+    from django.urls import path
+    module = types.ModuleType(name)
+    module.urlpatterns = [path('api/tasks/analyze/', scoring_views.analyze_tasks)]
+    sys.modules[name] = module
+    return name
+
+
+async def post(application, body):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': '/api/tasks/analyze/',
+        'raw_path': b'/api/tasks/analyze/',
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('127.0.0.1', 8000),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+async def run_load(application, small_body, large_body, requests, concurrency, large_every):
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for number in counter:
+            large = large_every and number % large_every == large_every - 1
+            started = time.perf_counter()
+            status = await post(application, large_body if large else small_body)
+            if status != 200:
+                raise RuntimeError(f'Unexpected status {status}')
+            if not large:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests_per_second': round(requests / elapsed, 1),
+        'small_p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'small_p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--small-tasks', type=int, default=20)
+    parser.add_argument('--large-tasks', type=int, default=5000)
+    parser.add_argument('--large-every', type=int, default=50,
+                        help='send a large payload as every Nth request (0 for none)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    # Every request must be scored, not answered from the result cache
+    settings.TASKS_RESULT_CACHE_MAX_BYTES = 0
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+    django.setup()
+
+    from django.core.asgi import get_asgi_application
+    from django.urls import clear_url_caches
+    from benchmarks.generator import generate_payload
+    from tasks import async_views, views
+
+    small_body = json.dumps({'tasks': generate_payload(args.small_tasks, args.seed)}).encode()
+    large_body = json.dumps({'tasks': generate_payload(args.large_tasks, args.seed)}).encode()
+
+    results = {}
+    for name, scoring_views in (('sync', views), ('async', async_views)):
+        settings.ROOT_URLCONF = install_urlconf(f'bench_{name}_urls', scoring_views)
+        clear_url_caches()
+        application = get_asgi_application()
+        results[name] = asyncio.run(run_load(
+            application, small_body, large_body, args.requests, args.concurrency, args.large_every
+        ))
+
+    print(json.dumps({
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'small_tasks': args.small_tasks,
+        'large_tasks': args.large_tasks,
+        'large_every': args.large_every,
+        **results
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare a one-task delta update with re-scoring the whole list.
+
+Usage:
+    python -m benchmarks.bench_delta --sizes 1000,10000,100000
+
+For each size, scores a seeded synthetic list (benchmarks/generator.py)
+into a snapshot, then times single-task edits applied with
+tasks.deltas (one task added, one modified, one removed) against a full
+validate-and-score of the same list. Prints the median times as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+EDITS = 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma-separated task counts')
+    parser.add_argument('--edits', type=int, default=EDITS, help='timed edits of each kind per size')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from benchmarks.generator import generate_payload
+    from tasks import deltas
+    from tasks.records import TaskRecord
+    from tasks.scoring import ScoringContext, score_tasks
+    from tasks.snapshots import Snapshot
+    from tasks.validation import TaskBatchValidator
+
+    context = ScoringContext()
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        payload = generate_payload(size)
+
+        def full_rescore():
+            fields, _ = TaskBatchValidator(context.today).validate(payload)
+            return score_tasks([TaskRecord(id=idx + 1, **item) for idx, item in enumerate(fields)], context)
+
+        started = time.perf_counter()
+        ranked = full_rescore()
+        full_s = time.perf_counter() - started
+
+        snapshot = Snapshot('bench', ranked, context, False, 'priority', 'direct', None)
+        started = time.perf_counter()
+        deltas.prepare(snapshot)
+        prepare_s = time.perf_counter() - started
+
+        timings = {'added': [], 'modified': [], 'removed': []}
+        for edit in range(args.edits):
+            task_id = edit + 1
+            for kind, delta in (
+                ('added', {'added': [payload[edit]]}),
+                ('modified', {'modified': [{'id': task_id, **payload[-edit - 1]}]}),
+                ('removed', {'removed': [task_id]}),
+            ):
+                started = time.perf_counter()
+                deltas.apply_delta(snapshot, *deltas.parse_delta(snapshot, delta))
+                timings[kind].append(time.perf_counter() - started)
+
+        results[size] = {
+            'full_rescore_ms': round(full_s * 1000, 2),
+            'first_delta_prepare_ms': round(prepare_s * 1000, 2),
+            **{
+                f'{kind}_delta_us': round(statistics.median(durations) * 1e6, 1)
+                for kind, durations in timings.items()
+            },
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure bulk import throughput (rows/sec) on a fresh SQLite database.
+
+Usage:
+    python -m benchmarks.bench_import --rows 1000000
+
+Generates a synthetic JSONL backlog with explicit ids and dependencies,
+migrates a throwaway SQLite file and runs the import_tasks command on it.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+
+def write_backlog(path, rows, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    with open(path, 'w', encoding='utf-8') as out:
+        for task_id in range(1, rows + 1):
+            dependencies = [rng.randint(1, rows) for _ in range(rng.choice((0, 0, 1, 2)))]
+            out.write(json.dumps({
+                'id': task_id,
+                'title': f'Task {task_id}',
+                'due_date': (today + timedelta(days=rng.randint(-5, 90))).isoformat(),
+                'estimated_hours': rng.choice((0.5, 1, 2, 4, 8, 16, 40)),
+                'importance': rng.randint(1, 10),
+                'dependencies': dependencies
+            }))
+            out.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Point the default database at a scratch file before any connection opens
+        settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        django.setup()
+        from django.core.management import call_command
+        from tasks.models import Task
+
+        call_command('migrate', verbosity=0)
+
+        backlog = os.path.join(workdir, 'backlog.jsonl')
+        write_backlog(backlog, args.rows, args.seed)
+
+        options = {'verbosity': 0}
+        if args.batch_size:
+            options['batch_size'] = args.batch_size
+        started = time.perf_counter()
+        call_command('import_tasks', backlog, **options)
+        elapsed = time.perf_counter() - started
+
+        stored = Task.objects.count()
+        print(json.dumps({
+            'rows': stored,
+            'seconds': round(elapsed, 2),
+            'rows_per_second': round(stored / elapsed, 1)
+        }))
+
+
+if __name__ == '__main__':
+    main()
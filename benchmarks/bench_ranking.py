@@ -0,0 +1,78 @@
+"""
+Compare ranked reads from the in-memory index with ORDER BY queries.
+
+Usage:
+    python -m benchmarks.bench_ranking --rows 100000
+
+Imports a synthetic backlog into a throwaway SQLite file, then times
+top-k reads of the ranked backlog through the ORM and through
+tasks.ranking, plus the index's first load and rank-of lookups. Prints
+the median times as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+REPEATS = 200
+
+
+def median_us(func, repeats):
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return round(statistics.median(durations) * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=20, help='tasks per top-k read')
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    from benchmarks.bench_import import write_backlog
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        settings.TASKS_RANKED_INDEX_MAX_TASKS = max(args.rows, 1)
+        django.setup()
+        from django.core.management import call_command
+        from tasks.models import Task
+        from tasks.ranking import get_ranked_index
+
+        call_command('migrate', verbosity=0)
+        backlog = os.path.join(workdir, 'backlog.jsonl')
+        write_backlog(backlog, args.rows, seed=42)
+        call_command('import_tasks', backlog, verbosity=0)
+
+        index = get_ranked_index()
+        started = time.perf_counter()
+        index.top(1)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        task_ids = list(Task.objects.values_list('id', flat=True)[:args.repeats])
+        lookups = iter(task_ids * 2)
+        print(json.dumps({
+            'rows': args.rows,
+            'first_load_ms': round(load_ms, 1),
+            'orm_top_k_us': median_us(lambda: list(Task.objects.all()[:args.limit]), args.repeats),
+            'index_top_k_us': median_us(lambda: index.top(args.limit), args.repeats),
+            'index_rank_of_us': median_us(lambda: index.rank_of(next(lookups)), args.repeats),
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
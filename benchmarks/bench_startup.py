@@ -0,0 +1,155 @@
+"""
+Compare worker start-up and per-request overhead of the settings profiles.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5 --requests 2000
+
+Starts a fresh interpreter per run for backend.settings and for the
+API-only backend.settings_api. Each run times django.setup(), the URLconf
+import and building the WSGI application (the cold start a new worker
+pays), counts the modules loaded, then sends requests straight to the WSGI
+handler (no network, result cache disabled). Requests go to
+GET /api/tasks/cache/, which is almost all framework and middleware
+overhead, and to a small POST /api/tasks/analyze/. The medians are
+printed as JSON along with the savings of the API profile.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PROFILES = ('backend.settings', 'backend.settings_api')
+
+
+def wsgi_call(application, method, path, body=b''):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+    }
+    status = []
+    result = application(environ, lambda response_status, headers: status.append(response_status))
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+    if not status[0].startswith('200'):
+        raise RuntimeError(f'{method} {path} returned {status[0]}')
+
+
+def time_requests(application, method, path, body, requests):
+    durations = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        wsgi_call(application, method, path, body)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def child(settings_module, requests, tasks):
+    # Runs in a fresh interpreter; prints one JSON line
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    modules_before = len(sys.modules)
+    started = time.perf_counter()
+
+    import django
+    from django.conf import settings
+
+    # Every request must be scored, not answered from the result cache
+    settings.TASKS_RESULT_CACHE_MAX_BYTES = 0
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['localhost']
+
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    application = get_wsgi_application()
+    get_resolver().url_patterns
+    startup = time.perf_counter() - started
+    modules = len(sys.modules) - modules_before
+
+    from benchmarks.generator import generate_payload
+
+    body = json.dumps({'tasks': generate_payload(tasks)}).encode()
+    # The first request pays one-off costs (lazy imports, caches)
+    started = time.perf_counter()
+    wsgi_call(application, 'POST', '/api/tasks/analyze/', body)
+    first_request = time.perf_counter() - started
+
+    print(json.dumps({
+        'startup_s': startup,
+        'modules': modules,
+        'first_request_s': first_request,
+        'cache_request_s': time_requests(application, 'GET', '/api/tasks/cache/', b'', requests),
+        'analyze_request_s': time_requests(application, 'POST', '/api/tasks/analyze/', body, requests),
+    }))
+
+
+def run_profile(settings_module, runs, requests, tasks):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_startup', '--child', settings_module,
+             '--requests', str(requests), '--tasks', str(tasks)],
+            cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+
+    def median(key, scale):
+        return round(statistics.median(sample[key] for sample in samples) * scale, 2)
+
+    return {
+        'startup_ms': median('startup_s', 1000),
+        'modules_loaded': samples[0]['modules'],
+        'first_request_ms': median('first_request_s', 1000),
+        'cache_request_us': median('cache_request_s', 1e6),
+        'analyze_request_us': median('analyze_request_s', 1e6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per profile')
+    parser.add_argument('--requests', type=int, default=2000, help='timed requests per endpoint and run')
+    parser.add_argument('--tasks', type=int, default=20, help='tasks in the /analyze/ payload')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.requests, args.tasks)
+        return
+
+    results = {profile: run_profile(profile, args.runs, args.requests, args.tasks) for profile in PROFILES}
+    full, api = (results[profile] for profile in PROFILES)
+    print(json.dumps({
+        'runs': args.runs,
+        'requests': args.requests,
+        'tasks': args.tasks,
+        **results,
+        'savings': {
+            key: round(1 - api[key] / full[key], 3)
+            for key in ('startup_ms', 'first_request_ms', 'cache_request_us', 'analyze_request_us')
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
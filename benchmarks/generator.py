@@ -0,0 +1,71 @@
+"""
+Seeded synthetic task lists for the benchmarks.
+
+The same (count, seed, density, spread) always yields the same tasks, so
+timings from different runs and machines compare like for like.
+"""
+import random
+from datetime import date, timedelta
+
+from tasks.records import TaskRecord
+
+# Mean number of dependencies per task
+DENSITIES = {
+    'none': 0.0,
+    'sparse': 0.3,
+    'dense': 4.0,
+}
+
+# Due dates fall between OVERDUE_DAYS days ago and spread days ahead; the
+# wide spread reaches past the precomputed urgency table
+SPREADS = {
+    'near': 14,
+    'wide': 730,
+}
+
+OVERDUE_DAYS = 7
+
+HOURS_CHOICES = (0.5, 1, 2, 3, 4, 8, 12, 16, 24, 40)
+
+
+def generate_payload(count, seed=42, density='sparse', spread='near', today=None):
+    """
+    Return `count` task dicts in the /analyze/ request format.
+
+    Dependencies are 1-based positions anywhere in the list, so dense lists
+    contain cycles and long chains just like real payloads can.
+    """
+    rng = random.Random(f'{seed}:{count}:{density}:{spread}')
+    today = today or date.today()
+    mean_dependencies = DENSITIES[density]
+    horizon = SPREADS[spread]
+    tasks = []
+    for idx in range(count):
+        dependency_count = 0
+        if mean_dependencies:
+            # Geometric-ish spread around the mean: most tasks have few
+            while rng.random() < mean_dependencies / (mean_dependencies + 1):
+                dependency_count += 1
+        tasks.append({
+            'title': f'Task {idx + 1}',
+            'due_date': (today + timedelta(days=rng.randint(-OVERDUE_DAYS, horizon))).isoformat(),
+            'estimated_hours': rng.choice(HOURS_CHOICES),
+            'importance': rng.randint(1, 10),
+            'dependencies': [rng.randint(1, count) for _ in range(dependency_count)]
+        })
+    return tasks
+
+
+def generate_records(count, seed=42, density='sparse', spread='near', today=None):
+    """Return the same tasks as TaskRecords with positional ids."""
+    return [
+        TaskRecord(
+            id=idx + 1,
+            title=task['title'],
+            due_date=date.fromisoformat(task['due_date']),
+            estimated_hours=task['estimated_hours'],
+            importance=task['importance'],
+            dependencies=task['dependencies']
+        )
+        for idx, task in enumerate(generate_payload(count, seed, density, spread, today))
+    ]
@@ -0,0 +1,213 @@
+"""
+Scaling benchmarks for the scoring functions and the API endpoints.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --sizes 1000,10000 --baseline results.json --threshold 0.25
+
+Every case runs on a seeded synthetic task list (benchmarks/generator.py)
+that varies in size, dependency density and due-date spread:
+
+- micro/<function>: each scoring function applied to every task in a list
+- scoring/score_tasks and scoring/top_tasks: the library entry points
+- api/analyze and api/suggest: end to end through the Django test client,
+  with the result cache disabled
+
+Results are written as JSON, with the median and minimum wall time per
+case. With --baseline, each case's median is compared to the same case in
+an earlier results file, and the run exits with status 1 when any case is
+slower by more than --threshold (a fraction; 0.25 means 25%).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.25
+
+# Each case repeats until it has run MIN_REPEATS times and MIN_TIME seconds,
+# or MAX_REPEATS times
+MIN_REPEATS = 3
+MAX_REPEATS = 50
+MIN_TIME = 0.5
+
+
+def measure(function):
+    """Time repeated calls of function; returns the list of durations."""
+    durations = []
+    total = 0.0
+    while len(durations) < MAX_REPEATS and (len(durations) < MIN_REPEATS or total < MIN_TIME):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        durations.append(elapsed)
+        total += elapsed
+    return durations
+
+
+def case_name(kind, size, density, spread):
+    return f'{kind}/n={size}/deps={density}/due={spread}'
+
+
+def micro_cases(size, density, spread):
+    from benchmarks.generator import generate_records
+    from tasks import scoring
+
+    tasks = generate_records(size, density=density, spread=spread)
+    context = scoring.ScoringContext()
+    index = scoring.build_dependents_index(tasks)
+
+    def each(function, **kwargs):
+        return lambda: [function(task, context=context, **kwargs) for task in tasks]
+
+    yield 'micro/urgency', each(scoring.calculate_urgency_score)
+    yield 'micro/importance', each(scoring.calculate_importance_score)
+    yield 'micro/effort', each(scoring.calculate_effort_score)
+    yield 'micro/dependency', each(scoring.calculate_dependency_score, dependents_index=index)
+    yield 'micro/priority', each(scoring.calculate_priority_score, dependents_index=index)
+    yield 'micro/dependents_index', lambda: scoring.build_dependents_index(tasks)
+
+
+def scoring_cases(size, density, spread):
+    from benchmarks.generator import generate_records
+    from tasks import scoring
+
+    tasks = generate_records(size, density=density, spread=spread)
+    context = scoring.ScoringContext()
+
+    yield 'scoring/score_tasks', lambda: scoring.score_tasks(tasks, context)
+    yield 'scoring/top_tasks', lambda: scoring.get_top_tasks_for_today(tasks, 3, context)
+
+
+def api_cases(size, density, spread):
+    from django.test import Client
+    from benchmarks.generator import generate_payload
+
+    client = Client()
+    body = json.dumps({'tasks': generate_payload(size, density=density, spread=spread)})
+
+    def post(path):
+        def call():
+            response = client.post(path, body, content_type='application/json')
+            if response.status_code != 200:
+                raise RuntimeError(f'{path} returned {response.status_code}: {response.content[:200]!r}')
+        return call
+
+    yield 'api/analyze', post('/api/tasks/analyze/')
+    yield 'api/suggest', post('/api/tasks/suggest/')
+
+
+def plan_matrix(sizes):
+    # (builder, size, density, spread): micro cases on the default list,
+    # scoring and API cases across densities, one wide due-date spread
+    for size in sizes:
+        yield micro_cases, size, 'sparse', 'near'
+        for density in ('none', 'sparse', 'dense'):
+            yield scoring_cases, size, density, 'near'
+        yield scoring_cases, size, 'sparse', 'wide'
+        for density in ('sparse', 'dense'):
+            yield api_cases, size, density, 'near'
+
+
+def run(sizes, pattern=None, log=sys.stderr):
+    results = {}
+    for builder, size, density, spread in plan_matrix(sizes):
+        for kind, function in builder(size, density, spread):
+            name = case_name(kind, size, density, spread)
+            if pattern and pattern not in name:
+                continue
+            durations = measure(function)
+            median = statistics.median(durations)
+            results[name] = {
+                'median_s': round(median, 6),
+                'min_s': round(min(durations), 6),
+                'repeats': len(durations),
+                'per_task_ns': round(median / size * 1e9, 1),
+            }
+            print(f'{name:<55} {median * 1000:10.2f} ms', file=log)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline median, median, ratio) for every regressed case."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous['median_s']:
+            continue
+        ratio = result['median_s'] / previous['median_s']
+        if ratio > 1 + threshold:
+            regressions.append((name, previous['median_s'], result['median_s'], ratio))
+    return regressions
+
+
+def environment():
+    import django
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'numpy': numpy_version,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated task counts')
+    parser.add_argument('--filter', default=None, help='only run cases whose name contains this')
+    parser.add_argument('--output', default=None, help='write results JSON here instead of stdout')
+    parser.add_argument('--baseline', default=None, help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown per case as a fraction (default 0.25)')
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    # Every request must be scored, not answered from the result cache
+    settings.TASKS_RESULT_CACHE_MAX_BYTES = 0
+    django.setup()
+    setup_test_environment()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    report = {
+        'environment': environment(),
+        'sizes': sizes,
+        'cases': run(sizes, args.filter),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))['cases']
+        regressions = compare(report['cases'], baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f'REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)',
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f'No case regressed by more than {args.threshold:.0%}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
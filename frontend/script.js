@@ -1,6 +1,9 @@
 // API Base URL
 const API_BASE = 'http://localhost:8000/api/tasks';
 
+// Analyzed tasks fetched per page; later pages come from the server-side snapshot by cursor
+const PAGE_SIZE = 50;
+
 // Task storage
 let tasks = [];
 
@@ -139,21 +142,25 @@ async function analyzeTasks() {
     resultsDiv.innerHTML = '<p class="placeholder">Analyzing tasks...</p>';
 
     try {
+        // Credentials carry a load balancer's sticky-session cookie, so the
+        // later page requests reach the process that holds the snapshot
         const response = await fetch(`${API_BASE}/analyze/`, {
             method: 'POST',
+            credentials: 'include',
             headers: {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
                 tasks: tasks,
-                sort_by: sortBy
+                sort_by: sortBy,
+                page_size: PAGE_SIZE
             })
         });
 
         const data = await response.json();
 
         if (data.status === 'success') {
-            displayResults(data.tasks);
+            displayResults(data);
         } else {
             resultsDiv.innerHTML = `<p style="color: red;">Error: ${data.message}</p>`;
         }
@@ -162,11 +169,57 @@ async function analyzeTasks() {
     }
 }
 
-// Display results
-function displayResults(analyzedTasks) {
+// Expand a columnar analyze response into ranked task objects
+function expandColumnar(data) {
+    const columns = data.columns;
+    const fields = Object.keys(columns);
+
+    return data.order.map(position => {
+        const task = {};
+        fields.forEach(field => {
+            task[field] = columns[field][position];
+        });
+        if (task.recommendation !== null) {
+            task.recommendation = data.recommendations[task.recommendation];
+        }
+        return task;
+    });
+}
+
+// Fetch the next page of an analyze snapshot and append it to the results
+async function loadMoreResults(snapshotId, cursor) {
+    const resultsDiv = document.getElementById('results');
+    document.getElementById('loadMore')?.remove();
+
+    try {
+        const response = await fetch(
+            `${API_BASE}/snapshots/${snapshotId}/?cursor=${encodeURIComponent(cursor)}&page_size=${PAGE_SIZE}`,
+            { credentials: 'include' }
+        );
+        const data = await response.json();
+
+        if (data.status === 'success') {
+            displayResults(data, true);
+        } else if (response.status === 404 || response.status === 421) {
+            // Snapshot expired, or this request reached another server process
+            resultsDiv.insertAdjacentHTML('beforeend',
+                `<p style="color: red;">These results are no longer available. Click Analyze to reload them.</p>`);
+        } else {
+            resultsDiv.insertAdjacentHTML('beforeend', `<p style="color: red;">Error: ${data.message}</p>`);
+        }
+    } catch (error) {
+        resultsDiv.insertAdjacentHTML('beforeend', `<p style="color: red;">Error connecting to server: ${error.message}</p>`);
+    }
+}
+
+// Display results (accepts a task array or an analyze response in either format).
+// Paged responses get a "Load more" button; append adds a page to the current results.
+function displayResults(results, append = false) {
     const resultsDiv = document.getElementById('results');
+    const analyzedTasks = Array.isArray(results) ? results :
+        results.format === 'columnar' ? expandColumnar(results) : results.tasks;
 
-    resultsDiv.innerHTML = analyzedTasks.map(task => {
+    const cards = analyzedTasks.map(task => {
         const priorityClass = task.priority_score > 200 ? 'priority-high' :
             task.priority_score > 150 ? 'priority-medium' : 'priority-low';
 
@@ -190,6 +243,22 @@ function displayResults(analyzedTasks) {
             </div>
         `;
     }).join('');
+
+    if (append) {
+        resultsDiv.insertAdjacentHTML('beforeend', cards);
+    } else {
+        resultsDiv.innerHTML = cards;
+    }
+
+    if (results.next_cursor) {
+        const remaining = results.count - results.offset - analyzedTasks.length;
+        resultsDiv.insertAdjacentHTML('beforeend', `
+            <button id="loadMore" class="btn btn-secondary"
+                onclick="loadMoreResults('${results.snapshot_id}', '${results.next_cursor}')">
+                Load more (${remaining} remaining)
+            </button>
+        `);
+    }
 }
 
 // Get suggestions
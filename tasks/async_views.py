@@ -0,0 +1,95 @@
+"""
+Async variants of the stateless scoring endpoints for ASGI deployments.
+
+Under an ASGI server the request body has already been read asynchronously
+by Django's handler, so these views never block on the socket. Small
+payloads are parsed and scored inline on the event loop, which avoids the
+thread hop sync views pay for every request. Large payloads, where JSON
+parsing and scoring are CPU bound, run on a small bounded thread pool so
+the event loop keeps serving other requests meanwhile. Streamed bodies
+are encoded off the event loop too, one chunk per worker thread call.
+
+The endpoint logic is shared with tasks/views.py; only the dispatch differs.
+Mounted instead of the sync views when TASKS_ASYNC_VIEWS is enabled.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from . import views
+
+# Bodies up to this size are handled inline on the event loop
+ASYNC_INLINE_MAX_BYTES = 64 * 1024
+
+# Threads available to large payloads; further requests queue for a thread
+ASYNC_EXECUTOR_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Returned by next() once a streamed body is exhausted
+_END_OF_STREAM = object()
+
+
+def get_executor():
+    """Return the bounded pool large payloads are scored on."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TASKS_ASYNC_EXECUTOR_WORKERS', ASYNC_EXECUTOR_WORKERS),
+                thread_name_prefix='tasks-scoring'
+            )
+        return _executor
+
+
+async def _iterate(chunks):
+    # Serve a sync streaming body without consuming it in one go. Each
+    # chunk is serialized and encoded by the generator, so it is pulled on
+    # a worker thread rather than on the event loop
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=False)
+    while True:
+        chunk = await next_chunk(chunks, _END_OF_STREAM)
+        if chunk is _END_OF_STREAM:
+            return
+        yield chunk
+
+
+async def run_json_post(request, handler, endpoint):
+    """Run a shared endpoint handler inline or on the executor, by body size."""
+    inline_max_bytes = getattr(settings, 'TASKS_ASYNC_INLINE_MAX_BYTES', ASYNC_INLINE_MAX_BYTES)
+    if len(request.body) <= inline_max_bytes:
+        response = views.handle_json_post(request, handler, endpoint)
+    else:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            get_executor(), views.handle_json_post, request, handler, endpoint
+        )
+
+    if response.streaming and not response.is_async:
+        response.streaming_content = _iterate(response.streaming_content)
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_tasks(request):
+    return await run_json_post(request, views.analyze_response, 'analyze')
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def suggest_tasks(request):
+    return await run_json_post(request, views.suggest_response, 'suggest')
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def plan_tasks(request):
+    return await run_json_post(request, views.plan_response, 'plan')
@@ -0,0 +1,139 @@
+"""
+Vectorized batch scoring engine.
+
+Scores a whole task list as columns (due-day offsets, hours, importance and
+blocked counts) with a handful of NumPy operations instead of one Python
+call chain per task. Results are identical to the scalar functions in
+tasks/scoring.py, including their 2-decimal rounding and the stable
+descending ranking. NumPy is optional; callers check is_available() first.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+from .scoring import ScoreBreakdown, get_blocked_count
+
+
+def is_available():
+    """Return True when NumPy is installed and the batch engine can run."""
+    return np is not None
+
+
+def urgency_column(days, context):
+    """Map an array of day offsets to urgency scores."""
+    # Gather from the context's precomputed table; offsets past its end are
+    # rare, so score each distinct one with the scalar lookup. Either way
+    # the values are bit-for-bit identical to the scalar path.
+    table = np.asarray(context.urgency_table, dtype=np.float64)
+    clipped = np.clip(days, 0, len(table) - 1)
+    urgency = table[clipped]
+    
+    beyond = days >= len(table)
+    if beyond.any():
+        unique_days, inverse = np.unique(days[beyond], return_inverse=True)
+        values = np.array([context.urgency(d) for d in unique_days.tolist()], dtype=np.float64)
+        urgency[beyond] = values[inverse]
+    
+    return urgency
+
+
+def effort_column(hours, context):
+    """Map an array of estimated hours to effort bucket scores."""
+    return np.select(
+        [hours <= max_hours for max_hours, _ in context.effort_buckets],
+        [score for _, score in context.effort_buckets],
+        default=context.min_effort_score
+    )
+
+
+def component_columns(days, hours, importance, blocked, context):
+    """Compute the urgency, importance, effort and dependency score columns."""
+    profile = context.profile
+    urgency = urgency_column(days, context)
+    importance_score = importance * 10.0
+    effort = effort_column(hours, context)
+    dependencies = np.minimum(blocked * profile.dependency_points, profile.max_dependency_score)
+    return urgency, importance_score, effort, dependencies
+
+
+def score_columns(days, hours, importance, blocked, context):
+    """Compute unrounded priority scores from the four input columns."""
+    urgency, importance_score, effort, dependencies = component_columns(days, hours, importance, blocked, context)
+    
+    # Same weights and evaluation order as the profile's scorer
+    profile = context.profile
+    return (urgency * profile.urgency_weight + importance_score * profile.importance_weight
+            + effort * profile.effort_weight + dependencies * profile.dependency_weight)
+
+
+def rank_scores(scores):
+    """Return task positions ordered by score, highest first, ties in input order."""
+    return np.argsort(-scores, kind='stable')
+
+
+def score_tasks_batch(tasks, dependents_index, context, explain=False):
+    """Score and rank tasks in one columnar pass; same contract as score_tasks."""
+    columns = input_columns(tasks, dependents_index, context)
+    scores = assign_scores(tasks, dependents_index, context, columns)
+    if explain:
+        assign_breakdowns(tasks, np.arange(len(tasks)), columns, context)
+    order = rank_scores(scores)
+    return [tasks[i] for i in order.tolist()]
+
+
+def top_tasks_batch(tasks, dependents_index, limit, context, explain=False):
+    """Return the `limit` best tasks in ranked order; same contract as select_top_tasks."""
+    columns = input_columns(tasks, dependents_index, context)
+    scores = assign_scores(tasks, dependents_index, context, columns)
+    if limit < len(scores):
+        # Keep every task tied with the k-th score so ties still resolve in
+        # input order, then rank only those candidates
+        kth_score = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[rank_scores(scores[candidates])][:limit]
+    if explain:
+        assign_breakdowns(tasks, order, columns, context)
+    return [tasks[i] for i in order.tolist()]
+
+
+def input_columns(tasks, dependents_index, context):
+    """Return the day offset, hours, importance and blocked count columns."""
+    count = len(tasks)
+    today = context.today
+    days = np.fromiter(((task.due_date - today).days for task in tasks), dtype=np.int64, count=count)
+    hours = np.fromiter((task.estimated_hours for task in tasks), dtype=np.float64, count=count)
+    importance = np.fromiter((task.importance for task in tasks), dtype=np.float64, count=count)
+    blocked = np.fromiter(
+        (get_blocked_count(dependents_index, task.id) for task in tasks),
+        dtype=np.float64,
+        count=count
+    )
+    return days, hours, importance, blocked
+
+
+def assign_breakdowns(tasks, positions, columns, context):
+    """Set score_breakdown on the tasks at the given positions."""
+    days, hours, importance, blocked = (column[positions] for column in columns)
+    components = component_columns(days, hours, importance, blocked, context)
+    rows = zip(positions.tolist(), days.tolist(), blocked.tolist(), *(column.tolist() for column in components))
+    for position, days_until_due, blocked_count, urgency, importance_score, effort, dependencies in rows:
+        tasks[position].score_breakdown = ScoreBreakdown(
+            days_until_due, int(blocked_count), urgency, importance_score, effort, dependencies, context.profile
+        )
+
+
+def assign_scores(tasks, dependents_index, context, columns=None):
+    """Set priority_score on every task and return the scores as an array."""
+    days, hours, importance, blocked = columns or input_columns(tasks, dependents_index, context)
+    raw_scores = score_columns(days, hours, importance, blocked, context)
+    
+    # Python's round() is correctly rounded; np.round is not, so round on
+    # the way back out to keep scores identical to the scalar path
+    scores = [round(score, 2) for score in raw_scores.tolist()]
+    for task, score in zip(tasks, scores):
+        task.priority_score = score
+    
+    return np.array(scores, dtype=np.float64)
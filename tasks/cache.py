@@ -0,0 +1,236 @@
+"""
+In-process caches for task endpoint results.
+
+LRUCache is a byte-capped least-recently-used store with per-entry expiry.
+ResultCache specializes it for encoded /analyze/, /suggest/ and /plan/
+responses, keyed on a canonical hash of the validated request (with the
+raw request's hash as an alias) and expiring at local midnight,
+when urgency scores roll over. The first page of a paged /analyze/ is
+cached too, for as long as the snapshot it points to stays in the store.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+
+# Default memory cap for cached response bodies (64 MiB)
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough per-entry bookkeeping cost added to each body size
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def next_local_midnight(now=None):
+    """Return the next midnight in the current time zone as an aware datetime."""
+    now = timezone.localtime(now)
+    tomorrow = now.date() + timedelta(days=1)
+    return timezone.make_aware(datetime.combine(tomorrow, time.min), now.tzinfo)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU store capped by total entry size in bytes.
+
+    Entries carry an expiry time and are dropped when read after it. The
+    least recently used entries are evicted once the cap is exceeded.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, now=None, count=True):
+        """Return the value for key, or None on a miss or expired entry."""
+        now = now or timezone.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def record_lookup(self, hit):
+        """Count a lookup made with get(count=False)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key, value, size, expires_at):
+        """Store value under key; oversized values are not cached."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key):
+        """Remove and return the value for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+class CacheAlias:
+    """Entry that points at the response stored under another key."""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+
+class ResultCache(LRUCache):
+    """
+    Cache of encoded endpoint responses, valid until local midnight.
+
+    Responses are stored under a key built from the validated tasks
+    (make_normalized_key), so requests that only differ in how equal
+    values are written (2 and 2.0, "5" and 5, a field left at its default)
+    share one entry. The hash of the raw request (make_key) is kept as an
+    alias to it: an identical resend is answered before validation.
+    """
+
+    def make_key(self, endpoint, data, reference_date):
+        """Hash the raw request canonically: key order and whitespace do not matter."""
+        params = {k: v for k, v in data.items() if k != 'reference_date'}
+        canonical = json.dumps(
+            [endpoint, reference_date.isoformat(), params],
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def make_normalized_key(self, endpoint, data, tasks, context):
+        """Hash the request from its validated task records, scoring date and profile."""
+        params = {k: v for k, v in data.items() if k not in ('tasks', 'reference_date', 'profile')}
+        normalized = [
+            [task.title, task.due_date.isoformat(), task.estimated_hours, task.importance, task.dependencies]
+            for task in tasks
+        ]
+        canonical = json.dumps(
+            [endpoint, context.today.isoformat(), context.profile.name, params, normalized],
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def add_alias(self, alias_key, key):
+        """Make alias_key resolve to the entry stored under key."""
+        if alias_key != key:
+            self.set(alias_key, CacheAlias(key), ENTRY_OVERHEAD_BYTES, next_local_midnight())
+
+    def get_response(self, key, is_live=None, count_miss=True):
+        """
+        Rebuild a response from stored bytes, or return None on a miss.
+
+        Aliases are followed. Entries stored with depends_on are only
+        served while is_live(depends_on) is true; otherwise they are
+        dropped as a miss. count_miss=False leaves a miss uncounted, for
+        a lookup that another one follows.
+        """
+        cached = self.get(key, count=False)
+        if type(cached) is CacheAlias:
+            key = cached.key
+            cached = self.get(key, count=False)
+        if cached is not None and cached[3] is not None and (is_live is None or not is_live(cached[3])):
+            self.pop(key)
+            cached = None
+        if cached is not None or count_miss:
+            self.record_lookup(cached is not None)
+        if cached is None:
+            return None
+        content, content_type, status, _ = cached
+        response = HttpResponse(content, content_type=content_type, status=status)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def store_response(self, key, response, expires_at=None, depends_on=None):
+        """
+        Store a successful response's encoded body and mark it as a miss.
+
+        Entries expire at local midnight, or at expires_at when that is
+        earlier. depends_on names something the response refers to (such
+        as a snapshot id) that get_response checks before serving it.
+        """
+        response['X-Cache'] = 'MISS'
+        if response.status_code != 200 or response.streaming:
+            return
+        content = response.content
+        midnight = next_local_midnight()
+        self.set(
+            key,
+            (content, response['Content-Type'], response.status_code, depends_on),
+            len(content) + ENTRY_OVERHEAD_BYTES,
+            min(expires_at, midnight) if expires_at is not None else midnight
+        )
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide result cache, or None when disabled."""
+    global _result_cache
+    max_bytes = getattr(settings, 'TASKS_RESULT_CACHE_MAX_BYTES', RESULT_CACHE_MAX_BYTES)
+    if not max_bytes:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None or _result_cache.max_bytes != max_bytes:
+            _result_cache = ResultCache(max_bytes)
+        return _result_cache
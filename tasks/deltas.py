@@ -0,0 +1,223 @@
+"""
+Incremental re-scoring of a stored snapshot.
+
+A delta lists the tasks added, removed and modified since a paged
+/analyze/ call. Instead of validating and scoring the whole list again,
+only the changed tasks and the tasks whose blocked count they change (the
+blockers named in their old and new dependency lists) are re-scored. Their
+positions are found by binary search, but taking an entry out of the
+ranked list and inserting it again shifts the entries after it, so a
+one-task edit is O(n) in list moves. Those are pointer memmoves, much
+cheaper than validating and scoring n tasks again, which is what a delta
+saves. The first delta on a snapshot builds its id lookup and
+reverse-dependency index once.
+
+A delta is scored completely before the snapshot is touched: if it
+fails, the snapshot is left as it was.
+
+Task ids stay what they were in the snapshot: the original 1-based
+positions, with added tasks numbered after the highest id so far.
+Scores use the snapshot's reference date.
+"""
+from bisect import bisect_left, insort
+
+from .records import TaskRecord
+from .scoring import build_dependents_index, calculate_priority_score, score_breakdown
+from .validation import TaskBatchValidator
+
+# Only the default ranking can be updated incrementally: other orderings
+# sort on other keys, and graph modes change blocked counts along chains
+DELTA_SORT_BY = 'priority'
+DELTA_DEPENDENCY_MODE = 'direct'
+
+
+class DeltaError(ValueError):
+    """Raised with a user-facing message when a delta cannot be applied."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors
+
+
+def rank_key(task):
+    # The order score_tasks produces: score descending, then input position
+    return (-task.priority_score, task.id)
+
+
+def blocker_ids(task):
+    # Same rules as build_dependents_index: no self-references, duplicates
+    # once, unhashable ids ignored
+    seen = set()
+    for blocker_id in task.dependencies or ():
+        try:
+            if blocker_id == task.id or blocker_id in seen:
+                continue
+            seen.add(blocker_id)
+        except TypeError:
+            continue
+        yield blocker_id
+
+
+def is_task_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def prepare(snapshot):
+    """Build the lookup tables delta updates need, once per snapshot."""
+    if snapshot.by_id is not None:
+        return
+    snapshot.by_id = {task.id: task for task in snapshot.tasks}
+    snapshot.dependents = build_dependents_index(snapshot.tasks)
+    snapshot.next_id = max(snapshot.by_id, default=0) + 1
+
+
+def parse_delta(snapshot, data):
+    """
+    Validate a delta request against a snapshot.
+
+    Returns (added, removed, modified): new task field dicts, removed ids,
+    and (id, fields) pairs. Raises DeltaError on any invalid entry.
+    """
+    if snapshot.sort_by != DELTA_SORT_BY or snapshot.dependency_mode != DELTA_DEPENDENCY_MODE:
+        raise DeltaError(
+            f'Delta updates need a snapshot ranked with sort_by "{DELTA_SORT_BY}" '
+            f'and dependency_mode "{DELTA_DEPENDENCY_MODE}"'
+        )
+
+    added = data.get('added', [])
+    removed = data.get('removed', [])
+    modified = data.get('modified', [])
+    if not all(isinstance(value, list) for value in (added, removed, modified)):
+        raise DeltaError('added, removed and modified must be lists')
+
+    by_id = snapshot.by_id
+    for task_id in removed:
+        if not is_task_id(task_id) or task_id not in by_id:
+            raise DeltaError(f'Cannot remove unknown task id {task_id!r}')
+    removed_ids = set(removed)
+
+    modified_ids = []
+    for item in modified:
+        task_id = item.get('id') if isinstance(item, dict) else None
+        if not is_task_id(task_id) or task_id not in by_id or task_id in removed_ids:
+            raise DeltaError(f'Cannot modify unknown or removed task id {task_id!r}')
+        modified_ids.append(task_id)
+    if len(set(modified_ids)) != len(modified_ids):
+        raise DeltaError('Each task can only be modified once per delta')
+
+    validator = TaskBatchValidator(snapshot.context.today)
+    added_fields, added_errors = validator.validate(added)
+    modified_fields, modified_errors = validator.validate(modified)
+    errors = (
+        [{'field': 'added', **error} for error in added_errors]
+        + [{'field': 'modified', **error} for error in modified_errors]
+    )
+    if errors:
+        raise DeltaError(errors[0]['message'], errors)
+
+    return added_fields, removed_ids, list(zip(modified_ids, modified_fields))
+
+
+def rank_of(snapshot, task):
+    """Position of a ranked task, found by binary search."""
+    rank = bisect_left(snapshot.tasks, rank_key(task), key=rank_key)
+    if rank == len(snapshot.tasks) or snapshot.tasks[rank] is not task:
+        raise RuntimeError(f'Snapshot ranking is out of order at task {task.id}')
+    return rank
+
+
+def apply_delta(snapshot, added, removed, modified):
+    """
+    Apply a parsed delta to a prepared snapshot in place.
+
+    Returns one {'id', 'title', 'priority_score', 'from', 'to'} dict per
+    re-scored or removed task, in new rank order; 'from' is None for added
+    tasks and 'to' None for removed ones. Every other task keeps its score
+    and relative order. Nothing is changed until every new score is known.
+    """
+    by_id = snapshot.by_id
+    dependents = snapshot.dependents
+
+    replaced = [by_id[task_id] for task_id in removed]
+    replaced += [by_id[task_id] for task_id, _ in modified]
+    new_tasks = [TaskRecord(id=task_id, **fields) for task_id, fields in modified]
+    next_id = snapshot.next_id
+    for fields in added:
+        new_tasks.append(TaskRecord(id=next_id, **fields))
+        next_id += 1
+
+    # Existing tasks whose blocked count may change
+    touched = {task.id for task in replaced}
+    for task in replaced + new_tasks:
+        touched.update(blocker_id for blocker_id in blocker_ids(task) if blocker_id in by_id)
+
+    # Where the touched tasks are now (raises before any change if the
+    # ranking is out of order)
+    previous_ranks = {task_id: (rank_of(snapshot, by_id[task_id]), by_id[task_id]) for task_id in touched}
+
+    # Blocked counts after the delta, for the tasks about to be re-scored
+    new_ids = {task.id for task in new_tasks}
+    rescored = [by_id[task_id] for task_id in touched if task_id not in removed and task_id not in new_ids]
+    rescored += new_tasks
+    blocked_counts = {task.id: len(dependents.get(task.id, ())) for task in rescored}
+    for tasks, change in ((replaced, -1), (new_tasks, 1)):
+        for task in tasks:
+            for blocker_id in blocker_ids(task):
+                if blocker_id in blocked_counts:
+                    blocked_counts[blocker_id] += change
+
+    context = snapshot.context
+    scores = []
+    for task in rescored:
+        if snapshot.explain:
+            breakdown = score_breakdown(task, blocked_counts, context)
+            scores.append((breakdown.score, breakdown))
+        else:
+            scores.append((calculate_priority_score(task, dependents_index=blocked_counts, context=context), None))
+
+    # Everything is scored: apply the delta. Take the touched tasks out of
+    # the ranking, highest position first so the others stay valid
+    for rank in sorted((rank for rank, _ in previous_ranks.values()), reverse=True):
+        del snapshot.tasks[rank]
+
+    # Swap the old versions for the new ones in the reverse-dependency index
+    for task in replaced:
+        for blocker_id in blocker_ids(task):
+            blocked = dependents[blocker_id]
+            blocked.remove(task.id)
+            if not blocked:
+                del dependents[blocker_id]
+        del by_id[task.id]
+    for task in new_tasks:
+        for blocker_id in blocker_ids(task):
+            dependents.setdefault(blocker_id, []).append(task.id)
+        by_id[task.id] = task
+    snapshot.next_id = next_id
+
+    for task, (score, breakdown) in zip(rescored, scores):
+        task.priority_score = score
+        if breakdown is not None:
+            task.score_breakdown = breakdown
+        insort(snapshot.tasks, task, key=rank_key)
+
+    moved = []
+    for task in rescored:
+        previous = previous_ranks.get(task.id)
+        moved.append({
+            'id': task.id,
+            'title': task.title,
+            'priority_score': task.priority_score,
+            'from': previous[0] if previous is not None else None,
+            'to': rank_of(snapshot, task)
+        })
+    for task_id in removed:
+        task = previous_ranks[task_id][1]
+        moved.append({
+            'id': task_id,
+            'title': task.title,
+            'priority_score': task.priority_score,
+            'from': previous_ranks[task_id][0],
+            'to': None
+        })
+    moved.sort(key=lambda entry: (entry['to'] is None, entry['to'] or 0, entry['id']))
+    return moved
@@ -0,0 +1,338 @@
+"""
+Dependency graph engine.
+
+DependencyGraph turns a scored task list into a compressed sparse row (CSR)
+adjacency of "blocker -> dependent" edges, built once per request. On top of
+it, every algorithm runs iteratively in O(V + E), so deep chains never hit
+the recursion limit:
+
+- dangling dependency ids and self-references are collected while building
+- cycle detection and a topological order (Kahn's algorithm)
+- strongly connected components (Tarjan), to name the tasks in each cycle
+- transitive blocked counts and critical-path lengths, usable as inputs to
+  the dependency score in tasks/scoring.py
+"""
+from collections import deque
+from itertools import islice
+import math
+
+from .scoring import DEPENDENCY_POINTS_PER_TASK, MAX_DEPENDENCY_SCORE
+
+# Ways of counting the tasks a task blocks, for the dependency score
+DEPENDENCY_MODES = ('direct', 'transitive', 'critical_path')
+
+# The default profile's dependency score stops growing at this many blocked
+# tasks, so scoring never needs exact transitive counts beyond it (each
+# profile has its own ScoringProfile.blocked_limit)
+SCORING_BLOCKED_LIMIT = math.ceil(MAX_DEPENDENCY_SCORE / DEPENDENCY_POINTS_PER_TASK)
+
+
+class DependencyGraph:
+    """
+    Blocker -> dependent graph over one task list.
+
+    Nodes are positions in the task list. The edges leaving node i are
+    targets[offsets[i]:offsets[i + 1]], i.e. the tasks that list task i as a
+    dependency. Duplicate dependencies count once; dangling ids and
+    self-references create no edges and are reported instead.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.size = len(tasks)
+        self.self_references = []
+        self.dangling = []
+
+        # Position of each task id (the first task, if ids repeat)
+        self.position_of = position_of = {}
+        for position, task in enumerate(tasks):
+            position_of.setdefault(task.id, position)
+
+        blockers = []
+        dependents = []
+        for position, task in enumerate(tasks):
+            dependencies = task.dependencies
+            if not dependencies:
+                continue
+            try:
+                # Duplicates count once; dict keeps the listed order
+                unique = dict.fromkeys(dependencies)
+            except TypeError:
+                unique = {}
+                for blocker_id in dependencies:
+                    try:
+                        unique[blocker_id] = None
+                    except TypeError:
+                        # Unhashable ids can never match a task id
+                        self.dangling.append((position, blocker_id))
+            for blocker_id in unique:
+                if blocker_id == task.id:
+                    self.self_references.append(position)
+                    continue
+                blocker = position_of.get(blocker_id)
+                if blocker is None:
+                    self.dangling.append((position, blocker_id))
+                    continue
+                blockers.append(blocker)
+                dependents.append(position)
+
+        # Counting sort of the edge list into CSR form
+        offsets = [0] * (self.size + 1)
+        for blocker in blockers:
+            offsets[blocker + 1] += 1
+        for i in range(self.size):
+            offsets[i + 1] += offsets[i]
+        cursor = offsets[:-1]
+        targets = [0] * len(blockers)
+        in_degree = [0] * self.size
+        for blocker, dependent in zip(blockers, dependents):
+            targets[cursor[blocker]] = dependent
+            cursor[blocker] += 1
+            in_degree[dependent] += 1
+
+        self.offsets = offsets
+        self.targets = targets
+        self.in_degree = in_degree
+        self._topological = None
+        self._cyclic_components = None
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def dependents_of(self, position):
+        """Positions of the tasks that directly depend on the task at position."""
+        return self.targets[self.offsets[position]:self.offsets[position + 1]]
+
+    def topological_order(self):
+        """
+        Return (order, blocked): positions with every blocker before its
+        dependents, and the positions left over because they sit on or
+        behind a cycle. Ties keep input order.
+        """
+        if self._topological is None:
+            offsets = self.offsets
+            targets = self.targets
+            remaining = self.in_degree[:]
+            ready = deque(i for i in range(self.size) if not remaining[i])
+            order = []
+            while ready:
+                node = ready.popleft()
+                order.append(node)
+                for edge in range(offsets[node], offsets[node + 1]):
+                    dependent = targets[edge]
+                    remaining[dependent] -= 1
+                    if not remaining[dependent]:
+                        ready.append(dependent)
+            blocked = [i for i in range(self.size) if remaining[i]] if len(order) < self.size else []
+            self._topological = (order, blocked)
+        return self._topological
+
+    def has_cycles(self):
+        return bool(self.topological_order()[1])
+
+    def cycles(self):
+        """Return each dependency cycle as a list of task positions."""
+        return [sorted(component) for component in self._blocked_components() if len(component) > 1]
+
+    def _blocked_components(self):
+        # Nothing Kahn's algorithm released can be reached from a cycle, so
+        # the leftover nodes are closed under dependents and their components
+        # can be found without searching the rest of the graph
+        if self._cyclic_components is None:
+            _, blocked = self.topological_order()
+            self._cyclic_components = self.strongly_connected_components(blocked) if blocked else []
+        return self._cyclic_components
+
+    def strongly_connected_components(self, roots=None):
+        """
+        Tarjan's algorithm with an explicit stack.
+
+        Components are returned dependents-first: every component comes
+        after all components it blocks (reverse topological order).
+        """
+        offsets = self.offsets
+        targets = self.targets
+        index = [-1] * self.size
+        low = [0] * self.size
+        on_stack = [False] * self.size
+        stack = []
+        components = []
+        counter = 0
+
+        for root in (range(self.size) if roots is None else roots):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, offsets[root])]
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    child = targets[edge]
+                    if index[child] == -1:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, offsets[child]))
+                    elif on_stack[child] and index[child] < low[node]:
+                        low[node] = index[child]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def _representatives(self):
+        # Each node's component, named by one member: the node itself unless
+        # it sits on a cycle
+        representative = list(range(self.size))
+        for component in self._blocked_components():
+            for node in component:
+                representative[node] = component[0]
+        return representative
+
+    def _dependents_first(self):
+        # (representative, members) for every component, each after all the
+        # components it leads to: the leftover components (which only lead
+        # to each other), then the released nodes in reverse topological order
+        order, _ = self.topological_order()
+        for component in self._blocked_components():
+            yield component[0], component
+        for node in reversed(order):
+            yield node, (node,)
+
+    def transitive_blocked_counts(self, limit=None):
+        """
+        For every position, how many distinct tasks depend on it directly or
+        through a chain of dependencies.
+
+        Reachable sets are merged dependents-first over the condensation and
+        each is freed once its last blocker has consumed it. Exact counts use
+        int bitsets; with a limit, sets stop growing once the count reaches
+        it, so the cost is O(E * limit) however dense the graph is.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        representative = self._representatives()
+
+        # Edges into each component from outside it, to know when its set
+        # can be freed
+        pending = self.in_degree[:]
+        for component in self._blocked_components():
+            first = component[0]
+            pending[first] = sum(pending[node] for node in component)
+            for node in component:
+                for target in targets[offsets[node]:offsets[node + 1]]:
+                    if representative[target] == first:
+                        pending[first] -= 1
+
+        closure = {}
+        counts = [0] * self.size
+        for first, members in self._dependents_first():
+            if limit is None:
+                reached = 0
+                for node in members:
+                    reached |= 1 << node
+            else:
+                reached = set(members)
+            for node in members:
+                for target in targets[offsets[node]:offsets[node + 1]]:
+                    child = representative[target]
+                    if child == first:
+                        continue
+                    if limit is None or len(reached) <= limit:
+                        reached |= closure[child]
+                    pending[child] -= 1
+                    if not pending[child]:
+                        del closure[child]
+            # Members of a cycle block each other but never themselves
+            if limit is None:
+                count = bin(reached).count('1') - 1
+            else:
+                count = min(len(reached) - 1, limit)
+            for node in members:
+                counts[node] = count
+            if pending[first]:
+                if limit is not None and len(reached) > limit + 1:
+                    # Any limit + 1 members prove the count is capped
+                    reached = set(islice(reached, limit + 1))
+                closure[first] = reached
+        return counts
+
+    def critical_path_lengths(self):
+        """
+        For every position, the number of tasks on the longest chain of
+        dependents waiting behind it. Cycle members count the rest of their
+        cycle as part of the chain.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        representative = self._representatives()
+
+        # Longest chain starting at each component, counting its own members
+        chain = [0] * self.size
+        lengths = [0] * self.size
+        for first, members in self._dependents_first():
+            longest = 0
+            for node in members:
+                for target in targets[offsets[node]:offsets[node + 1]]:
+                    child = representative[target]
+                    if child != first and chain[child] > longest:
+                        longest = chain[child]
+            chain[first] = len(members) + longest
+            for node in members:
+                lengths[node] = chain[first] - 1
+        return lengths
+
+    def blocked_counts(self, mode='direct', limit=None):
+        """
+        Map task id -> blocked count for the given mode, in the shape the
+        scoring functions accept as a dependents index. A limit caps the
+        transitive counts (see SCORING_BLOCKED_LIMIT).
+        """
+        if mode == 'transitive':
+            counts = self.transitive_blocked_counts(limit)
+        elif mode == 'critical_path':
+            counts = self.critical_path_lengths()
+        elif mode == 'direct':
+            counts = [self.offsets[i + 1] - self.offsets[i] for i in range(self.size)]
+        else:
+            raise ValueError(f'Unknown dependency mode: {mode}')
+        blocked = {}
+        for task, count in zip(self.tasks, counts):
+            if count:
+                blocked.setdefault(task.id, count)
+        return blocked
+
+    def warnings(self):
+        """Describe dangling ids, self-references and cycles by task id."""
+        tasks = self.tasks
+        warnings = {}
+        if self.self_references:
+            warnings['self_references'] = [tasks[i].id for i in self.self_references]
+        if self.dangling:
+            warnings['dangling'] = [
+                {'task': tasks[i].id, 'dependency': blocker_id}
+                for i, blocker_id in self.dangling
+            ]
+        cycles = self.cycles()
+        if cycles:
+            warnings['cycles'] = [[tasks[i].id for i in cycle] for cycle in cycles]
+        return warnings
@@ -0,0 +1,270 @@
+"""
+Bulk import of task items into the database.
+
+Items are read incrementally from JSON (an array, or an object with a
+"tasks" array) or JSONL, validated with the same rules as /analyze/,
+scored, and inserted with bulk_create one batch per transaction.
+"""
+import json
+import time
+
+from django.db import transaction
+
+from . import ranking
+from .models import Task, TaskDependency
+from .scoring import ScoringContext, build_dependents_index, calculate_priority_score
+from .services import blocker_ids_for, rescore_tasks
+from .validation import TaskBatchValidator, TaskValidationError
+
+IMPORT_BATCH_SIZE = 2000
+
+# Bytes read from the source per refill while decoding a JSON array
+READ_SIZE = 64 * 1024
+
+# Invalid items reported back in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def iter_jsonl_items(stream):
+    """Yield one decoded item per non-blank line."""
+    for line_number, line in enumerate(stream, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON on line {line_number}: {e.msg}')
+
+
+def iter_json_items(stream):
+    """
+    Yield the items of a JSON array, or of an object's "tasks" array.
+
+    Arrays are decoded element by element from READ_SIZE chunks, so memory
+    stays bounded by the batch size rather than the file size.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    exhausted = False
+    
+    def fill():
+        nonlocal buffer, position, exhausted
+        chunk = stream.read(READ_SIZE)
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8')
+        if not chunk:
+            exhausted = True
+        buffer = buffer[position:] + chunk
+        position = 0
+    
+    def next_char():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or exhausted:
+                return buffer[position] if position < len(buffer) else ''
+            fill()
+    
+    first = next_char()
+    if first == '{':
+        # Wrapped payloads are decoded whole, like an /analyze/ request body
+        while not exhausted:
+            fill()
+        data = json.loads(buffer[position:])
+        items = data.get('tasks', [])
+        if not isinstance(items, list):
+            raise ValueError('"tasks" must be a list')
+        yield from items
+        return
+    if first != '[':
+        raise ValueError('Expected a JSON array of tasks or an object with a "tasks" array')
+    position += 1
+    if next_char() == ']':
+        return
+    
+    while True:
+        if next_char() == '':
+            raise ValueError('Unexpected end of JSON input')
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or exhausted:
+                    break
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise ValueError('Invalid JSON in task array')
+            fill()
+        position = end
+        yield item
+        
+        char = next_char()
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f'Expected "," or "]" in JSON array, found {char!r}')
+        position += 1
+
+
+def iter_items(stream, file_format):
+    """Dispatch to the reader for 'json' or 'jsonl' input."""
+    if file_format == 'jsonl':
+        return iter_jsonl_items(stream)
+    if file_format == 'json':
+        return iter_json_items(stream)
+    raise ValueError(f'Unknown import format: {file_format}')
+
+
+class ImportResult:
+    """Counters and reported errors from one import run."""
+
+    def __init__(self):
+        self.created = 0
+        self.invalid = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def import_tasks(items, batch_size=IMPORT_BATCH_SIZE, strict=False, context=None, progress=None):
+    """
+    Validate, score and insert task items in batches.
+
+    Each batch is inserted in its own transaction, along with its
+    TaskDependency rows. Items may carry an explicit "id" so dependencies
+    inside the import can refer to each other; an id that is already
+    stored, or repeated within the import, makes its item invalid. Invalid
+    items are skipped and reported, or abort the import before their batch
+    when strict.
+    Blockers referenced by the import are re-scored once at the end, when
+    all their blocked counts are known. progress, if given, is called with
+    the running ImportResult after every batch.
+    """
+    context = context or ScoringContext()
+    validator = TaskBatchValidator(context.today)
+    result = ImportResult()
+    referenced_blocker_ids = set()
+    started = time.perf_counter()
+    
+    batch = []
+    positions = []
+    claimed_ids = set()
+    
+    def reject(position, error):
+        if strict:
+            raise error
+        result.invalid += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append({'index': position - 1, 'message': str(error)})
+    
+    def flush():
+        tasks = _without_existing_ids(batch, positions, reject)
+        if tasks:
+            _insert_batch(tasks, context, referenced_blocker_ids)
+            result.created += len(tasks)
+        batch.clear()
+        positions.clear()
+    
+    for position, item in enumerate(items, start=1):
+        try:
+            fields = validator.validate_item(item, position)
+            task_id = item.get('id')
+            if task_id is not None:
+                if not isinstance(task_id, int) or isinstance(task_id, bool) or task_id < 1:
+                    raise TaskValidationError(f'Task {position} id must be a positive integer')
+                if task_id in claimed_ids:
+                    raise TaskValidationError(f'Task {position} id {task_id} is used by an earlier task')
+                claimed_ids.add(task_id)
+        except TaskValidationError as e:
+            reject(position, e)
+            continue
+        
+        batch.append(Task(id=task_id, **fields))
+        positions.append(position)
+        if len(batch) >= batch_size:
+            flush()
+            result.elapsed = time.perf_counter() - started
+            if progress:
+                progress(result)
+    
+    if batch:
+        flush()
+    
+    # Blocked counts of referenced tasks are final only now
+    referenced = sorted(referenced_blocker_ids)
+    for start in range(0, len(referenced), batch_size):
+        with transaction.atomic():
+            rescore_tasks(referenced[start:start + batch_size], context)
+    
+    result.elapsed = time.perf_counter() - started
+    if progress:
+        progress(result)
+    return result
+
+
+def _without_existing_ids(tasks, positions, reject):
+    # Explicit ids that are already stored would fail the whole bulk_create;
+    # they are rejected one by one instead, with one query per batch
+    explicit_ids = [task.id for task in tasks if task.id is not None]
+    if not explicit_ids:
+        return list(tasks)
+    existing = set(Task.objects.filter(id__in=explicit_ids).values_list('id', flat=True))
+    if not existing:
+        return list(tasks)
+    kept = []
+    for task, position in zip(tasks, positions):
+        if task.id in existing:
+            reject(position, TaskValidationError(f'Task {position} id {task.id} already exists'))
+        else:
+            kept.append(task)
+    return kept
+
+
+def _insert_batch(tasks, context, referenced_blocker_ids):
+    # Dependencies inside the batch are known up front (explicit ids), so
+    # tasks are scored before the insert and written once
+    dependents_index = build_dependents_index(tasks)
+    for task in tasks:
+        task.priority_score = calculate_priority_score(
+            task, dependents_index=dependents_index, context=context
+        )
+    
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        # bulk_create sends no post_save signals
+        ranking.tasks_changed()
+        
+        task_ids = {task.id for task in tasks}
+        links = []
+        for task in tasks:
+            blocker_ids = blocker_ids_for(task)
+            referenced_blocker_ids.update(blocker_ids - task_ids)
+            links.extend(TaskDependency(dependent_id=task.id, blocker_id=b) for b in blocker_ids)
+        TaskDependency.objects.bulk_create(links)
+        
+        # Tasks already listed as dependencies by stored rows need the
+        # final pass too
+        referenced_blocker_ids.update(
+            TaskDependency.objects
+            .filter(blocker_id__in=task_ids)
+            .exclude(dependent_id__in=task_ids)
+            .values_list('blocker_id', flat=True)
+            .distinct()
+        )
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from tasks.importer import IMPORT_BATCH_SIZE, import_tasks, iter_items
+from tasks.validation import TaskValidationError
+
+
+class Command(BaseCommand):
+    help = "Bulk import tasks from a JSON or JSONL file, scoring them on the way in."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument(
+            '--format',
+            choices=['json', 'jsonl'],
+            help="Input format (default: from the file extension, .jsonl/.ndjson means jsonl)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f"Rows per bulk insert and transaction (default: {IMPORT_BATCH_SIZE})"
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help="Stop at the first invalid task instead of skipping it"
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            file_format = 'jsonl' if Path(path).suffix in ('.jsonl', '.ndjson') else 'json'
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        
+        def report(result):
+            self.stdout.write(
+                f"  {result.created} tasks imported ({result.rows_per_second:,.0f} rows/sec)"
+            )
+        
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            result = import_tasks(
+                iter_items(stream, file_format),
+                batch_size=options['batch_size'],
+                strict=options['strict'],
+                progress=report if options['verbosity'] > 1 else None
+            )
+        except (TaskValidationError, ValueError) as e:
+            raise CommandError(str(e))
+        except IntegrityError as e:
+            raise CommandError(f"Import stopped by a conflicting row, earlier batches were kept: {e}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        
+        for error in result.errors:
+            self.stderr.write(f"  skipped: {error['message']}")
+        if result.invalid > len(result.errors):
+            self.stderr.write(f"  ...and {result.invalid - len(result.errors)} more invalid tasks")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} tasks in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:,.0f} rows/sec), skipped {result.invalid} invalid"
+        ))
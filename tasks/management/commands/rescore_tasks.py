@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tasks.scoring import ScoringContext
+from tasks.services import RESCORE_BATCH_SIZE, rescore_all_tasks
+
+# Seconds between progress lines at the default verbosity
+PROGRESS_INTERVAL = 5.0
+
+
+class Command(BaseCommand):
+    help = "Recompute every stored priority score, e.g. nightly once urgency has rolled over."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RESCORE_BATCH_SIZE,
+            help=f"Rows fetched, scored and written per batch (default: {RESCORE_BATCH_SIZE})"
+        )
+        parser.add_argument(
+            '--date',
+            help="Score as of this date (YYYY-MM-DD) instead of today"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Count the scores that would change without writing them"
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError("--date must be a date in YYYY-MM-DD format")
+        
+        # Every batch at -v 2, otherwise one line per PROGRESS_INTERVAL
+        last_report = time.perf_counter()
+        
+        def report(result):
+            nonlocal last_report
+            now = time.perf_counter()
+            if options['verbosity'] > 1 or (options['verbosity'] and now - last_report >= PROGRESS_INTERVAL):
+                last_report = now
+                self.stdout.write(
+                    f"  {result.scanned:,} tasks scanned, {result.changed:,} changed "
+                    f"({result.rows_per_second:,.0f} rows/sec)"
+                )
+        
+        result = rescore_all_tasks(
+            batch_size=options['batch_size'],
+            context=ScoringContext(today),
+            progress=report,
+            dry_run=options['dry_run']
+        )
+        
+        verb = "would change" if options['dry_run'] else "changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {result.scanned} tasks in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:,.0f} rows/sec), {result.changed} {verb}"
+        ))
@@ -0,0 +1,152 @@
+"""
+Per-phase request timing and in-process latency metrics.
+
+PhaseTimer records how long each phase of a request took (parsing,
+validation, scoring, encoding, ...) with two perf_counter() reads per
+phase; the result is sent back as a Server-Timing header. Every timed
+request also feeds a MetricsRegistry of latency histograms labelled by
+endpoint and payload size bucket, plus per-phase time counters, rendered
+in the Prometheus text format by the /api/tasks/metrics/ endpoint.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+from django.conf import settings
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Payload size buckets as (max tasks, label), checked in order
+SIZE_BUCKETS = (
+    (100, '1-100'),
+    (1000, '101-1000'),
+    (10000, '1001-10000'),
+    (100000, '10001-100000'),
+)
+MAX_SIZE_LABEL = '100001+'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_enabled():
+    return getattr(settings, 'TASKS_METRICS_ENABLED', True)
+
+
+def size_bucket(task_count):
+    """Label of the payload size bucket a task count falls in."""
+    for max_tasks, label in SIZE_BUCKETS:
+        if task_count <= max_tasks:
+            return label
+    return MAX_SIZE_LABEL
+
+
+class PhaseTimer:
+    """Durations of the named phases of one request, in call order."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        """Format the phases and total as a Server-Timing header value (ms)."""
+        entries = [f'{name};dur={duration * 1000:.2f}' for name, duration in self.phases]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+class MetricsRegistry:
+    """Thread-safe latency histograms and phase counters."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._phase_seconds = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, task_count, timer, total):
+        """Record one request's total latency and phase durations."""
+        labels = (endpoint, size_bucket(task_count))
+        bucket = bisect_left(self.buckets, total)
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                # Per-bucket counts (last slot is +Inf), sum and count
+                histogram = self._histograms[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bucket] += 1
+            histogram[1] += total
+            histogram[2] += 1
+            for name, duration in timer.phases:
+                key = (endpoint, name)
+                self._phase_seconds[key] = self._phase_seconds.get(key, 0.0) + duration
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._phase_seconds.clear()
+
+    def render(self, cache_stats=None):
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted((labels, [counts[:], total, count])
+                                for labels, (counts, total, count) in self._histograms.items())
+            phase_seconds = sorted(self._phase_seconds.items())
+
+        lines = [
+            '# HELP tasks_request_duration_seconds Scoring endpoint latency by payload size.',
+            '# TYPE tasks_request_duration_seconds histogram',
+        ]
+        for (endpoint, size), (counts, total, count) in histograms:
+            labels = f'endpoint="{endpoint}",size="{size}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'tasks_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'tasks_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'tasks_request_duration_seconds_sum{{{labels}}} {total}')
+            lines.append(f'tasks_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP tasks_phase_seconds_total Time spent in each request phase.',
+            '# TYPE tasks_phase_seconds_total counter',
+        ]
+        for (endpoint, phase), seconds in phase_seconds:
+            lines.append(f'tasks_phase_seconds_total{{endpoint="{endpoint}",phase="{phase}"}} {seconds}')
+
+        if cache_stats is not None:
+            lines += [
+                '# HELP tasks_result_cache_requests_total Result cache lookups by outcome.',
+                '# TYPE tasks_result_cache_requests_total counter',
+                f'tasks_result_cache_requests_total{{result="hit"}} {cache_stats["hits"]}',
+                f'tasks_result_cache_requests_total{{result="miss"}} {cache_stats["misses"]}',
+                '# HELP tasks_result_cache_evictions_total Entries evicted from the result cache.',
+                '# TYPE tasks_result_cache_evictions_total counter',
+                f'tasks_result_cache_evictions_total {cache_stats["evictions"]}',
+                '# HELP tasks_result_cache_entries Responses held in the result cache.',
+                '# TYPE tasks_result_cache_entries gauge',
+                f'tasks_result_cache_entries {cache_stats["entries"]}',
+                '# HELP tasks_result_cache_bytes Bytes held in the result cache.',
+                '# TYPE tasks_result_cache_bytes gauge',
+                f'tasks_result_cache_bytes {cache_stats["bytes"]}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry():
+    """Return the process-wide metrics registry."""
+    return _registry
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_dependency_links(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskDependency = apps.get_model('tasks', 'TaskDependency')
+    links = []
+    for task_id, dependencies in Task.objects.values_list('id', 'dependencies').iterator():
+        blocker_ids = {
+            d for d in dependencies or ()
+            if isinstance(d, int) and not isinstance(d, bool) and d != task_id
+        }
+        links.extend(TaskDependency(dependent_id=task_id, blocker_id=b) for b in blocker_ids)
+    TaskDependency.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blocker_id', models.IntegerField(db_index=True, help_text='ID of the task that blocks the dependent task')),
+                ('dependent', models.ForeignKey(help_text='Task that lists the blocker as a dependency', on_delete=django.db.models.deletion.CASCADE, related_name='dependency_links', to='tasks.task')),
+            ],
+            options={
+                'verbose_name': 'Task dependency',
+                'verbose_name_plural': 'Task dependencies',
+                'constraints': [models.UniqueConstraint(fields=('dependent', 'blocker_id'), name='unique_task_dependency')],
+            },
+        ),
+        migrations.RunPython(populate_dependency_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:48
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    TaskTableVersion = apps.get_model('tasks', 'TaskTableVersion')
+    TaskTableVersion.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, help_text='Incremented by every committed change to the stored ranking')),
+            ],
+            options={
+                'verbose_name': 'Task table version',
+                'verbose_name_plural': 'Task table versions',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -48,6 +48,11 @@ class Task(models.Model):
     
     class Meta:
         ordering = ['-priority_score', 'due_date']
+        indexes = [
+            # Matches the default ordering, so ranked reads are index scans
+            models.Index(fields=['-priority_score', 'due_date'], name='task_priority_due_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ]
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
     
@@ -61,4 +66,58 @@ class Task(models.Model):
     def days_until_due(self):
         """Calculate how many days until the task is due."""
         delta = self.due_date - timezone.now().date()
-        return delta.days
\ No newline at end of file
+        return delta.days
+
+
+class TaskDependency(models.Model):
+    """
+    Reverse-dependency index for persisted tasks.
+
+    One row per (dependent task, blocker id) pair, mirroring Task.dependencies,
+    so the tasks a task blocks can be found and counted with an indexed query.
+    blocker_id is a plain integer because dependencies may name missing tasks.
+    """
+    dependent = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='dependency_links',
+        help_text="Task that lists the blocker as a dependency"
+    )
+    
+    blocker_id = models.IntegerField(
+        db_index=True,
+        help_text="ID of the task that blocks the dependent task"
+    )
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dependent', 'blocker_id'], name='unique_task_dependency'),
+        ]
+        verbose_name = "Task dependency"
+        verbose_name_plural = "Task dependencies"
+    
+    def __str__(self):
+        return f"Task {self.dependent_id} depends on task {self.blocker_id}"
+
+
+class TaskTableVersion(models.Model):
+    """
+    Version stamp of the Task table, a single row.
+
+    Every write that changes the ranking increments it in the same
+    transaction, so any process can tell whether the tasks it holds in
+    memory are still current with one primary-key lookup.
+    """
+    SINGLETON_ID = 1
+    
+    version = models.BigIntegerField(
+        default=0,
+        help_text="Incremented by every committed change to the stored ranking"
+    )
+    
+    class Meta:
+        verbose_name = "Task table version"
+        verbose_name_plural = "Task table versions"
+    
+    def __str__(self):
+        return f"Task table version {self.version}"
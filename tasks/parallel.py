@@ -0,0 +1,166 @@
+"""
+Process-pool sharded scoring for very large task lists.
+
+The parent process reduces blocked counts over the whole list (dependencies
+cross shard boundaries), writes the input columns into one shared-memory
+block and hands each worker a range of positions. Workers score and rank
+their shard in place with the vectorized engine from tasks/batch_scoring.py,
+so no task data is pickled in either direction. The per-shard rankings are
+then k-way merged into the final ranking, which is identical to the one
+score_tasks produces on a single core.
+
+Requires NumPy; callers check is_available() first.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import heapq
+import multiprocessing
+import os
+import threading
+
+from django.conf import settings
+
+from . import batch_scoring
+from .scoring import _get_context, build_dependents_index, get_blocked_count
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # pragma: no cover - platforms without shared memory
+    SharedMemory = None
+
+np = batch_scoring.np
+
+# Shards per worker; a little more than one evens out uneven workers
+SHARDS_PER_WORKER = 2
+
+# Rows of the shared block: four input columns, then the rounded scores and
+# each shard's ranking (global positions, stored as exact float64 integers)
+DAYS, HOURS, IMPORTANCE, BLOCKED, SCORES, ORDER = range(6)
+ROWS = 6
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def is_available():
+    """Return True when NumPy and shared memory are available."""
+    return batch_scoring.is_available() and SharedMemory is not None
+
+
+def get_worker_count():
+    return getattr(settings, 'TASKS_PARALLEL_SCORING_WORKERS', None) or os.cpu_count() or 1
+
+
+def get_executor(workers):
+    """Return the process pool shared by all requests, created on first use."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # Spawned workers never inherit the server's threads or locks
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _score_shard(name, size, start, stop, context):
+    # Runs in a worker: score positions [start, stop) of the shared block
+    # and write back their rounded scores and shard ranking
+    shared = SharedMemory(name=name)
+    try:
+        block = np.ndarray((ROWS, size), dtype=np.float64, buffer=shared.buf)
+        raw_scores = batch_scoring.score_columns(
+            block[DAYS, start:stop].astype(np.int64),
+            block[HOURS, start:stop],
+            block[IMPORTANCE, start:stop],
+            block[BLOCKED, start:stop],
+            context
+        )
+        # Same correctly rounded scores as the scalar path
+        scores = np.array([round(score, 2) for score in raw_scores.tolist()], dtype=np.float64)
+        block[SCORES, start:stop] = scores
+        block[ORDER, start:stop] = batch_scoring.rank_scores(scores) + start
+        del block
+    finally:
+        shared.close()
+
+
+def _shard_bounds(size, shards):
+    step = -(-size // shards)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _score_shared(tasks, dependents_index, context, workers):
+    # Score every task across the pool; returns (scores, shard rankings)
+    size = len(tasks)
+    shared = SharedMemory(create=True, size=ROWS * size * 8)
+    try:
+        block = np.ndarray((ROWS, size), dtype=np.float64, buffer=shared.buf)
+        today = context.today
+        block[DAYS] = np.fromiter(((task.due_date - today).days for task in tasks), dtype=np.float64, count=size)
+        block[HOURS] = np.fromiter((task.estimated_hours for task in tasks), dtype=np.float64, count=size)
+        block[IMPORTANCE] = np.fromiter((task.importance for task in tasks), dtype=np.float64, count=size)
+        # Blocked counts are reduced over the whole list before sharding, so
+        # a dependent in one shard still counts for its blocker in another
+        block[BLOCKED] = np.fromiter(
+            (get_blocked_count(dependents_index, task.id) for task in tasks),
+            dtype=np.float64,
+            count=size
+        )
+
+        bounds = _shard_bounds(size, workers * SHARDS_PER_WORKER)
+        executor = get_executor(workers)
+        futures = [
+            executor.submit(_score_shard, shared.name, size, start, stop, context)
+            for start, stop in bounds
+        ]
+        for future in futures:
+            future.result()
+
+        scores = block[SCORES].tolist()
+        order = block[ORDER].astype(np.int64)
+        runs = [order[start:stop].tolist() for start, stop in bounds]
+        del block, order
+    finally:
+        shared.close()
+        shared.unlink()
+
+    for task, score in zip(tasks, scores):
+        task.priority_score = score
+    return scores, runs
+
+
+def _merge_runs(runs, scores):
+    # Each run is ordered by (-score, position); merging them lazily gives
+    # the global ranking, ties in input order
+    return heapq.merge(*runs, key=lambda position: (-scores[position], position))
+
+
+def score_tasks_parallel(tasks, context=None, dependents_index=None, workers=None):
+    """Score and rank tasks across a process pool; same contract as score_tasks."""
+    context = _get_context(context)
+    if dependents_index is None:
+        dependents_index = build_dependents_index(tasks)
+    if not tasks:
+        return []
+
+    scores, runs = _score_shared(tasks, dependents_index, context, workers or get_worker_count())
+    return [tasks[position] for position in _merge_runs(runs, scores)]
+
+
+def top_tasks_parallel(tasks, limit, context=None, dependents_index=None, workers=None):
+    """Return the `limit` best tasks in ranked order; same contract as select_top_tasks."""
+    context = _get_context(context)
+    if dependents_index is None:
+        dependents_index = build_dependents_index(tasks)
+    if not tasks or limit <= 0:
+        return []
+
+    scores, runs = _score_shared(tasks, dependents_index, context, workers or get_worker_count())
+    # The merge is lazy, so only the first `limit` positions are compared
+    return [tasks[position] for position in islice(_merge_runs(runs, scores), limit)]
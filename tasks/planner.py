@@ -0,0 +1,145 @@
+"""
+Capacity-aware day planner.
+
+Packs scored tasks into days of a fixed hour capacity. Tasks are taken in
+score order (the same ranking as score_tasks) from a heap of ready tasks,
+i.e. tasks whose blockers are all done, and laid end to end on a timeline of
+working hours, so a task longer than what is left of a day continues the
+next day. A task starts only after every task it depends on has finished.
+
+Each task enters and leaves the heap once and every day is closed once, so
+planning is O(n log n + horizon).
+"""
+import heapq
+from datetime import timedelta
+
+from .graph import DependencyGraph
+from .scoring import _get_context, score_tasks
+
+DEFAULT_DAILY_HOURS = 8
+DEFAULT_HORIZON_DAYS = 7
+MAX_HORIZON_DAYS = 366
+
+# Float slack when comparing summed hours
+HOURS_EPSILON = 1e-9
+
+
+class PlannedDay:
+    """Work planned for one day as (task, hours, completes) entries."""
+    __slots__ = ('date', 'entries', 'hours')
+
+    def __init__(self, date):
+        self.date = date
+        self.entries = []
+        self.hours = 0.0
+
+    def add(self, task, hours, completes):
+        self.entries.append((task, hours, completes))
+        self.hours += hours
+
+
+class Plan:
+    """
+    Result of plan_tasks.
+
+    days holds a PlannedDay for every day with work, in date order.
+    unscheduled lists ready tasks that did not fit in the remaining
+    capacity, in score order. blocked lists (task, blocker ids) for tasks
+    that never became ready because a blocker was unscheduled, blocked or
+    part of a dependency cycle.
+    """
+
+    def __init__(self, days, unscheduled, blocked, finish_dates, graph):
+        self.days = days
+        self.unscheduled = unscheduled
+        self.blocked = blocked
+        self.finish_dates = finish_dates
+        self.graph = graph
+
+    @property
+    def scheduled_count(self):
+        return len(self.finish_dates)
+
+
+def plan_tasks(tasks, daily_hours=DEFAULT_DAILY_HOURS, horizon_days=DEFAULT_HORIZON_DAYS,
+               context=None, dependents_index=None):
+    """
+    Plan tasks over horizon_days days of daily_hours each, starting on the
+    context's reference date. Tasks are scored as a side effect.
+    """
+    context = _get_context(context)
+    graph = DependencyGraph(tasks)
+
+    # Scores give the order in which ready tasks are taken; ties keep input
+    # order, exactly like the score_tasks ranking
+    score_tasks(tasks, context, dependents_index)
+    ready = [(-tasks[position].priority_score, position)
+             for position in range(len(tasks)) if not graph.in_degree[position]]
+    heapq.heapify(ready)
+
+    remaining_blockers = graph.in_degree[:]
+    offsets = graph.offsets
+    targets = graph.targets
+    capacity_left = daily_hours * horizon_days
+
+    days = []
+    day = None
+    day_number = 0
+    used = 0.0
+    unscheduled = []
+    finish_dates = {}
+
+    while ready:
+        _, position = heapq.heappop(ready)
+        task = tasks[position]
+        hours = task.estimated_hours
+
+        # Skip what cannot finish within the horizon and keep its capacity
+        # for smaller tasks further down the ranking
+        if hours > capacity_left + HOURS_EPSILON:
+            unscheduled.append(task)
+            continue
+        capacity_left -= hours
+
+        while True:
+            if day is None:
+                day = PlannedDay(context.today + timedelta(days=day_number))
+                days.append(day)
+            portion = min(hours, daily_hours - used)
+            hours -= portion
+            used += portion
+            completes = hours <= HOURS_EPSILON
+            day.add(task, portion, completes)
+            if used >= daily_hours - HOURS_EPSILON:
+                # Day is full; the next portion goes to the next day
+                day = None
+                day_number += 1
+                used = 0.0
+            if completes:
+                break
+        finish_dates[position] = days[-1].date
+
+        for edge in range(offsets[position], offsets[position + 1]):
+            dependent = targets[edge]
+            remaining_blockers[dependent] -= 1
+            if not remaining_blockers[dependent]:
+                heapq.heappush(ready, (-tasks[dependent].priority_score, dependent))
+
+    # Whatever never became ready waits on tasks that were not finished
+    blocked = []
+    for position, count in enumerate(remaining_blockers):
+        if not count:
+            continue
+        task = tasks[position]
+        waiting_on = []
+        for blocker_id in task.dependencies:
+            try:
+                blocker = graph.position_of.get(blocker_id)
+            except TypeError:
+                continue
+            if (blocker is not None and blocker_id != task.id
+                    and blocker not in finish_dates and blocker_id not in waiting_on):
+                waiting_on.append(blocker_id)
+        blocked.append((task, waiting_on))
+
+    return Plan(days, unscheduled, blocked, finish_dates, graph)
@@ -0,0 +1,273 @@
+"""
+Process-local ranked index of stored tasks.
+
+GET /api/tasks/ reads the backlog highest priority first. Instead of an
+ORDER BY on every call, the first read loads the tasks once into a list
+of rank keys kept sorted with bisect, plus an id -> task lookup. Top-k is
+then a slice and the rank of a task a binary search; the only query on
+the hot path is a primary-key read of the table's version stamp.
+
+The stamp is a TaskTableVersion row. post_save/post_delete on Task and the
+bulk paths (services.write_scores, the importer) increment it in the same
+transaction as their write, and once that transaction commits they patch
+the index or drop it. An index whose loaded version no longer matches the
+row has missed a change made elsewhere (another worker, a management
+command) and reloads on its next read. Raw SQL and QuerySet.update()
+bypass the signals and must call tasks_changed() themselves.
+"""
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Task, TaskTableVersion
+
+# Largest backlog kept in memory; bigger tables are read from the database
+# (0 disables the index)
+RANKED_INDEX_MAX_TASKS = 200_000
+
+# Score updates beyond this many rows reload the index instead of moving
+# each entry
+RANKED_INDEX_PATCH_LIMIT = 1000
+
+# Fields kept per task: everything serialize_stored_task reads
+RANKED_FIELDS = (
+    'id',
+    'title',
+    'due_date',
+    'estimated_hours',
+    'importance',
+    'dependencies',
+    'priority_score',
+    'created_at',
+)
+
+
+def rank_key(task):
+    # Task.Meta.ordering (score descending, then due date) with unscored
+    # tasks last and the id as the final tie-break
+    score = task.priority_score
+    return (score is None, -(score or 0.0), task.due_date, task.id)
+
+
+def ranked_queryset():
+    """The stored backlog in rank_key order."""
+    return Task.objects.order_by(F('priority_score').desc(nulls_last=True), 'due_date', 'id')
+
+
+def detached_copy(task):
+    # The index keeps its own copy so later edits to a caller's instance
+    # cannot move it out of order
+    fields = {field: getattr(task, field) for field in RANKED_FIELDS}
+    fields['dependencies'] = list(fields['dependencies'] or ())
+    return Task(**fields)
+
+
+def _version_rows(using=None):
+    return TaskTableVersion.objects.using(using).filter(pk=TaskTableVersion.SINGLETON_ID)
+
+
+def current_version(using=None):
+    """Return the stored version stamp (0 before the first change)."""
+    # Read on every index access, so plain SQL rather than a queryset:
+    # building one costs several times the lookup itself
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(TaskTableVersion._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT version FROM {table} WHERE id = %s', [TaskTableVersion.SINGLETON_ID])
+        row = cursor.fetchone()
+    return 0 if row is None else row[0]
+
+
+def bump_version(using=None):
+    """
+    Increment the stored version stamp and return its new value.
+
+    Runs in the caller's transaction, so the stamp changes exactly when
+    the write does and is rolled back with it.
+    """
+    if not _version_rows(using).update(version=F('version') + 1):
+        TaskTableVersion.objects.using(using).get_or_create(
+            pk=TaskTableVersion.SINGLETON_ID, defaults={'version': 1}
+        )
+    return current_version(using)
+
+
+class RankedIndex:
+    """
+    Stored tasks ordered by rank_key, loaded lazily.
+
+    _keys is sorted ascending, so position 0 is the highest priority task.
+    Each read compares the loaded version with the shared stamp first and
+    reloads when they differ.
+    """
+
+    def __init__(self, max_tasks):
+        self.max_tasks = max_tasks
+        self.loads = 0
+        self._keys = None
+        self._tasks = None
+        self._version = None
+        self._oversized_version = None
+        self._lock = threading.Lock()
+
+    def top(self, limit=None, offset=0):
+        """Return up to limit tasks in rank order, or None when the index is unavailable."""
+        with self._lock:
+            if not self._refresh():
+                return None
+            end = None if limit is None else offset + limit
+            return [self._tasks[key[-1]] for key in self._keys[offset:end]]
+
+    def rank_of(self, task_id):
+        """Return the 0-based rank of a stored task, or None if unknown or unavailable."""
+        with self._lock:
+            if not self._refresh():
+                return None
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            return bisect_left(self._keys, rank_key(task))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._keys) if self._refresh() else 0
+
+    def invalidate(self):
+        """Drop the loaded tasks; the next read reloads them."""
+        with self._lock:
+            self._keys = self._tasks = self._version = None
+
+    # The change methods take the version stamp their write was committed
+    # with (see bump_version)
+
+    def task_saved(self, version, task):
+        self._change(version, self._upsert, detached_copy(task))
+
+    def task_deleted(self, version, task_id):
+        self._change(version, self._remove, task_id)
+
+    def scores_written(self, version, scores):
+        if len(scores) > RANKED_INDEX_PATCH_LIMIT:
+            self.tasks_changed(version)
+        else:
+            self._change(version, self._set_scores, scores)
+
+    def tasks_changed(self, version):
+        """Record a change the index cannot patch in: reload on the next read."""
+        self._change(version, None)
+
+    def _refresh(self):
+        version = current_version()
+        if self._keys is not None and version == self._version:
+            return True
+        if version == self._oversized_version:
+            return False
+
+        # Read the stamp before the rows: a change committed meanwhile
+        # bumps it again and triggers another reload
+        tasks = list(ranked_queryset()[:self.max_tasks + 1])
+        self.loads += 1
+        if len(tasks) > self.max_tasks:
+            self._keys = self._tasks = self._version = None
+            self._oversized_version = version
+            return False
+
+        self._tasks = {task.id: task for task in tasks}
+        self._keys = [rank_key(task) for task in tasks]
+        # Already sorted by the query; this only guards against backend
+        # differences in float and NULL ordering
+        self._keys.sort()
+        self._version = version
+        self._oversized_version = None
+        return True
+
+    def _change(self, version, apply, *args):
+        with self._lock:
+            if apply is not None and self._keys is not None and version == self._version + 1:
+                # No other change since our load: patch in place
+                apply(*args)
+                self._version = version
+            else:
+                self._keys = self._tasks = self._version = None
+
+    def _remove(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            del self._keys[bisect_left(self._keys, rank_key(task))]
+
+    def _upsert(self, task):
+        self._remove(task.id)
+        self._tasks[task.id] = task
+        insort(self._keys, rank_key(task))
+
+    def _set_scores(self, scores):
+        for task_id, score in scores:
+            task = self._tasks.get(task_id)
+            if task is None:
+                continue
+            # Replaced rather than edited: earlier top() results may still
+            # be in use
+            del self._keys[bisect_left(self._keys, rank_key(task))]
+            task = self._tasks[task_id] = detached_copy(task)
+            task.priority_score = score
+            insort(self._keys, rank_key(task))
+
+
+_ranked_index = None
+_ranked_index_lock = threading.Lock()
+
+
+def get_ranked_index():
+    """Return the process-wide ranked index, or None when disabled."""
+    global _ranked_index
+    max_tasks = getattr(settings, 'TASKS_RANKED_INDEX_MAX_TASKS', RANKED_INDEX_MAX_TASKS)
+    if not max_tasks:
+        return None
+    with _ranked_index_lock:
+        if _ranked_index is None or _ranked_index.max_tasks != max_tasks:
+            _ranked_index = RankedIndex(max_tasks)
+        return _ranked_index
+
+
+def _on_commit(method_name, *args, using=None):
+    # Bump the stamp inside the write's transaction, then apply to the
+    # index only once the write is visible to other readers; a rolled-back
+    # transaction undoes the bump and never reaches the index
+    version = bump_version(using)
+    
+    def apply():
+        index = get_ranked_index()
+        if index is not None:
+            getattr(index, method_name)(version, *args)
+    transaction.on_commit(apply, using=using)
+
+
+def scores_written(scores, using=None):
+    """Record stored (task id, priority_score) pairs written without signals."""
+    _on_commit('scores_written', scores, using=using)
+
+
+def tasks_changed(using=None):
+    """Record a bulk insert, update or delete made without signals."""
+    _on_commit('tasks_changed', using=using)
+
+
+@receiver(post_save, sender=Task, dispatch_uid='tasks.ranking.task_saved')
+def task_saved(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        # Fixture loading: rows arrive unscored, reload instead
+        tasks_changed(using=using)
+        return
+    # Copy at commit time, after services has stored the final score
+    _on_commit('task_saved', instance, using=using)
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='tasks.ranking.task_deleted')
+def task_deleted(sender, instance, using=None, **kwargs):
+    _on_commit('task_deleted', instance.id, using=using)
+
@@ -0,0 +1,45 @@
+from django.utils import timezone
+
+
+class TaskRecord:
+    """
+    Lightweight, unsaved task used by the stateless scoring endpoints.
+
+    Exposes the same attributes and helper methods as tasks.models.Task that
+    the scoring module relies on, without the cost of a Django model
+    instance (field descriptors, init signals, _state and a per-instance
+    __dict__).
+    """
+    __slots__ = (
+        'id',
+        'title',
+        'due_date',
+        'estimated_hours',
+        'importance',
+        'dependencies',
+        'priority_score',
+        'score_breakdown',
+    )
+
+    def __init__(self, id=None, title='', due_date=None, estimated_hours=0.0,
+                 importance=1, dependencies=None, priority_score=None):
+        self.id = id
+        self.title = title
+        self.due_date = due_date
+        self.estimated_hours = estimated_hours
+        self.importance = importance
+        self.dependencies = dependencies if dependencies is not None else []
+        self.priority_score = priority_score
+        self.score_breakdown = None
+
+    def __repr__(self):
+        return f"<TaskRecord {self.id}: {self.title} (Due: {self.due_date})>"
+
+    def is_overdue(self):
+        """Check if the task is past its due date."""
+        return self.due_date < timezone.now().date()
+
+    def days_until_due(self):
+        """Calculate how many days until the task is due."""
+        delta = self.due_date - timezone.now().date()
+        return delta.days
@@ -1,11 +1,54 @@
-from datetime import datetime, date
+from django.conf import settings
 from django.utils import timezone
+import heapq
 import math
 
+# All scoring functions work on anything with the Task attributes: saved Task
+# models or lightweight tasks.records.TaskRecord. Dates are resolved against
+# a ScoringContext so a request reads the clock once.
 
-def calculate_urgency_score(task):
-    days_until_due = task.days_until_due()
-    
+# Batches at least this large are scored by the vectorized engine in
+# tasks/batch_scoring.py when NumPy is installed
+BATCH_SCORING_THRESHOLD = 500
+
+# Lists at least this large are sharded across a process pool by
+# tasks/parallel.py when NumPy and shared memory are available
+PARALLEL_SCORING_THRESHOLD = 200000
+
+# Upper bounds of the components that are expensive to compute; used to
+# prune tasks that cannot make the top-k
+MAX_URGENCY_SCORE = 100.0
+MAX_DEPENDENCY_SCORE = 50.0
+
+# Points per blocked task in the dependency score
+DEPENDENCY_POINTS_PER_TASK = 15
+
+# Exponent of the urgency decay for tasks due after tomorrow
+URGENCY_DECAY = 0.7
+
+# Weights of the components in the priority score. These and the other
+# scoring constants make up the built-in "default" profile; other profiles
+# are configured in TASKS_SCORING_PROFILES (see tasks/strategies.py)
+URGENCY_WEIGHT = 1.2
+IMPORTANCE_WEIGHT = 1.0
+EFFORT_WEIGHT = 0.5
+DEPENDENCY_WEIGHT = 0.3
+
+# Effort buckets as (max hours, score), checked in order
+EFFORT_BUCKETS = (
+    (2, 50.0),   # Quick tasks (< 2 hours) get a bonus
+    (8, 30.0),   # Medium tasks (2-8 hours) get moderate scores
+    (24, 15.0),  # Long tasks (8-24 hours) get lower scores
+)
+MIN_EFFORT_SCORE = 5.0  # Very long tasks get minimal effort score
+
+# Day offsets covered by each profile's precomputed urgency table; the decay
+# curve only depends on the integer day offset, so it is computed once per
+# profile rather than with a math.pow per task
+URGENCY_TABLE_DAYS = 366
+
+
+def urgency_for_days(days_until_due, decay=URGENCY_DECAY):
     # Overdue tasks get maximum urgency
     if days_until_due < 0:
         return 100.0
@@ -19,74 +62,212 @@ def calculate_urgency_score(task):
         return 90.0
     
     # For future tasks use exponential decay
-    urgency = 100 / math.pow(1 + days_until_due, 0.7)
+    urgency = 100 / math.pow(1 + days_until_due, decay)
     
     return round(urgency, 2)
 
 
-def calculate_importance_score(task):
+class ScoringContext:
+    """
+    Request-scoped scoring state.
+
+    Holds a single reference date so every task in a request is scored
+    against the same "today" (one clock read, no disagreement across a
+    midnight boundary), plus the scoring profile and its urgency and
+    effort lookup tables. Pass an explicit reference date for reproducible
+    scoring, and a profile or profile name to score with something other
+    than TASKS_SCORING_PROFILE.
+    """
+
+    def __init__(self, today=None, profile=None):
+        self.today = today if today is not None else timezone.now().date()
+        if profile is None or isinstance(profile, str):
+            from .strategies import get_profile
+            profile = get_profile(profile)
+        self.profile = profile
+        self.urgency_table = profile.urgency_table
+        self.effort_buckets = profile.effort_buckets
+        self.min_effort_score = profile.min_effort_score
+
+    def days_until_due(self, task):
+        """Days from the reference date to the task's due date."""
+        return (task.due_date - self.today).days
+
+    def is_overdue(self, task):
+        """Check if the task is past its due date on the reference date."""
+        return task.due_date < self.today
+
+    def urgency(self, days_until_due):
+        """Urgency score for a day offset, read from the lookup table."""
+        if days_until_due < 0:
+            return 100.0
+        if days_until_due < len(self.urgency_table):
+            return self.urgency_table[days_until_due]
+        return self.profile.urgency_for_days(days_until_due)
+
+    def effort(self, hours):
+        """Effort score for an hour estimate, read from the bucket table."""
+        for max_hours, score in self.effort_buckets:
+            if hours <= max_hours:
+                return score
+        return self.min_effort_score
+
+
+def _get_context(context):
+    return context if context is not None else ScoringContext()
+
+
+def calculate_urgency_score(task, context=None):
+    context = _get_context(context)
+    return context.urgency(context.days_until_due(task))
+
+
+def calculate_importance_score(task, context=None):
     return task.importance * 10.0
 
 
-def calculate_effort_score(task):
-    hours = task.estimated_hours
-    
-    # Quick tasks (< 2 hours) get a bonus
-    if hours <= 2:
-        return 50.0
-    
-    # Medium tasks (2-8 hours) get moderate scores
-    if hours <= 8:
-        return 30.0
+def calculate_effort_score(task, context=None):
+    return _get_context(context).effort(task.estimated_hours)
+
+
+def build_dependents_index(tasks):
+    # Map each blocker id to the ids of the tasks that list it as a dependency.
+    # Built once per batch so the dependency score is a dict lookup per task.
+    dependents = {}
     
-    # Long tasks (8-24 hours) get lower scores
-    if hours <= 24:
-        return 15.0
+    for task in tasks:
+        seen = set()
+        for blocker_id in task.dependencies or ():
+            # A task never blocks itself, and duplicates count once. A missing
+            # id matches no task; unsaved tasks all have id None
+            try:
+                if blocker_id is None or blocker_id == task.id or blocker_id in seen:
+                    continue
+                seen.add(blocker_id)
+            except TypeError:
+                # Unhashable ids can never match a task id
+                continue
+            dependents.setdefault(blocker_id, []).append(task.id)
     
-    # Very long tasks get minimal effort score
-    return 5.0
+    return dependents
+
 
+def get_blocked_count(dependents_index, task_id):
+    # Index values are the dependent ids, or a precomputed count (for
+    # example transitive counts from tasks.graph)
+    dependents = dependents_index.get(task_id)
+    if dependents is None:
+        return 0
+    if isinstance(dependents, int):
+        return dependents
+    return len(dependents)
 
-def calculate_dependency_score(task, all_tasks=None):
-    if all_tasks is None:
-        return 0.0
+
+def calculate_dependency_score(task, all_tasks=None, dependents_index=None, context=None):
+    if dependents_index is None:
+        if all_tasks is None:
+            return 0.0
+        dependents_index = build_dependents_index(all_tasks)
     
     # Count how many tasks list this task as a dependency
-    blocked_count = 0
-    
-    for other_task in all_tasks:
-        # Skip the task itself
-        if other_task.id == task.id:
-            continue
-        
-        # Check if this task is in the other task's dependencies
-        if task.id in other_task.dependencies:
-            blocked_count += 1
-    
-    # Each blocked task adds 15 points (max 50)
-    dependency_score = min(blocked_count * 15, 50.0)
+    blocked_count = get_blocked_count(dependents_index, task.id)
     
-    return dependency_score
+    # Each blocked task adds the profile's points (15 by default), capped
+    # (at 50 by default)
+    return _get_context(context).profile.dependency_score(blocked_count)
 
 
-def calculate_priority_score(task, all_tasks=None):
-    # Calculate individual components
-    urgency = calculate_urgency_score(task)
-    importance = calculate_importance_score(task)
-    effort = calculate_effort_score(task)
-    dependencies = calculate_dependency_score(task, all_tasks)
+def calculate_priority_score(task, all_tasks=None, dependents_index=None, context=None):
+    context = _get_context(context)
+    if dependents_index is None:
+        dependents_index = build_dependents_index(all_tasks) if all_tasks is not None else {}
     
-    # Weighted combination
-    # Urgency and importance are most critical
-    score = (urgency * 1.2 + importance * 1.0 + effort * 0.5 + dependencies * 0.3)
-    
-    return round(score, 2)
+    # The profile's compiled scorer computes all four components inline
+    return context.profile.score_task(task, dependents_index, context.today)
+
+
+class ScoreBreakdown:
+    """
+    The components of one task's priority score, kept from the scoring pass.
+
+    Explanations and explain=true responses are built from these stored
+    values instead of re-deriving the due-day offset and buckets. The
+    weights are those of the profile the task was scored with.
+    """
+    __slots__ = (
+        'days_until_due',
+        'blocked_count',
+        'urgency',
+        'importance',
+        'effort',
+        'dependencies',
+        'profile',
+        'score',
+    )
+
+    def __init__(self, days_until_due, blocked_count, urgency, importance, effort, dependencies, profile):
+        self.days_until_due = days_until_due
+        self.blocked_count = blocked_count
+        self.urgency = urgency
+        self.importance = importance
+        self.effort = effort
+        self.dependencies = dependencies
+        self.profile = profile
+        self.score = profile.combine(urgency, importance, effort, dependencies)
+
+    def components(self):
+        """(name, score, weight) of each component, in formula order."""
+        scores = (self.urgency, self.importance, self.effort, self.dependencies)
+        return tuple((name, score, weight) for (name, weight), score in zip(self.profile.weights(), scores))
+
+
+def score_breakdown(task, dependents_index, context):
+    # Same values as calculate_priority_score, with each one computed once
+    days_until_due = context.days_until_due(task)
+    blocked_count = get_blocked_count(dependents_index, task.id)
+    return ScoreBreakdown(
+        days_until_due,
+        blocked_count,
+        context.urgency(days_until_due),
+        calculate_importance_score(task, context),
+        calculate_effort_score(task, context),
+        context.profile.dependency_score(blocked_count),
+        context.profile
+    )
 
 
-def score_tasks(tasks):
+def score_tasks(tasks, context=None, dependents_index=None, explain=False):
+    # With explain=True every task also gets a score_breakdown
+    context = _get_context(context)
+    
+    # Build the reverse-dependency index once for the whole batch
+    if dependents_index is None:
+        dependents_index = build_dependents_index(tasks)
+    
+    # Very large lists are scored in parallel, large ones through the
+    # columnar NumPy engine. The parallel engine only keeps the scores.
+    if not explain and len(tasks) >= getattr(settings, 'TASKS_PARALLEL_SCORING_THRESHOLD',
+                                             PARALLEL_SCORING_THRESHOLD):
+        from . import parallel
+        if parallel.is_available():
+            return parallel.score_tasks_parallel(tasks, context, dependents_index)
+    
+    threshold = getattr(settings, 'TASKS_BATCH_SCORING_THRESHOLD', BATCH_SCORING_THRESHOLD)
+    if len(tasks) >= threshold:
+        from . import batch_scoring
+        if batch_scoring.is_available():
+            return batch_scoring.score_tasks_batch(tasks, dependents_index, context, explain)
+    
     # Calculate scores for all tasks
-    for task in tasks:
-        task.priority_score = calculate_priority_score(task, tasks)
+    if explain:
+        for task in tasks:
+            breakdown = task.score_breakdown = score_breakdown(task, dependents_index, context)
+            task.priority_score = breakdown.score
+    else:
+        score_task = context.profile.score_task
+        today = context.today
+        for task in tasks:
+            task.priority_score = score_task(task, dependents_index, today)
     
     # Sort by priority score (descending)
     sorted_tasks = sorted(tasks, key=lambda t: t.priority_score, reverse=True)
@@ -94,27 +275,132 @@ def score_tasks(tasks):
     return sorted_tasks
 
 
-def get_top_tasks_for_today(tasks, limit=3):
-    # Score all tasks
-    scored_tasks = score_tasks(tasks)
+# Alternative orderings of a scored list as (key, reverse); 'priority' is
+# the score ranking itself
+SORT_STRATEGIES = {
+    # Deadline Driven: Sort by due date (earliest first)
+    'deadline': (lambda t: t.due_date, False),
+    'due_date': (lambda t: t.due_date, False),
+    # Fastest Wins: Sort by estimated hours (quickest first)
+    'fastest_wins': (lambda t: t.estimated_hours, False),
+    # Importance First: Sort by importance level (highest first)
+    'importance': (lambda t: t.importance, True),
+}
+SORT_OPTIONS = ('priority',) + tuple(SORT_STRATEGIES)
+
+
+def ordering_permutation(ranked_tasks, sort_by):
+    # Positions in ranked_tasks for the requested ordering. Stable, so ties
+    # keep their priority order, exactly like re-sorting the ranked list.
+    strategy = SORT_STRATEGIES.get(sort_by)
+    if strategy is None:
+        # 'priority' - already sorted by priority score from score_tasks()
+        return list(range(len(ranked_tasks)))
     
-    # Get top N tasks
-    top_tasks = scored_tasks[:limit]
+    key, reverse = strategy
+    keys = [key(task) for task in ranked_tasks]
+    return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+
+
+def order_tasks(ranked_tasks, sort_by):
+    if not isinstance(sort_by, str) or sort_by not in SORT_STRATEGIES:
+        return ranked_tasks
+    return [ranked_tasks[i] for i in ordering_permutation(ranked_tasks, sort_by)]
+
+
+def select_top_tasks(tasks, limit=3, context=None, dependents_index=None, explain=False):
+    # Return the `limit` highest-scoring tasks in ranked order, exactly as
+    # score_tasks(tasks)[:limit] would, without sorting the whole list.
+    # Only tasks that make it into the top-k are guaranteed to have a fresh
+    # priority_score (and, with explain=True, a score_breakdown); pruned
+    # tasks are never fully scored.
+    if limit <= 0:
+        return []
+    
+    context = _get_context(context)
+    if dependents_index is None:
+        dependents_index = build_dependents_index(tasks)
+    
+    if len(tasks) >= getattr(settings, 'TASKS_PARALLEL_SCORING_THRESHOLD', PARALLEL_SCORING_THRESHOLD):
+        from . import parallel
+        if parallel.is_available():
+            top_tasks = parallel.top_tasks_parallel(tasks, limit, context, dependents_index)
+            # Workers only return scores; break down just the winners
+            if explain:
+                for task in top_tasks:
+                    task.score_breakdown = score_breakdown(task, dependents_index, context)
+            return top_tasks
+    
+    threshold = getattr(settings, 'TASKS_BATCH_SCORING_THRESHOLD', BATCH_SCORING_THRESHOLD)
+    if len(tasks) >= threshold:
+        from . import batch_scoring
+        if batch_scoring.is_available():
+            return batch_scoring.top_tasks_batch(tasks, dependents_index, limit, context, explain)
+    
+    # Min-heap of (score, -position, task, breakdown); the root is the
+    # current k-th best. Earlier positions win ties, matching the stable
+    # sort in score_tasks.
+    profile = context.profile
+    score_task = profile.score_task
+    today = context.today
+    heap = []
+    for position, task in enumerate(tasks):
+        # Skip tasks that cannot beat the k-th score even with maximum
+        # urgency and dependency scores
+        if len(heap) == limit:
+            best_possible = profile.combine(
+                MAX_URGENCY_SCORE,
+                calculate_importance_score(task, context),
+                calculate_effort_score(task, context),
+                profile.max_dependency_score
+            )
+            if best_possible <= heap[0][0]:
+                continue
+        
+        breakdown = None
+        if explain:
+            breakdown = score_breakdown(task, dependents_index, context)
+            task.priority_score = breakdown.score
+        else:
+            task.priority_score = score_task(task, dependents_index, today)
+        
+        entry = (task.priority_score, -position, task, breakdown)
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    heap.sort(key=lambda entry: entry[:2], reverse=True)
+    if explain:
+        for _, _, task, breakdown in heap:
+            task.score_breakdown = breakdown
+    return [task for _, _, task, _ in heap]
+
+
+def get_top_tasks_for_today(tasks, limit=3, context=None, dependents_index=None):
+    context = _get_context(context)
+    
+    # Select the top N tasks without ranking the whole list, keeping their
+    # score components for the explanations
+    top_tasks = select_top_tasks(tasks, limit, context, dependents_index, explain=True)
     
     # Generate explanations
     results = []
     for task in top_tasks:
-        explanation = generate_task_explanation(task)
+        explanation = generate_task_explanation(task, context, task.score_breakdown)
         results.append((task, explanation))
     
     return results
 
 
-def generate_task_explanation(task):
+def generate_task_explanation(task, context=None, breakdown=None):
     reasons = []
     
-    # Check urgency
-    days = task.days_until_due()
+    # Check urgency, from the scoring pass when its breakdown is given
+    if breakdown is not None:
+        days = breakdown.days_until_due
+    else:
+        days = _get_context(context).days_until_due(task)
     if days < 0:
         reasons.append(f"⚠️ OVERDUE by {abs(days)} day(s)")
     elif days == 0:
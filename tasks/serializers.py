@@ -0,0 +1,206 @@
+"""
+Response encoders for scored tasks.
+
+Each output format of the task endpoints is built here from the scored
+task records and the request's ScoringContext.
+"""
+import json
+
+from .scoring import generate_task_explanation
+from .snapshots import encode_cursor
+
+LARGE_TASK_HOURS = 24
+LARGE_TASK_RECOMMENDATION = (
+    "💡 Tip: This is a large task. Consider breaking it down into smaller "
+    "sub-tasks (e.g., 4-8 hours each) to improve flow."
+)
+
+# Scored tasks encoded per NDJSON chunk
+NDJSON_CHUNK_SIZE = 500
+
+
+def get_recommendation(task):
+    """Return the advice shown for a task, or None."""
+    if task.estimated_hours > LARGE_TASK_HOURS:
+        return LARGE_TASK_RECOMMENDATION
+    return None
+
+
+def serialize_breakdown(breakdown):
+    """Build the per-component representation of a ScoreBreakdown."""
+    return {
+        'days_until_due': breakdown.days_until_due,
+        'blocked_count': breakdown.blocked_count,
+        'components': {
+            name: {'score': score, 'weight': weight, 'contribution': round(score * weight, 2)}
+            for name, score, weight in breakdown.components()
+        }
+    }
+
+
+def serialize_explanation(task, context):
+    """Build the explain=true fields of a task scored with explain=True."""
+    breakdown = task.score_breakdown
+    return {
+        'explanation': generate_task_explanation(task, context, breakdown),
+        'score_breakdown': serialize_breakdown(breakdown)
+    }
+
+
+def serialize_task(task, context, explain=False):
+    """Build the /analyze/ representation of one scored task."""
+    if explain:
+        return {**serialize_task(task, context), **serialize_explanation(task, context)}
+    return {
+        'title': task.title,
+        'due_date': task.due_date.isoformat(),
+        'estimated_hours': task.estimated_hours,
+        'importance': task.importance,
+        'dependencies': task.dependencies,
+        'priority_score': task.priority_score,
+        'days_until_due': context.days_until_due(task),
+        'is_overdue': context.is_overdue(task),
+        'recommendation': get_recommendation(task)
+    }
+
+
+def serialize_page(snapshot, offset, page_size):
+    """Build one page of a stored ranking, with the cursor of the next page."""
+    tasks = snapshot.tasks[offset:offset + page_size]
+    next_offset = offset + len(tasks)
+    return {
+        'snapshot_id': snapshot.id,
+        'expires_at': snapshot.expires_at.isoformat(),
+        'count': len(snapshot.tasks),
+        'offset': offset,
+        'tasks': [serialize_task(task, snapshot.context, snapshot.explain) for task in tasks],
+        'next_cursor': encode_cursor(next_offset) if next_offset < len(snapshot.tasks) else None
+    }
+
+
+def serialize_stored_task(task, context):
+    """Build the representation of a persisted task, including its id."""
+    return {
+        'id': task.id,
+        **serialize_task(task, context),
+        'created_at': task.created_at.isoformat() if task.created_at else None
+    }
+
+
+def serialize_columnar(tasks, ranked_tasks, context, orderings=None, explain=False):
+    """
+    Build the compact columnar /analyze/ representation.
+
+    Each field is one array in input order, `order` lists input positions
+    in ranked order, and recommendation strings are interned: the
+    recommendation column holds an index into `recommendations` or None.
+    orderings, when given, maps names to permutations of ranked_tasks and
+    is returned as `orderings` in terms of input positions. explain adds
+    `explanation` and `score_breakdown` columns.
+    """
+    positions = {id(task): position for position, task in enumerate(tasks)}
+    recommendations = []
+    recommendation_ids = {}
+    recommendation_column = []
+    
+    for task in tasks:
+        recommendation = get_recommendation(task)
+        if recommendation is not None:
+            if recommendation not in recommendation_ids:
+                recommendation_ids[recommendation] = len(recommendations)
+                recommendations.append(recommendation)
+            recommendation = recommendation_ids[recommendation]
+        recommendation_column.append(recommendation)
+    
+    ranked_positions = [positions[id(task)] for task in ranked_tasks]
+    columnar = {
+        'columns': {
+            'title': [task.title for task in tasks],
+            'due_date': [task.due_date.isoformat() for task in tasks],
+            'estimated_hours': [task.estimated_hours for task in tasks],
+            'importance': [task.importance for task in tasks],
+            'dependencies': [task.dependencies for task in tasks],
+            'priority_score': [task.priority_score for task in tasks],
+            'days_until_due': [context.days_until_due(task) for task in tasks],
+            'is_overdue': [context.is_overdue(task) for task in tasks],
+            'recommendation': recommendation_column
+        },
+        'order': ranked_positions,
+        'recommendations': recommendations
+    }
+    if explain:
+        explanations = [serialize_explanation(task, context) for task in tasks]
+        for field in ('explanation', 'score_breakdown'):
+            columnar['columns'][field] = [explanation[field] for explanation in explanations]
+    if orderings is not None:
+        columnar['orderings'] = {
+            name: [ranked_positions[i] for i in permutation]
+            for name, permutation in orderings.items()
+        }
+    return columnar
+
+
+def iter_ndjson(header, tasks, context, chunk_size=NDJSON_CHUNK_SIZE, explain=False):
+    """
+    Yield a header line followed by one scored task per line.
+
+    Tasks are serialized lazily and encoded chunk_size lines at a time, so
+    no full list of response dicts or single large string is ever built.
+    """
+    yield (json.dumps(header) + '\n').encode()
+    
+    lines = []
+    for task in tasks:
+        lines.append(json.dumps(serialize_task(task, context, explain)))
+        if len(lines) >= chunk_size:
+            lines.append('')
+            yield '\n'.join(lines).encode()
+            lines = []
+    
+    if lines:
+        lines.append('')
+        yield '\n'.join(lines).encode()
+
+
+def serialize_plan(plan, context):
+    """
+    Build the /plan/ representation. Tasks are identified by their 1-based
+    position, the ids dependencies refer to.
+    """
+    days = []
+    for day in plan.days:
+        entries = []
+        for task, hours, completes in day.entries:
+            entry = {
+                'id': task.id,
+                'title': task.title,
+                'hours': round(hours, 2),
+                'priority_score': task.priority_score,
+                'completes': completes
+            }
+            if completes:
+                entry['late'] = day.date > task.due_date
+            entries.append(entry)
+        days.append({
+            'date': day.date.isoformat(),
+            'planned_hours': round(day.hours, 2),
+            'tasks': entries
+        })
+    
+    return {
+        'scheduled_count': plan.scheduled_count,
+        'days': days,
+        'unscheduled': [
+            {
+                'id': task.id,
+                'title': task.title,
+                'estimated_hours': task.estimated_hours,
+                'priority_score': task.priority_score
+            }
+            for task in plan.unscheduled
+        ],
+        'blocked': [
+            {'id': task.id, 'title': task.title, 'waiting_on': waiting_on}
+            for task, waiting_on in plan.blocked
+        ]
+    }
@@ -0,0 +1,235 @@
+"""
+Persistence operations for stored tasks.
+
+Creating, updating or deleting a task keeps the TaskDependency index in
+sync and re-scores only the tasks whose priority_score can change: the
+task itself and the blockers whose blocked count moved. rescore_all_tasks
+refreshes every stored score, for when the date rolls over.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from . import ranking
+from .models import Task, TaskDependency
+from .records import TaskRecord
+from .scoring import BATCH_SCORING_THRESHOLD, ScoringContext, calculate_priority_score
+
+RESCORE_BATCH_SIZE = 5000
+
+
+def blocker_ids_for(task):
+    """Return the distinct ids a task depends on, excluding itself."""
+    return {
+        blocker_id for blocker_id in task.dependencies or ()
+        if isinstance(blocker_id, int) and not isinstance(blocker_id, bool) and blocker_id != task.id
+    }
+
+
+def sync_dependency_links(task):
+    """Rewrite the TaskDependency rows for one task from its dependencies."""
+    TaskDependency.objects.filter(dependent=task).delete()
+    TaskDependency.objects.bulk_create([
+        TaskDependency(dependent=task, blocker_id=blocker_id)
+        for blocker_id in blocker_ids_for(task)
+    ])
+
+
+def stored_dependents_index(task_ids):
+    """Build the blocker id -> dependent ids index for the given tasks only."""
+    dependents_index = {}
+    links = TaskDependency.objects.filter(blocker_id__in=task_ids).values_list('blocker_id', 'dependent_id')
+    for blocker_id, dependent_id in links:
+        dependents_index.setdefault(blocker_id, []).append(dependent_id)
+    return dependents_index
+
+
+def write_scores(tasks):
+    """
+    Store priority_score for the given tasks with a single executemany.
+
+    Equivalent to bulk_update(tasks, ['priority_score']) but without
+    building a CASE expression per row, which dominates large rescoring runs.
+    Sends no signals, so the ranked index is told directly.
+    """
+    if not tasks:
+        return
+    table = connection.ops.quote_name(Task._meta.db_table)
+    scores = [(task.priority_score, task.id) for task in tasks]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'UPDATE {table} SET priority_score = %s WHERE id = %s', scores)
+    ranking.scores_written([(task_id, score) for score, task_id in scores])
+
+
+def rescore_tasks(task_ids, context=None):
+    """
+    Recompute and store priority scores for the given task ids.
+
+    Only rows whose score actually changed are written. Returns the
+    re-scored tasks.
+    """
+    task_ids = set(task_ids)
+    if not task_ids:
+        return []
+    
+    context = context or ScoringContext()
+    tasks = list(Task.objects.filter(id__in=task_ids))
+    dependents_index = stored_dependents_index(task_ids)
+    
+    changed = []
+    for task in tasks:
+        score = calculate_priority_score(task, dependents_index=dependents_index, context=context)
+        if score != task.priority_score:
+            task.priority_score = score
+            changed.append(task)
+    
+    write_scores(changed)
+    return tasks
+
+
+def create_task(task, context=None):
+    """Save a new, validated task and re-score it and the tasks it blocks on."""
+    with transaction.atomic():
+        task.save()
+        sync_dependency_links(task)
+        rescore_tasks({task.id} | blocker_ids_for(task), context)
+        task.refresh_from_db(fields=['priority_score'])
+    return task
+
+
+def update_task(task, previous_blocker_ids, context=None):
+    """
+    Save an edited, validated task.
+
+    Blockers gained or lost since previous_blocker_ids have their blocked
+    count changed, so they are re-scored along with the task itself.
+    """
+    with transaction.atomic():
+        task.save()
+        blocker_ids = blocker_ids_for(task)
+        if blocker_ids != previous_blocker_ids:
+            sync_dependency_links(task)
+        rescore_tasks({task.id} | (blocker_ids ^ previous_blocker_ids), context)
+        task.refresh_from_db(fields=['priority_score'])
+    return task
+
+
+def delete_task(task, context=None):
+    """Delete a task and re-score the tasks it no longer counts against."""
+    with transaction.atomic():
+        blocker_ids = blocker_ids_for(task)
+        task.delete()
+        rescore_tasks(blocker_ids, context)
+
+
+class RescoreResult:
+    """Counters from one full rescoring run."""
+
+    def __init__(self):
+        self.scanned = 0
+        self.changed = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'scanned': self.scanned,
+            'changed': self.changed,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def iter_blocked_counts(chunk_size):
+    """Yield (blocker id, blocked count) pairs in blocker id order from one aggregate query."""
+    return (
+        TaskDependency.objects
+        .values('blocker_id')
+        .annotate(blocked=Count('dependent_id'))
+        .order_by('blocker_id')
+        .values_list('blocker_id', 'blocked')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def rescore_all_tasks(batch_size=RESCORE_BATCH_SIZE, context=None, progress=None, dry_run=False):
+    """
+    Recompute every stored priority_score against one reference date.
+
+    Tasks are streamed in id order alongside the per-blocker counts from a
+    single aggregate query, merged like two sorted lists, so memory stays
+    bounded by batch_size however many rows there are. Each batch is
+    scored together and only the rows whose score changed are written,
+    one transaction per batch. progress, if given, is called with the
+    running RescoreResult after every batch.
+    """
+    context = context or ScoringContext()
+    result = RescoreResult()
+    started = time.perf_counter()
+    
+    rows = (
+        Task.objects
+        .order_by('id')
+        .values_list('id', 'due_date', 'estimated_hours', 'importance', 'priority_score')
+        .iterator(chunk_size=batch_size)
+    )
+    counts = iter_blocked_counts(batch_size)
+    count = next(counts, None)
+    
+    batch = []
+    blocked_counts = {}
+    for task_id, due_date, estimated_hours, importance, priority_score in rows:
+        while count is not None and count[0] < task_id:
+            count = next(counts, None)
+        if count is not None and count[0] == task_id:
+            blocked_counts[task_id] = count[1]
+        
+        batch.append(TaskRecord(
+            id=task_id,
+            due_date=due_date,
+            estimated_hours=estimated_hours,
+            importance=importance,
+            priority_score=priority_score
+        ))
+        if len(batch) >= batch_size:
+            _rescore_batch(batch, blocked_counts, context, result, dry_run)
+            batch = []
+            blocked_counts = {}
+            result.elapsed = time.perf_counter() - started
+            if progress:
+                progress(result)
+    
+    if batch:
+        _rescore_batch(batch, blocked_counts, context, result, dry_run)
+    
+    result.elapsed = time.perf_counter() - started
+    if progress:
+        progress(result)
+    return result
+
+
+def _rescore_batch(tasks, blocked_counts, context, result, dry_run):
+    # blocked_counts maps task ids to counts, which the scorers accept in
+    # place of dependent id lists
+    previous_scores = [task.priority_score for task in tasks]
+    
+    threshold = getattr(settings, 'TASKS_BATCH_SCORING_THRESHOLD', BATCH_SCORING_THRESHOLD)
+    from . import batch_scoring
+    if len(tasks) >= threshold and batch_scoring.is_available():
+        batch_scoring.assign_scores(tasks, blocked_counts, context)
+    else:
+        for task in tasks:
+            task.priority_score = calculate_priority_score(task, dependents_index=blocked_counts, context=context)
+    
+    changed = [task for task, previous in zip(tasks, previous_scores) if task.priority_score != previous]
+    if changed and not dry_run:
+        with transaction.atomic():
+            write_scores(changed)
+    
+    result.scanned += len(tasks)
+    result.changed += len(changed)
@@ -0,0 +1,174 @@
+"""
+Server-side scored snapshots for paginated /analyze/ results.
+
+A paged /analyze/ request (one with `page_size`) keeps its ranked task
+records in a SnapshotStore under a random id and returns only the first
+page plus a cursor. Later pages are sliced from the stored ranking by
+GET /api/tasks/snapshots/<id>/ without re-validating or re-scoring.
+Snapshots never change while stored, so cursors stay valid until the
+snapshot expires (a short TTL) or is evicted least-recently-used past
+TASKS_SNAPSHOT_MAX_BYTES. A delta update (tasks/deltas.py) takes the
+snapshot out of the store, edits it and stores it again under a new id.
+
+Snapshots live in the memory of the process that created them. Their ids
+start with that process's worker tag, so a page or delta request that a
+load balancer sends to another worker is recognised (and answered with
+421 Misdirected Request) rather than reported as expired. Deployments
+with several workers need sticky routing for paged clients.
+"""
+import os
+import secrets
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import LRUCache
+
+# Default memory cap for stored rankings (32 MiB)
+SNAPSHOT_MAX_BYTES = 32 * 1024 * 1024
+
+# Seconds a snapshot can be paged through after it was created
+SNAPSHOT_TTL_SECONDS = 600
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Rough in-memory cost of one stored task record, plus its score breakdown
+# and the lookup tables delta updates build
+RECORD_BYTES = 320
+BREAKDOWN_BYTES = 120
+DELTA_INDEX_BYTES = 160
+
+
+class Snapshot:
+    """
+    A stored ranking: scored task records in response order.
+
+    by_id, dependents and next_id are built by the first delta update.
+    """
+    __slots__ = (
+        'id',
+        'tasks',
+        'context',
+        'explain',
+        'sort_by',
+        'dependency_mode',
+        'expires_at',
+        'by_id',
+        'dependents',
+        'next_id',
+    )
+
+    def __init__(self, id, tasks, context, explain, sort_by, dependency_mode, expires_at):
+        self.id = id
+        self.tasks = tasks
+        self.context = context
+        self.explain = explain
+        self.sort_by = sort_by
+        self.dependency_mode = dependency_mode
+        self.expires_at = expires_at
+        self.by_id = None
+        self.dependents = None
+        self.next_id = None
+
+    def estimated_size(self, task_count=None):
+        """Rough memory held by the snapshot (or by task_count of its tasks), in bytes."""
+        per_task = RECORD_BYTES
+        if self.explain:
+            per_task += BREAKDOWN_BYTES
+        if self.by_id is not None:
+            per_task += DELTA_INDEX_BYTES
+        return (len(self.tasks) if task_count is None else task_count) * per_task
+
+
+_worker = (None, None)
+
+
+def worker_tag():
+    """Return this process's tag, the prefix of every snapshot id it creates."""
+    # Keyed on the pid: workers forked from a preloaded parent get their own
+    global _worker
+    pid = os.getpid()
+    if _worker[0] != pid:
+        _worker = (pid, secrets.token_hex(4))
+    return _worker[1]
+
+
+def is_local_snapshot(snapshot_id):
+    """Whether snapshot_id was created by this process."""
+    return snapshot_id.partition('-')[0] == worker_tag()
+
+
+def encode_cursor(offset):
+    """Return the opaque cursor for the page starting at offset."""
+    return str(offset)
+
+
+def decode_cursor(cursor, snapshot):
+    """Return the offset a cursor points at; ValueError when it is invalid."""
+    if cursor is None:
+        return 0
+    if not cursor.isdigit() or int(cursor) > len(snapshot.tasks):
+        raise ValueError('Invalid cursor')
+    return int(cursor)
+
+
+def get_page_size(value):
+    """Validate a requested page size; ValueError when it is out of range."""
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_PAGE_SIZE:
+        raise ValueError(f'page_size must be an integer between 1 and {MAX_PAGE_SIZE}')
+    return value
+
+
+def parse_page_size(value):
+    """Validate a page size given as a query string parameter."""
+    return get_page_size(int(value) if value.isdigit() else None)
+
+
+class SnapshotStore(LRUCache):
+    """LRU store of Snapshots, capped by their estimated size in bytes."""
+
+    def create(self, tasks, context, explain=False, sort_by='priority', dependency_mode='direct'):
+        """Store a ranked list of tasks; returns its Snapshot, or None if it cannot fit."""
+        snapshot = Snapshot(None, tasks, context, explain, sort_by, dependency_mode, None)
+        return self.store(snapshot)
+
+    def store(self, snapshot):
+        """Store a snapshot under a fresh id and expiry; None if it cannot fit."""
+        size = snapshot.estimated_size()
+        if size > self.max_bytes:
+            return None
+        ttl = getattr(settings, 'TASKS_SNAPSHOT_TTL_SECONDS', SNAPSHOT_TTL_SECONDS)
+        snapshot.id = f'{worker_tag()}-{secrets.token_urlsafe(16)}'
+        snapshot.expires_at = timezone.now() + timedelta(seconds=ttl)
+        self.set(snapshot.id, snapshot, size, snapshot.expires_at)
+        return snapshot
+
+    def restore(self, snapshot):
+        """Put a taken, unchanged snapshot back under its id and expiry."""
+        self.set(snapshot.id, snapshot, snapshot.estimated_size(), snapshot.expires_at)
+
+    def take(self, snapshot_id):
+        """Remove and return a live snapshot, or None; one caller wins a race."""
+        snapshot = self.pop(snapshot_id)
+        if snapshot is None or snapshot.expires_at <= timezone.now():
+            return None
+        return snapshot
+
+
+_snapshot_store = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Return the process-wide snapshot store, or None when disabled."""
+    global _snapshot_store
+    max_bytes = getattr(settings, 'TASKS_SNAPSHOT_MAX_BYTES', SNAPSHOT_MAX_BYTES)
+    if not max_bytes:
+        return None
+    with _snapshot_store_lock:
+        if _snapshot_store is None or _snapshot_store.max_bytes != max_bytes:
+            _snapshot_store = SnapshotStore(max_bytes)
+        return _snapshot_store
@@ -0,0 +1,290 @@
+"""
+Named scoring profiles, validated and compiled once.
+
+A profile sets the component weights, the urgency decay exponent, the
+effort buckets and the dependency points and cap. The built-in "default"
+profile is made of the constants in tasks/scoring.py. The
+TASKS_SCORING_PROFILES setting adds more profiles, as {name: spec}, where
+a spec overrides any of the default's fields:
+
+    {
+        'weights': {'urgency': 1.2, 'importance': 1.0, 'effort': 0.5, 'dependencies': 0.3},
+        'urgency_decay': 0.7,
+        'effort_buckets': [[2, 50], [8, 30], [24, 15]],
+        'min_effort_score': 5,
+        'dependency_points': 15,
+        'max_dependency_score': 50,
+    }
+
+A spec is checked the first time any profile is requested. It is then
+compiled into a ScoringProfile: the urgency curve becomes a lookup table
+and everything else is bound into a scoring function made for that
+profile. The default profile is compiled the same way, so all profiles
+run the same code at the same speed, and nothing in the per-task loop
+reads the configuration. Requests choose a profile by name; when they
+give none, TASKS_SCORING_PROFILE is used.
+"""
+import math
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .scoring import (
+    DEPENDENCY_POINTS_PER_TASK,
+    DEPENDENCY_WEIGHT,
+    EFFORT_BUCKETS,
+    EFFORT_WEIGHT,
+    IMPORTANCE_WEIGHT,
+    MAX_DEPENDENCY_SCORE,
+    MAX_URGENCY_SCORE,
+    MIN_EFFORT_SCORE,
+    URGENCY_DECAY,
+    URGENCY_TABLE_DAYS,
+    URGENCY_WEIGHT,
+    urgency_for_days
+)
+
+DEFAULT_PROFILE = 'default'
+
+DEFAULT_SPEC = {
+    'weights': {
+        'urgency': URGENCY_WEIGHT,
+        'importance': IMPORTANCE_WEIGHT,
+        'effort': EFFORT_WEIGHT,
+        'dependencies': DEPENDENCY_WEIGHT,
+    },
+    'urgency_decay': URGENCY_DECAY,
+    'effort_buckets': [list(bucket) for bucket in EFFORT_BUCKETS],
+    'min_effort_score': MIN_EFFORT_SCORE,
+    'dependency_points': DEPENDENCY_POINTS_PER_TASK,
+    'max_dependency_score': MAX_DEPENDENCY_SCORE,
+}
+
+
+def _number(name, field, value, positive=False):
+    # Weights and scores must keep the pruning bounds in select_top_tasks
+    # valid, so negative values are rejected as well
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ImproperlyConfigured(f'Scoring profile "{name}": {field} must be a number')
+    if value < 0 or (positive and value == 0):
+        raise ImproperlyConfigured(
+            f'Scoring profile "{name}": {field} must be {"positive" if positive else "zero or more"}'
+        )
+    return value
+
+
+def validate_spec(name, spec):
+    """Return the complete, normalized spec for a profile; ImproperlyConfigured if invalid."""
+    if not isinstance(spec, dict):
+        raise ImproperlyConfigured(f'Scoring profile "{name}" must be a dict')
+    unknown = set(spec) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ImproperlyConfigured(f'Scoring profile "{name}": unknown fields {", ".join(sorted(unknown))}')
+    merged = {**DEFAULT_SPEC, **spec}
+
+    weights = merged['weights']
+    if not isinstance(weights, dict) or set(weights) - set(DEFAULT_SPEC['weights']):
+        raise ImproperlyConfigured(
+            f'Scoring profile "{name}": weights must map {", ".join(DEFAULT_SPEC["weights"])} to numbers'
+        )
+    weights = {
+        component: _number(name, f'weights.{component}', weights.get(component, default))
+        for component, default in DEFAULT_SPEC['weights'].items()
+    }
+
+    buckets = merged['effort_buckets']
+    if not isinstance(buckets, (list, tuple)) or not buckets:
+        raise ImproperlyConfigured(f'Scoring profile "{name}": effort_buckets must be a non-empty list')
+    normalized = []
+    for bucket in buckets:
+        if not isinstance(bucket, (list, tuple)) or len(bucket) != 2:
+            raise ImproperlyConfigured(
+                f'Scoring profile "{name}": effort_buckets entries must be [max_hours, score] pairs'
+            )
+        max_hours = _number(name, 'effort_buckets max_hours', bucket[0], positive=True)
+        if normalized and max_hours <= normalized[-1][0]:
+            raise ImproperlyConfigured(f'Scoring profile "{name}": effort_buckets max_hours must increase')
+        normalized.append((max_hours, _number(name, 'effort_buckets score', bucket[1])))
+
+    return {
+        'weights': weights,
+        'urgency_decay': _number(name, 'urgency_decay', merged['urgency_decay']),
+        'effort_buckets': normalized,
+        'min_effort_score': _number(name, 'min_effort_score', merged['min_effort_score']),
+        'dependency_points': _number(name, 'dependency_points', merged['dependency_points'], positive=True),
+        'max_dependency_score': _number(name, 'max_dependency_score', merged['max_dependency_score']),
+    }
+
+
+class ScoringProfile:
+    """
+    A validated scoring profile with its lookup tables and scoring function.
+
+    score_task(task, dependents_index, today) returns the rounded priority
+    score; combine() and dependency_score() give the same arithmetic one
+    component at a time, for breakdowns and pruning bounds.
+    """
+    __slots__ = (
+        'name',
+        'spec',
+        'urgency_weight',
+        'importance_weight',
+        'effort_weight',
+        'dependency_weight',
+        'urgency_decay',
+        'urgency_table',
+        'effort_buckets',
+        'min_effort_score',
+        'dependency_points',
+        'max_dependency_score',
+        'blocked_limit',
+        'score_task',
+    )
+
+    def __init__(self, name, spec):
+        spec = validate_spec(name, spec)
+        self.name = name
+        self.spec = spec
+        weights = spec['weights']
+        self.urgency_weight = weights['urgency']
+        self.importance_weight = weights['importance']
+        self.effort_weight = weights['effort']
+        self.dependency_weight = weights['dependencies']
+        self.urgency_decay = spec['urgency_decay']
+        self.urgency_table = tuple(urgency_for_days(days, self.urgency_decay) for days in range(URGENCY_TABLE_DAYS))
+        self.effort_buckets = tuple(spec['effort_buckets'])
+        self.min_effort_score = spec['min_effort_score']
+        self.dependency_points = spec['dependency_points']
+        self.max_dependency_score = spec['max_dependency_score']
+        # Blocked counts past this add nothing (used to stop graph walks early)
+        self.blocked_limit = max(math.ceil(self.max_dependency_score / self.dependency_points), 1)
+        self.score_task = make_task_scorer(self)
+
+    def __reduce__(self):
+        # The scoring function is a closure and cannot be pickled; process
+        # pool workers recompile from the spec instead
+        return (ScoringProfile, (self.name, self.spec))
+
+    def __repr__(self):
+        return f"<ScoringProfile {self.name}>"
+
+    def urgency_for_days(self, days_until_due):
+        return urgency_for_days(days_until_due, self.urgency_decay)
+
+    def dependency_score(self, blocked_count):
+        return min(blocked_count * self.dependency_points, self.max_dependency_score)
+
+    def combine(self, urgency, importance, effort, dependencies):
+        # Same evaluation order as score_task, so results match exactly
+        score = (urgency * self.urgency_weight + importance * self.importance_weight
+                 + effort * self.effort_weight + dependencies * self.dependency_weight)
+        return round(score, 2)
+
+    def weights(self):
+        """(name, weight) of each component, in formula order."""
+        return (
+            ('urgency', self.urgency_weight),
+            ('importance', self.importance_weight),
+            ('effort', self.effort_weight),
+            ('dependencies', self.dependency_weight),
+        )
+
+
+def make_task_scorer(profile):
+    # Bind every profile value to a local of the closure: the returned
+    # function does the whole calculation inline, with no attribute or
+    # settings lookups and no calls besides round() and min()
+    urgency_table = profile.urgency_table
+    table_days = len(urgency_table)
+    urgency_beyond_table = profile.urgency_for_days
+    effort_buckets = profile.effort_buckets
+    min_effort_score = profile.min_effort_score
+    dependency_points = profile.dependency_points
+    max_dependency_score = profile.max_dependency_score
+    urgency_weight = profile.urgency_weight
+    importance_weight = profile.importance_weight
+    effort_weight = profile.effort_weight
+    dependency_weight = profile.dependency_weight
+
+    def score_task(task, dependents_index, today):
+        days = (task.due_date - today).days
+        if days < 0:
+            urgency = MAX_URGENCY_SCORE
+        elif days < table_days:
+            urgency = urgency_table[days]
+        else:
+            urgency = urgency_beyond_table(days)
+
+        hours = task.estimated_hours
+        for max_hours, effort in effort_buckets:
+            if hours <= max_hours:
+                break
+        else:
+            effort = min_effort_score
+
+        dependents = dependents_index.get(task.id)
+        if dependents is None:
+            blocked_count = 0
+        elif isinstance(dependents, int):
+            blocked_count = dependents
+        else:
+            blocked_count = len(dependents)
+        dependencies = min(blocked_count * dependency_points, max_dependency_score)
+
+        return round(urgency * urgency_weight + task.importance * 10.0 * importance_weight
+                     + effort * effort_weight + dependencies * dependency_weight, 2)
+
+    return score_task
+
+
+# Stands for an unset TASKS_SCORING_PROFILES, so the identity check in
+# _compiled_profiles also hits when the setting is absent
+_UNSET = object()
+
+_profiles = None
+_profiles_source = _UNSET
+_profiles_lock = threading.Lock()
+
+
+def _compiled_profiles():
+    # Compiled once per value of the setting (compared by identity, so the
+    # raw setting is kept); every spec is validated up front so a typo in
+    # one profile is reported before any is used
+    global _profiles, _profiles_source
+    source = getattr(settings, 'TASKS_SCORING_PROFILES', _UNSET)
+    if _profiles is not None and _profiles_source is source:
+        return _profiles
+    with _profiles_lock:
+        if _profiles is None or _profiles_source is not source:
+            specs = {} if source is _UNSET or source is None else source
+            if not isinstance(specs, dict):
+                raise ImproperlyConfigured('TASKS_SCORING_PROFILES must be a dict of name: spec')
+            if DEFAULT_PROFILE in specs:
+                raise ImproperlyConfigured(
+                    f'TASKS_SCORING_PROFILES cannot redefine the built-in "{DEFAULT_PROFILE}" profile'
+                )
+            profiles = {DEFAULT_PROFILE: ScoringProfile(DEFAULT_PROFILE, DEFAULT_SPEC)}
+            for name, spec in specs.items():
+                profiles[name] = ScoringProfile(name, spec)
+            _profiles = profiles
+            _profiles_source = source
+        return _profiles
+
+
+def profile_names():
+    """Names of the available profiles, built-in first."""
+    return list(_compiled_profiles())
+
+
+def get_profile(name=None):
+    """Return the compiled profile called name (TASKS_SCORING_PROFILE when None)."""
+    profiles = _compiled_profiles()
+    if name is None:
+        name = getattr(settings, 'TASKS_SCORING_PROFILE', DEFAULT_PROFILE)
+        if name not in profiles:
+            raise ImproperlyConfigured(f'TASKS_SCORING_PROFILE names an unknown profile {name!r}')
+    profile = profiles.get(name) if isinstance(name, str) else None
+    if profile is None:
+        raise ValueError(f'Unknown scoring profile {name!r}; choose one of: {", ".join(profiles)}')
+    return profile
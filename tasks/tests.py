@@ -1,14 +1,42 @@
-from django.test import TestCase
-from datetime import date, timedelta
-from tasks.models import Task
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+import io
+import math
+import os
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from tasks.graph import DependencyGraph
+from tasks.importer import iter_json_items
+from tasks.planner import plan_tasks
+from tasks.models import Task, TaskDependency, TaskTableVersion
+from tasks.records import TaskRecord
+from tasks.validation import TaskBatchValidator
 from tasks.scoring import (
     calculate_urgency_score,
     calculate_importance_score,
     calculate_effort_score,
     calculate_dependency_score,
     calculate_priority_score,
-    score_tasks
+    build_dependents_index,
+    score_tasks,
+    select_top_tasks,
+    ScoringContext
 )
+from tasks import async_views, batch_scoring, deltas, parallel, views
+from tasks.cache import LRUCache, get_result_cache, next_local_midnight
+from tasks.ranking import get_ranked_index, ranked_queryset
+from tasks.snapshots import DELTA_INDEX_BYTES, RECORD_BYTES, Snapshot, get_snapshot_store, worker_tag
+from tasks.strategies import DEFAULT_PROFILE, DEFAULT_SPEC, ScoringProfile, get_profile, profile_names
 
 
 class ScoringAlgorithmTestCase(TestCase):
@@ -262,3 +290,1587 @@ class ScoringAlgorithmTestCase(TestCase):
         # Perfect task should have very high score (close to maximum possible)
         self.assertGreater(perfect_score, 300,
                           "Perfect priority task should have very high score")
+
+
+
+def make_random_tasks(count, seed=7, max_dependencies=3):
+    """Build unsaved tasks with ids 1..count and random dependencies between them"""
+    rng = random.Random(seed)
+    tasks = []
+    for idx in range(count):
+        tasks.append(Task(
+            id=idx + 1,
+            title=f"Task {idx + 1}",
+            due_date=date.today() + timedelta(days=rng.randint(-10, 60)),
+            estimated_hours=rng.choice([0.5, 1, 2, 3, 6, 8, 12, 24, 40]),
+            importance=rng.randint(1, 10),
+            dependencies=[rng.randint(1, count) for _ in range(rng.randint(0, max_dependencies))]
+        ))
+    return tasks
+
+
+def brute_force_dependency_score(task, all_tasks):
+    """Reference implementation: scan every other task's dependency list"""
+    blocked_count = 0
+    for other_task in all_tasks:
+        if other_task.id == task.id:
+            continue
+        if task.id in other_task.dependencies:
+            blocked_count += 1
+    return min(blocked_count * 15, 50.0)
+
+
+class DependencyIndexTestCase(TestCase):
+    """Test cases for the reverse-dependency index used by score_tasks"""
+
+    def test_index_maps_blockers_to_dependents(self):
+        """Test that each blocker id maps to the tasks that depend on it"""
+        tasks = [
+            Task(id=1, title="A", due_date=date.today(), estimated_hours=1, importance=5, dependencies=[]),
+            Task(id=2, title="B", due_date=date.today(), estimated_hours=1, importance=5, dependencies=[1, 1]),
+            Task(id=3, title="C", due_date=date.today(), estimated_hours=1, importance=5, dependencies=[1, 2, 3]),
+        ]
+
+        index = build_dependents_index(tasks)
+
+        # Duplicates count once and self-references are ignored
+        self.assertEqual(index, {1: [2, 3], 2: [3]})
+
+    def test_dependency_scores_match_full_scan(self):
+        """Test that index-based dependency scores equal the original full scan"""
+        tasks = make_random_tasks(300, max_dependencies=6)
+        index = build_dependents_index(tasks)
+
+        for task in tasks:
+            self.assertEqual(
+                calculate_dependency_score(task, dependents_index=index),
+                brute_force_dependency_score(task, tasks)
+            )
+            self.assertEqual(
+                calculate_dependency_score(task, tasks),
+                brute_force_dependency_score(task, tasks)
+            )
+
+    def test_score_tasks_scales_linearly(self):
+        """Test that scoring 50k tasks costs roughly 10x scoring 5k tasks, not 100x"""
+        small = make_random_tasks(5000)
+        large = make_random_tasks(50000)
+
+        start = time.perf_counter()
+        score_tasks(small)
+        small_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score_tasks(large)
+        large_elapsed = time.perf_counter() - start
+
+        # A quadratic implementation would be ~100x slower; allow generous noise
+        self.assertLess(large_elapsed, small_elapsed * 30,
+                        "score_tasks should scale roughly linearly with task count")
+
+
+
+@skipUnless(batch_scoring.is_available(), "NumPy is not installed")
+class BatchScoringTestCase(TestCase):
+    """Test cases for the vectorized batch scoring engine"""
+
+    def test_batch_scores_match_scalar_scores(self):
+        """Test that batch scores and ranking are identical to the scalar path"""
+        tasks = make_random_tasks(3000, max_dependencies=5)
+        for task in tasks[::7]:
+            task.estimated_hours = 2.0000001  # Just over a bucket edge
+        for task in tasks[::11]:
+            task.due_date = date.today() + timedelta(days=random.Random(task.id).randint(0, 5000))
+        index = build_dependents_index(tasks)
+
+        expected = [calculate_priority_score(task, dependents_index=index) for task in tasks]
+        scalar_order = sorted(range(len(tasks)), key=lambda i: expected[i], reverse=True)
+
+        ranked = batch_scoring.score_tasks_batch(tasks, index, ScoringContext())
+
+        self.assertEqual([task.priority_score for task in tasks], expected)
+        self.assertEqual([task.id for task in ranked], [tasks[i].id for i in scalar_order])
+
+    def test_score_tasks_uses_batch_engine_above_threshold(self):
+        """Test that score_tasks switches engines without changing its output"""
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+            scalar_ranked = [(t.id, t.priority_score) for t in score_tasks(make_random_tasks(1000))]
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=1):
+            batch_ranked = [(t.id, t.priority_score) for t in score_tasks(make_random_tasks(1000))]
+
+        self.assertEqual(scalar_ranked, batch_ranked)
+
+
+@skipUnless(parallel.is_available(), "NumPy or shared memory is not available")
+class ParallelScoringTestCase(TestCase):
+    """Test cases for process-pool sharded scoring"""
+
+    def test_parallel_ranking_matches_single_core(self):
+        """Test that sharded scores, the merged ranking and top-k match the batch engine"""
+        tasks = make_random_tasks(5000, max_dependencies=4)
+        for task in tasks[::3]:
+            task.importance = 5  # Plenty of ties across shard boundaries
+        index = build_dependents_index(tasks)
+        context = ScoringContext()
+
+        expected = [(t.id, t.priority_score) for t in batch_scoring.score_tasks_batch(tasks, index, context)]
+        ranked = parallel.score_tasks_parallel(tasks, context, index, workers=2)
+        top = parallel.top_tasks_parallel(tasks, 25, context, index, workers=2)
+
+        self.assertEqual([(t.id, t.priority_score) for t in ranked], expected)
+        self.assertEqual([t.id for t in top], [task_id for task_id, _ in expected[:25]])
+
+    def test_views_switch_to_parallel_above_threshold(self):
+        """Test that /analyze/ output is unchanged when the parallel engine takes over"""
+        body = json.dumps({'tasks': make_payload_tasks(800), 'reference_date': '2025-11-28'})
+
+        single = self.client.post('/api/tasks/analyze/', body, content_type='application/json').json()
+        get_result_cache().clear()
+        with override_settings(TASKS_PARALLEL_SCORING_THRESHOLD=100, TASKS_PARALLEL_SCORING_WORKERS=2), \
+                mock.patch.object(parallel, 'score_tasks_parallel', wraps=parallel.score_tasks_parallel) as spy:
+            sharded = self.client.post('/api/tasks/analyze/', body, content_type='application/json').json()
+
+        self.assertTrue(spy.called)
+        self.assertEqual(sharded, single)
+
+
+class TopTaskSelectionTestCase(TestCase):
+    """Test cases for bounded top-k selection used by /suggest/"""
+
+    def test_top_tasks_match_full_ranking(self):
+        """Test that select_top_tasks returns the head of the full ranking, ties included"""
+        for limit in (1, 3, 10, 400):
+            with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+                expected = [t.id for t in score_tasks(make_random_tasks(300))[:limit]]
+                selected = [t.id for t in select_top_tasks(make_random_tasks(300), limit)]
+            self.assertEqual(selected, expected)
+
+    @skipUnless(batch_scoring.is_available(), "NumPy is not installed")
+    def test_batch_top_tasks_match_full_ranking(self):
+        """Test that the vectorized top-k path agrees with the full ranking"""
+        for limit in (1, 3, 10, 400):
+            with override_settings(TASKS_BATCH_SCORING_THRESHOLD=1):
+                expected = [t.id for t in score_tasks(make_random_tasks(300))[:limit]]
+                selected = [t.id for t in select_top_tasks(make_random_tasks(300), limit)]
+            self.assertEqual(selected, expected)
+
+    def test_bounds_prune_tasks_that_cannot_make_the_top(self):
+        """Test that most tasks skip full scoring once the heap is full"""
+        tasks = make_random_tasks(2000)
+        profile = ScoringProfile(DEFAULT_PROFILE, DEFAULT_SPEC)
+        profile.score_task = mock.Mock(wraps=profile.score_task)
+        context = ScoringContext(date.today(), profile)
+
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+            selected = select_top_tasks(tasks, 3, context)
+            expected = score_tasks(make_random_tasks(2000), ScoringContext(date.today()))[:3]
+
+        self.assertEqual([t.id for t in selected], [t.id for t in expected])
+        self.assertGreaterEqual(profile.score_task.call_count, 3)
+        self.assertLess(profile.score_task.call_count, len(tasks) // 10)
+
+
+
+class TaskRecordTestCase(TestCase):
+    """Test cases for the lightweight task record used by the stateless endpoints"""
+
+    def test_record_scores_like_model_instance(self):
+        """Test that TaskRecord and Task produce identical scores and rankings"""
+        models = make_random_tasks(200)
+        records = [
+            TaskRecord(
+                id=task.id,
+                title=task.title,
+                due_date=task.due_date,
+                estimated_hours=task.estimated_hours,
+                importance=task.importance,
+                dependencies=task.dependencies
+            )
+            for task in make_random_tasks(200)
+        ]
+
+        self.assertEqual(
+            [(t.id, t.priority_score) for t in score_tasks(records)],
+            [(t.id, t.priority_score) for t in score_tasks(models)]
+        )
+        self.assertEqual(records[0].days_until_due(), models[0].days_until_due())
+        self.assertEqual(records[0].is_overdue(), models[0].is_overdue())
+
+    def test_record_has_no_instance_dict(self):
+        """Test that records use __slots__ instead of a per-instance __dict__"""
+        record = TaskRecord(id=1, title="Slim", due_date=date.today(), estimated_hours=1, importance=5)
+
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record.dependencies, [])
+
+
+
+class ScoringContextTestCase(TestCase):
+    """Test cases for request-scoped scoring state"""
+
+    def test_lookup_tables_match_formulas(self):
+        """Test that the urgency and effort tables reproduce the original curves"""
+        context = ScoringContext()
+
+        for days in (-3, 0, 1, 2, 7, 365, 366, 5000):
+            task = Task(title="T", due_date=context.today + timedelta(days=days), estimated_hours=4, importance=5)
+            expected = 100.0 if days <= 0 else 90.0 if days == 1 else round(100 / (1 + days) ** 0.7, 2)
+            self.assertAlmostEqual(calculate_urgency_score(task, context), expected, places=2)
+        for hours, expected in ((0.5, 50.0), (2, 50.0), (2.5, 30.0), (8, 30.0), (24, 15.0), (24.1, 5.0)):
+            task = Task(title="T", due_date=context.today, estimated_hours=hours, importance=5)
+            self.assertEqual(calculate_effort_score(task, context), expected)
+
+    def test_explicit_reference_date_is_reproducible(self):
+        """Test that scores depend only on the context's reference date, not the clock"""
+        reference = date(2030, 1, 1)
+        task = Task(title="Pinned", due_date=date(2030, 1, 8), estimated_hours=4, importance=5)
+
+        with mock.patch('tasks.scoring.timezone.now', side_effect=AssertionError("clock read")):
+            score = calculate_priority_score(task, context=ScoringContext(reference))
+
+        self.assertEqual(score, calculate_priority_score(
+            Task(title="Now", due_date=ScoringContext().today + timedelta(days=7), estimated_hours=4, importance=5)
+        ))
+
+
+
+def make_payload_tasks(count, seed=7):
+    """Build /analyze/ request items with 1-based positional dependencies"""
+    return [
+        {
+            'title': task.title,
+            'due_date': task.due_date.isoformat(),
+            'estimated_hours': task.estimated_hours,
+            'importance': task.importance,
+            'dependencies': task.dependencies
+        }
+        for task in make_random_tasks(count, seed)
+    ]
+
+
+class AnalyzeEndpointTestCase(TestCase):
+    """Test cases for the /api/tasks/analyze/ output formats"""
+
+    def setUp(self):
+        get_result_cache().clear()
+
+    def post(self, body, **extra):
+        return self.client.post('/api/tasks/analyze/', json.dumps(body),
+                                content_type='application/json', **extra)
+
+    def test_ndjson_streams_header_then_ranked_tasks(self):
+        """Test that format=ndjson streams the same ranked tasks as the JSON response"""
+        tasks = make_payload_tasks(1200)
+        expected = self.post({'tasks': tasks}).json()
+
+        response = self.post({'tasks': tasks, 'format': 'ndjson'})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        header = json.loads(lines[0])
+        self.assertEqual((header['status'], header['count']), ('success', 1200))
+        self.assertEqual(header['dependency_warnings'], expected['dependency_warnings'])
+        self.assertEqual([json.loads(line) for line in lines[1:]], expected['tasks'])
+
+    def test_ndjson_selected_by_accept_header(self):
+        """Test that an Accept: application/x-ndjson header selects streaming output"""
+        response = self.post({'tasks': make_payload_tasks(3)}, HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertTrue(response.streaming)
+
+    def test_sort_by_list_returns_one_permutation_per_ordering(self):
+        """Test that a list of orderings matches separate single-ordering requests"""
+        tasks = make_payload_tasks(400)
+        names = ['priority', 'deadline', 'fastest_wins', 'importance']
+
+        data = self.post({'tasks': tasks, 'sort_by': names}).json()
+        columnar = self.post({'tasks': tasks, 'sort_by': names, 'format': 'columnar'}).json()
+
+        for name in names:
+            expected = self.post({'tasks': tasks, 'sort_by': name}).json()['tasks']
+            self.assertEqual([data['tasks'][i] for i in data['orderings'][name]], expected)
+            self.assertEqual(
+                [columnar['columns']['title'][i] for i in columnar['orderings'][name]],
+                [task['title'] for task in expected]
+            )
+
+    def test_sort_by_list_rejects_unknown_orderings(self):
+        """Test that unknown entries in a sort_by list are reported"""
+        response = self.post({'tasks': make_payload_tasks(3), 'sort_by': ['priority', 'random']})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_columnar_format_expands_to_row_format(self):
+        """Test that columnar output carries the same ranked rows with interned recommendations"""
+        tasks = make_payload_tasks(500)
+        expected = self.post({'tasks': tasks, 'sort_by': 'fastest_wins'}).json()
+
+        data = self.post({'tasks': tasks, 'sort_by': 'fastest_wins', 'format': 'columnar'}).json()
+
+        self.assertEqual(data['format'], 'columnar')
+        self.assertEqual(len(data['recommendations']), 1)
+        columns = data['columns']
+        rows = []
+        for position in data['order']:
+            row = {field: values[position] for field, values in columns.items()}
+            if row['recommendation'] is not None:
+                row['recommendation'] = data['recommendations'][row['recommendation']]
+            rows.append(row)
+        self.assertEqual(rows, expected['tasks'])
+
+
+
+class ResultCacheTestCase(TestCase):
+    """Test cases for the content-addressed result cache in front of the endpoints"""
+
+    def setUp(self):
+        get_result_cache().clear()
+
+    def test_identical_requests_hit_the_cache(self):
+        """Test that a resent task list is served from cache with identical bytes"""
+        tasks = make_payload_tasks(50)
+        first = self.client.post('/api/tasks/suggest/', json.dumps({'tasks': tasks}),
+                                 content_type='application/json')
+        # Same content, different key order and whitespace
+        reordered = json.dumps({'tasks': [dict(reversed(list(t.items()))) for t in tasks]}, indent=2)
+        second = self.client.post('/api/tasks/suggest/', reordered, content_type='application/json')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(get_result_cache().stats()['hits'], 1)
+
+    def test_different_options_miss(self):
+        """Test that sort order and endpoint are part of the cache key"""
+        tasks = make_payload_tasks(20)
+        self.client.post('/api/tasks/analyze/', json.dumps({'tasks': tasks}), content_type='application/json')
+        response = self.client.post('/api/tasks/analyze/', json.dumps({'tasks': tasks, 'sort_by': 'importance'}),
+                                    content_type='application/json')
+        suggest = self.client.post('/api/tasks/suggest/', json.dumps({'tasks': tasks}),
+                                   content_type='application/json')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(suggest['X-Cache'], 'MISS')
+
+    def test_equivalent_task_lists_share_an_entry(self):
+        """Test that the key is built from the validated tasks, not the raw payload"""
+        tasks = make_payload_tasks(10)
+        first = self.client.post('/api/tasks/suggest/', json.dumps({'tasks': tasks}),
+                                 content_type='application/json')
+        # Same tasks spelled differently: float hours and string importance
+        respelled = [dict(t, estimated_hours=float(t['estimated_hours']), importance=str(t['importance']))
+                     for t in tasks]
+        second = self.client.post('/api/tasks/suggest/', json.dumps({'tasks': respelled}),
+                                  content_type='application/json')
+        third = self.client.post('/api/tasks/suggest/', json.dumps({'tasks': respelled}),
+                                 content_type='application/json')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(third['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(get_result_cache().stats()['hits'], 2)
+        self.assertEqual(get_result_cache().stats()['misses'], 1)
+
+    def test_lru_eviction_respects_memory_cap(self):
+        """Test that the least recently used entries are evicted past the byte cap"""
+        cache = LRUCache(max_bytes=300)
+        expires = timezone.now() + timedelta(hours=1)
+        cache.set('a', 'A', 100, expires)
+        cache.set('b', 'B', 100, expires)
+        cache.set('c', 'C', 100, expires)
+        cache.get('a')
+        cache.set('d', 'D', 100, expires)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertLessEqual(cache.current_bytes, 300)
+
+    def test_entries_expire_at_local_midnight(self):
+        """Test that entries stored today are gone after midnight"""
+        cache = LRUCache(max_bytes=1000)
+        midnight = next_local_midnight()
+        cache.set('key', 'value', 10, midnight)
+
+        self.assertEqual(cache.get('key', now=midnight - timedelta(seconds=1)), 'value')
+        self.assertIsNone(cache.get('key', now=midnight))
+        self.assertEqual(timezone.localtime(midnight).time(), datetime.min.time())
+
+
+
+class TaskCrudTestCase(TestCase):
+    """Test cases for persisted task endpoints and incremental re-scoring"""
+
+    def setUp(self):
+        # Rows loaded by an earlier test were rolled back with it
+        get_ranked_index().invalidate()
+
+    def create(self, **fields):
+        body = {'title': 'Task', 'due_date': date.today().isoformat(), 'estimated_hours': 4, 'importance': 5}
+        body.update(fields)
+        response = self.client.post('/api/tasks/', json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['task']
+
+    def test_create_stores_current_priority_score(self):
+        """Test that created tasks get the same score the scorer would compute"""
+        created = self.create(title='Stored', estimated_hours=1, importance=9)
+
+        task = Task.objects.get(id=created['id'])
+        self.assertEqual(task.priority_score, calculate_priority_score(task))
+        self.assertEqual(created['priority_score'], task.priority_score)
+
+    def test_adding_dependent_rescores_only_its_blockers(self):
+        """Test that a new dependency re-scores the blocker and leaves unrelated tasks alone"""
+        blocker = self.create(title='Blocker')
+        unrelated = self.create(title='Unrelated')
+        Task.objects.filter(id=unrelated['id']).update(priority_score=-1)
+
+        self.create(title='Dependent', dependencies=[blocker['id']])
+
+        self.assertEqual(Task.objects.get(id=blocker['id']).priority_score, blocker['priority_score'] + 4.5)
+        self.assertEqual(Task.objects.get(id=unrelated['id']).priority_score, -1)
+
+    def test_update_and_delete_keep_blocker_scores_current(self):
+        """Test that removing a dependency via PATCH or DELETE lowers the blocker's score again"""
+        blocker = self.create(title='Blocker')
+        other = self.create(title='Other blocker')
+        dependent = self.create(title='Dependent', dependencies=[blocker['id']])
+
+        response = self.client.patch(f"/api/tasks/{dependent['id']}/", json.dumps({'dependencies': [other['id']]}),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(id=blocker['id']).priority_score, blocker['priority_score'])
+        self.assertEqual(Task.objects.get(id=other['id']).priority_score, other['priority_score'] + 4.5)
+
+        self.client.delete(f"/api/tasks/{dependent['id']}/")
+        self.assertEqual(Task.objects.get(id=other['id']).priority_score, other['priority_score'])
+
+    def test_list_returns_ranked_backlog(self):
+        """Test that GET returns stored tasks ordered by priority score"""
+        self.create(title='Low', importance=1, estimated_hours=40)
+        self.create(title='High', importance=10, estimated_hours=1)
+
+        data = self.client.get('/api/tasks/?limit=1').json()
+
+        self.assertEqual([task['title'] for task in data['tasks']], ['High'])
+
+    def test_invalid_task_is_rejected(self):
+        """Test that model validators apply to created tasks"""
+        response = self.client.post('/api/tasks/', json.dumps({
+            'title': 'Bad', 'due_date': date.today().isoformat(), 'estimated_hours': 4, 'importance': 11
+        }), content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('importance', response.json()['errors'])
+
+
+
+class RankedIndexTestCase(TestCase):
+    """Test cases for the in-memory ranked index of stored tasks"""
+
+    def setUp(self):
+        self.index = get_ranked_index()
+        self.index.invalidate()
+        self.index.loads = 0
+        self.addCleanup(self.index.invalidate)
+
+    def create(self, **fields):
+        body = {'title': 'Task', 'due_date': date.today().isoformat(), 'estimated_hours': 4, 'importance': 5}
+        body.update(fields)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tasks/', json.dumps(body), content_type='application/json')
+        return response.json()['task']
+
+    def assert_matches_database(self):
+        self.assertEqual([task.id for task in self.index.top()], list(ranked_queryset().values_list('id', flat=True)))
+
+    def test_reads_only_check_the_version_after_first_load(self):
+        """Test that top-k and rank lookups are served from memory"""
+        for importance in range(1, 6):
+            self.create(title=f'Task {importance}', importance=importance)
+        self.index.top(1)
+
+        # One primary-key read of the version stamp per call, no task query
+        with self.assertNumQueries(3):
+            top = self.index.top(2)
+            rank = self.index.rank_of(top[1].id)
+            data = self.client.get('/api/tasks/?limit=2').json()
+
+        self.assertEqual(rank, 1)
+        self.assertEqual([task['title'] for task in data['tasks']], ['Task 5', 'Task 4'])
+        self.assertEqual(self.index.loads, 1)
+
+    def test_signals_and_rescoring_keep_index_in_sync(self):
+        """Test that creates, edits, blocked-count changes and deletes patch the loaded index"""
+        blocker = self.create(title='Blocker', importance=2)
+        other = self.create(title='Other', importance=1)
+        self.index.top()
+
+        dependents = [self.create(title=f'Dependent {n}', importance=1, dependencies=[blocker['id']])
+                      for n in range(3)]
+        self.assert_matches_database()
+        self.assertEqual(self.index.rank_of(blocker['id']), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/tasks/{other['id']}/", json.dumps({'importance': 10}),
+                              content_type='application/json')
+            self.client.delete(f"/api/tasks/{dependents[0]['id']}/")
+        self.assert_matches_database()
+        self.assertEqual(self.client.get(f"/api/tasks/{other['id']}/").json()['rank'], 1)
+        self.assertEqual(self.index.loads, 1)
+
+    def test_version_stamp_detects_changes_made_elsewhere(self):
+        """Test that a stamp bumped by another process, or a bulk write, forces a reload"""
+        first = self.create(title='First', importance=9)
+        self.create(title='Second', importance=1)
+        self.assertEqual(self.index.rank_of(first['id']), 0)
+
+        # Another process: raw SQL writes and bumps the stamp, with no
+        # signal or cache entry reaching this process
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {Task._meta.db_table} SET priority_score = 0 WHERE id = %s', [first['id']])
+            cursor.execute(f'UPDATE {TaskTableVersion._meta.db_table} SET version = version + 1')
+        self.assertEqual(self.index.rank_of(first['id']), 1)
+
+        # A management command in its own process never runs our on_commit
+        # callbacks; the stamp it bumps is enough
+        with self.captureOnCommitCallbacks(execute=False):
+            call_command('rescore_tasks', stdout=io.StringIO())
+        self.assertEqual(self.index.rank_of(first['id']), 0)
+        self.assertEqual(self.index.loads, 3)
+
+    def test_rolled_back_writes_never_reach_index(self):
+        """Test that changes are applied on commit only and oversized tables fall back to the database"""
+        self.create(title='Kept')
+        self.index.top()
+
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Task.objects.create(title='Rolled back', due_date=date.today(), estimated_hours=1, importance=5)
+                raise IntegrityError('rolled back')
+        self.assertEqual([task.title for task in self.index.top()], ['Kept'])
+        self.assertEqual(self.index.loads, 1)
+
+        self.create(title='Second')
+        with override_settings(TASKS_RANKED_INDEX_MAX_TASKS=1):
+            self.assertIsNone(get_ranked_index().top())
+            self.assertEqual(self.client.get('/api/tasks/').json()['count'], 2)
+
+
+
+class BulkImportTestCase(TestCase):
+    """Test cases for the import_tasks command and the bulk endpoint"""
+
+    def backlog(self):
+        today = date.today()
+        return [
+            {'id': 10, 'title': 'Blocker', 'due_date': (today + timedelta(days=5)).isoformat(),
+             'estimated_hours': 3, 'importance': 6},
+            {'id': 11, 'title': 'Dependent A', 'due_date': today.isoformat(),
+             'estimated_hours': 1, 'importance': 9, 'dependencies': [10]},
+            {'title': 'Dependent B', 'due_date': today.isoformat(),
+             'estimated_hours': 30, 'importance': 2, 'dependencies': [10, 11]},
+            {'title': 'Too old', 'due_date': (today - timedelta(days=90)).isoformat(),
+             'estimated_hours': 1, 'importance': 5},
+        ]
+
+    def assert_scores_current(self):
+        tasks = list(Task.objects.all())
+        expected = {t.id: t.priority_score for t in score_tasks([
+            Task(id=t.id, title=t.title, due_date=t.due_date, estimated_hours=t.estimated_hours,
+                 importance=t.importance, dependencies=t.dependencies)
+            for t in tasks
+        ])}
+        self.assertEqual({t.id: t.priority_score for t in tasks}, expected)
+
+    def test_command_imports_jsonl_in_batches(self):
+        """Test that JSONL imports score tasks, link dependencies and skip invalid rows"""
+        path = self.write_file('\n'.join(json.dumps(item) for item in self.backlog()), '.jsonl')
+        out = io.StringIO()
+
+        call_command('import_tasks', path, batch_size=1, stdout=out, stderr=io.StringIO())
+
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(TaskDependency.objects.filter(blocker_id=10).count(), 2)
+        self.assert_scores_current()
+        self.assertIn('skipped 1 invalid', out.getvalue())
+
+    def test_bulk_endpoint_accepts_json_array(self):
+        """Test that the bulk endpoint validates with the /analyze/ rules and reports errors"""
+        response = self.client.post('/api/tasks/bulk/', json.dumps(self.backlog()),
+                                    content_type='application/json')
+
+        data = response.json()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(data['created'], 3)
+        self.assertEqual(data['errors'][0]['index'], 3)
+        self.assertIn('too far in the past', data['errors'][0]['message'])
+        self.assert_scores_current()
+
+    def test_existing_and_repeated_ids_are_reported_per_item(self):
+        """Test that id collisions skip their items instead of failing the batch"""
+        today = date.today().isoformat()
+        Task.objects.create(id=10, title='Stored', due_date=today, estimated_hours=1, importance=5)
+        items = [
+            {'id': 10, 'title': 'Clash', 'due_date': today, 'estimated_hours': 1, 'importance': 5},
+            {'id': 12, 'title': 'New', 'due_date': today, 'estimated_hours': 1, 'importance': 5},
+            {'id': 12, 'title': 'Repeat', 'due_date': today, 'estimated_hours': 1, 'importance': 5},
+        ]
+
+        response = self.client.post('/api/tasks/bulk/', json.dumps(items), content_type='application/json')
+
+        data = response.json()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(data['created'], 1)
+        self.assertEqual([e['index'] for e in data['errors']], [2, 0])
+        self.assertIn('already exists', data['errors'][1]['message'])
+        self.assertEqual(Task.objects.get(id=10).title, 'Stored')
+        self.assertEqual(Task.objects.get(id=12).title, 'New')
+
+    def test_integrity_errors_become_error_responses(self):
+        """Test that a collision missed by the id check is reported, not a 500 or traceback"""
+        path = self.write_file(json.dumps(self.backlog()), '.json')
+
+        with mock.patch('tasks.importer._without_existing_ids', side_effect=IntegrityError('UNIQUE constraint failed')):
+            response = self.client.post('/api/tasks/bulk/', json.dumps(self.backlog()),
+                                        content_type='application/json')
+            with self.assertRaisesMessage(CommandError, 'conflicting row'):
+                call_command('import_tasks', path, stdout=io.StringIO())
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('UNIQUE constraint failed', response.json()['message'])
+
+    def test_non_integer_dependency_ids_are_rejected(self):
+        """Test that null ids never give id-less tasks dependency points"""
+        today = date.today().isoformat()
+        items = [
+            {'title': 'Null', 'due_date': today, 'estimated_hours': 1, 'importance': 5, 'dependencies': [None]},
+            {'title': 'Bool', 'due_date': today, 'estimated_hours': 1, 'importance': 5, 'dependencies': [True]},
+            {'title': 'Plain', 'due_date': today, 'estimated_hours': 1, 'importance': 5},
+        ]
+
+        response = self.client.post('/api/tasks/bulk/', json.dumps(items), content_type='application/json')
+
+        data = response.json()
+        self.assertEqual(data['created'], 1)
+        self.assertEqual([e['index'] for e in data['errors']], [0, 1])
+        self.assertIn('must be integer task ids', data['errors'][0]['message'])
+        self.assert_scores_current()
+
+        unsaved = [Task(title='A', dependencies=[None]), Task(title='B')]
+        self.assertEqual(build_dependents_index(unsaved), {})
+
+    def test_json_array_reader_handles_chunk_boundaries(self):
+        """Test that items split across read chunks decode correctly"""
+        items = [{'n': n, 'text': 'x' * (n % 7)} for n in range(500)]
+
+        with mock.patch('tasks.importer.READ_SIZE', 5):
+            decoded = list(iter_json_items(io.StringIO(json.dumps(items))))
+
+        self.assertEqual(decoded, items)
+        self.assertEqual(list(iter_json_items(io.StringIO(' [ ] '))), [])
+        self.assertEqual(list(iter_json_items(io.StringIO('{"tasks": [1, 2]}'))), [1, 2])
+
+    def write_file(self, content, suffix):
+        import tempfile
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        handle.write(content)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+
+
+class RescoreCommandTestCase(TestCase):
+    """Test cases for the rescore_tasks command"""
+
+    def setUp(self):
+        today = date.today()
+        self.blocker = Task.objects.create(title='Blocker', due_date=today + timedelta(days=2),
+                                           estimated_hours=3, importance=6)
+        self.tasks = [self.blocker]
+        for n in range(5):
+            task = Task.objects.create(title=f'Dependent {n}', due_date=today + timedelta(days=n),
+                                       estimated_hours=n + 1, importance=n + 2, dependencies=[self.blocker.id])
+            TaskDependency.objects.create(dependent=task, blocker_id=self.blocker.id)
+            self.tasks.append(task)
+
+    def expected_scores(self, today=None):
+        context = ScoringContext(today)
+        return {t.id: t.priority_score for t in score_tasks(list(Task.objects.all()), context)}
+
+    def test_command_rewrites_stale_scores_in_batches(self):
+        """Test that every score is recomputed with blocked counts from the dependency index"""
+        Task.objects.update(priority_score=0)
+        Task.objects.filter(id=self.tasks[1].id).update(priority_score=self.expected_scores()[self.tasks[1].id])
+        out = io.StringIO()
+
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=2):
+            call_command('rescore_tasks', batch_size=2, stdout=out)
+
+        self.assertEqual(dict(Task.objects.values_list('id', 'priority_score')), self.expected_scores())
+        self.assertIn('Rescored 6 tasks', out.getvalue())
+        self.assertIn('5 changed', out.getvalue())
+
+    def test_unchanged_scores_are_not_written(self):
+        """Test that a rerun with current scores issues no updates"""
+        call_command('rescore_tasks', stdout=io.StringIO())
+
+        with mock.patch('tasks.services.write_scores') as write_scores:
+            call_command('rescore_tasks', stdout=io.StringIO())
+
+        write_scores.assert_not_called()
+
+    def test_date_and_dry_run_options(self):
+        """Test that --date sets the reference date and --dry-run leaves scores alone"""
+        Task.objects.update(priority_score=0)
+        later = date.today() + timedelta(days=3)
+        out = io.StringIO()
+
+        call_command('rescore_tasks', date=later.isoformat(), dry_run=True, stdout=out)
+        self.assertEqual(set(Task.objects.values_list('priority_score', flat=True)), {0})
+        self.assertIn('6 would change', out.getvalue())
+
+        call_command('rescore_tasks', date=later.isoformat(), stdout=io.StringIO())
+        self.assertEqual(dict(Task.objects.values_list('id', 'priority_score')), self.expected_scores(later))
+
+
+
+class BatchValidatorTestCase(TestCase):
+    """Test cases for the single-pass task validator shared by the endpoints"""
+
+    def test_reports_every_invalid_item(self):
+        """Test that all bad items are reported by index, not just the first"""
+        today = date.today()
+        items = [
+            {'title': 'OK', 'due_date': today.isoformat(), 'estimated_hours': '2.5', 'importance': '7'},
+            {'title': 'Missing'},
+            {'title': 'Bad date', 'due_date': '2025/01/01', 'estimated_hours': 1, 'importance': 5},
+            {'title': 'Old', 'due_date': (today - timedelta(days=31)).isoformat(), 'estimated_hours': 1, 'importance': 5},
+            {'title': 'Importance', 'due_date': today.isoformat(), 'estimated_hours': 1, 'importance': 11},
+            {'title': 'Hours', 'due_date': today.isoformat(), 'estimated_hours': 0, 'importance': 5},
+            {'title': 'Junk', 'due_date': today.isoformat(), 'estimated_hours': 'lots', 'importance': 5},
+            'not an object',
+        ]
+
+        fields, errors = TaskBatchValidator(today).validate(items)
+
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(errors[0]['message'], 'Task 2 is missing required fields')
+        self.assertIn('invalid due_date format', errors[1]['message'])
+        self.assertIn('too far in the past', errors[2]['message'])
+        self.assertEqual((fields[0]['estimated_hours'], fields[0]['importance']), (2.5, 7))
+
+    def test_non_finite_numbers_are_rejected(self):
+        """Test that Infinity and NaN from the JSON body give 400s instead of 500s or NaN output"""
+        today = date.today().isoformat()
+        body = ('{"tasks": ['
+                '{"title": "Inf", "due_date": "%s", "estimated_hours": 1, "importance": Infinity},'
+                '{"title": "NaN", "due_date": "%s", "estimated_hours": NaN, "importance": 5},'
+                '{"title": "Big", "due_date": "%s", "estimated_hours": Infinity, "importance": 5}]}'
+                % (today, today, today))
+
+        response = self.client.post('/api/tasks/analyze/', body, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [0, 1, 2])
+        self.assertIn('must be a finite number', errors[1]['message'])
+
+        response = self.client.post('/api/tasks/', '{"title": "Inf", "due_date": "%s", '
+                                    '"estimated_hours": NaN, "importance": Infinity}' % today,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_suggest_validates_like_analyze(self):
+        """Test that /suggest/ rejects the same items as /analyze/ with the full error list"""
+        tasks = make_payload_tasks(5)
+        tasks[1]['importance'] = 0
+        tasks[3].pop('due_date')
+
+        for endpoint in ('analyze', 'suggest'):
+            response = self.client.post(f'/api/tasks/{endpoint}/', json.dumps({'tasks': tasks}),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual([error['index'] for error in response.json()['errors']], [1, 3])
+
+
+def make_chain(length):
+    """Build records where task i + 1 depends on task i"""
+    today = date.today()
+    return [
+        TaskRecord(id=idx + 1, title=f"Step {idx + 1}", due_date=today + timedelta(days=5),
+                   estimated_hours=3, importance=5, dependencies=[idx] if idx else [])
+        for idx in range(length)
+    ]
+
+
+def brute_force_reachable(tasks):
+    """Count every task reachable through dependents by plain graph search"""
+    dependents = {}
+    for task in tasks:
+        for blocker_id in set(task.dependencies):
+            if blocker_id != task.id:
+                dependents.setdefault(blocker_id, set()).add(task.id)
+    counts = {}
+    for task in tasks:
+        seen = set()
+        frontier = list(dependents.get(task.id, ()))
+        while frontier:
+            current = frontier.pop()
+            if current not in seen:
+                seen.add(current)
+                frontier.extend(dependents.get(current, ()))
+        seen.discard(task.id)
+        counts[task.id] = len(seen)
+    return counts
+
+
+class DependencyGraphTestCase(TestCase):
+    """Test cases for cycle detection and transitive blocking in tasks.graph"""
+
+    def test_detects_cycles_dangling_and_self_references(self):
+        """Test that every kind of broken dependency is reported by task id"""
+        tasks = make_chain(5)
+        tasks[0].dependencies = [3]      # 1 -> 2 -> 3 -> 1 is a cycle
+        tasks[4].dependencies = [5, 99]  # self-reference and a missing id
+
+        graph = DependencyGraph(tasks)
+        order, blocked = graph.topological_order()
+
+        self.assertTrue(graph.has_cycles())
+        self.assertEqual(sorted(blocked), [0, 1, 2, 3])
+        self.assertEqual(order, [4])
+        self.assertEqual(graph.warnings(), {
+            'self_references': [5],
+            'dangling': [{'task': 5, 'dependency': 99}],
+            'cycles': [[1, 2, 3]],
+        })
+
+    def test_topological_order_puts_blockers_first(self):
+        """Test that every blocker precedes its dependents in an acyclic graph"""
+        tasks = make_random_tasks(300, seed=3)
+        for task in tasks:
+            task.dependencies = [dep for dep in task.dependencies if dep < task.id]
+
+        order, blocked = DependencyGraph(tasks).topological_order()
+        position = {tasks[node].id: rank for rank, node in enumerate(order)}
+
+        self.assertEqual(blocked, [])
+        for task in tasks:
+            for blocker_id in task.dependencies:
+                self.assertLess(position[blocker_id], position[task.id])
+
+    def test_chain_counts(self):
+        """Test that the head of a chain of 20 outranks a task blocking one other"""
+        graph = DependencyGraph(make_chain(21))
+
+        self.assertEqual(graph.blocked_counts('direct')[1], 1)
+        self.assertEqual(graph.blocked_counts('transitive')[1], 20)
+        self.assertEqual(graph.blocked_counts('critical_path')[1], 20)
+        self.assertEqual(graph.blocked_counts('transitive')[20], 1)
+        self.assertNotIn(21, graph.blocked_counts('transitive'))
+
+    def test_transitive_counts_match_graph_search(self):
+        """Test transitive counts against a brute-force search, cycles included"""
+        tasks = make_random_tasks(400, seed=11, max_dependencies=2)
+
+        expected = brute_force_reachable(tasks)
+        graph = DependencyGraph(tasks)
+        counts = graph.blocked_counts('transitive')
+        capped = graph.blocked_counts('transitive', limit=4)
+
+        for task in tasks:
+            self.assertEqual(counts.get(task.id, 0), expected[task.id], f"Task {task.id}")
+            self.assertEqual(capped.get(task.id, 0), min(expected[task.id], 4), f"Task {task.id}")
+
+    def test_deep_chain_has_no_recursion_limit(self):
+        """Test that a 50k-long chain is handled iteratively"""
+        tasks = make_chain(50000)
+        tasks[0].dependencies = [50000]
+
+        graph = DependencyGraph(tasks)
+
+        self.assertEqual(len(graph.cycles()), 1)
+        self.assertEqual(graph.blocked_counts('critical_path')[1], 49999)
+
+    def test_large_graph_is_fast(self):
+        """Test that a 100k-node graph is analyzed well under a second"""
+        tasks = make_random_tasks(100000, seed=5, max_dependencies=3)
+        for task in tasks:
+            task.dependencies = [dep for dep in task.dependencies if dep < task.id]
+
+        start = time.perf_counter()
+        graph = DependencyGraph(tasks)
+        graph.warnings()
+        graph.critical_path_lengths()
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 1.0, f"Took {elapsed:.2f}s")
+
+    def test_analyze_dependency_mode(self):
+        """Test that /analyze/ scores with the requested mode and reports warnings"""
+        payload = [
+            {'title': f'Step {idx + 1}', 'due_date': date.today().isoformat(), 'estimated_hours': 3,
+             'importance': 5, 'dependencies': [idx] if idx else []}
+            for idx in range(6)
+        ]
+        payload.append({'title': 'Loop', 'due_date': date.today().isoformat(), 'estimated_hours': 3,
+                        'importance': 5, 'dependencies': [7, 42]})
+
+        def post(**extra):
+            return self.client.post('/api/tasks/analyze/', json.dumps({'tasks': payload, **extra}),
+                                    content_type='application/json')
+
+        direct = post().json()
+        transitive = post(dependency_mode='transitive').json()
+
+        self.assertEqual(direct['tasks'][0]['title'], 'Step 1')
+        self.assertEqual(transitive['tasks'][0]['priority_score'] - direct['tasks'][0]['priority_score'], 10.5)
+        self.assertEqual(direct['dependency_warnings'],
+                         {'self_references': [7], 'dangling': [{'task': 7, 'dependency': 42}]})
+        self.assertEqual(post(dependency_mode='deepest').status_code, 400)
+
+
+class DayPlannerTestCase(TestCase):
+    """Test cases for the capacity-aware planner behind /plan/"""
+
+    def setUp(self):
+        self.today = date(2025, 11, 28)
+        self.context = ScoringContext(self.today)
+
+    def make_task(self, task_id, hours, importance=5, dependencies=None, due_in=5):
+        return TaskRecord(id=task_id, title=f"Task {task_id}", due_date=self.today + timedelta(days=due_in),
+                          estimated_hours=hours, importance=importance, dependencies=dependencies or [])
+
+    def test_packs_days_in_score_order(self):
+        """Test that tasks fill each day in ranked order and long tasks continue the next day"""
+        tasks = [
+            self.make_task(1, 3, importance=9),
+            self.make_task(2, 6, importance=7),
+            self.make_task(3, 2, importance=5),
+        ]
+
+        plan = plan_tasks(tasks, daily_hours=8, horizon_days=3, context=self.context)
+
+        self.assertEqual([(t.id, hours, done) for t, hours, done in plan.days[0].entries],
+                         [(1, 3, True), (2, 5, False)])
+        self.assertEqual([(t.id, hours, done) for t, hours, done in plan.days[1].entries],
+                         [(2, 1, True), (3, 2, True)])
+        self.assertEqual(plan.days[1].date, self.today + timedelta(days=1))
+        self.assertEqual(plan.scheduled_count, 3)
+
+    def test_blockers_are_planned_first(self):
+        """Test that a high-scoring task waits until the task it depends on is done"""
+        tasks = [
+            self.make_task(1, 4, importance=10, dependencies=[2], due_in=0),
+            self.make_task(2, 4, importance=1, due_in=30),
+        ]
+
+        plan = plan_tasks(tasks, daily_hours=8, horizon_days=1, context=self.context)
+
+        self.assertEqual([t.id for t, _, _ in plan.days[0].entries], [2, 1])
+
+    def test_unscheduled_and_blocked(self):
+        """Test that oversized tasks are skipped for smaller ones and their dependents are blocked"""
+        tasks = [
+            self.make_task(1, 20, importance=10),
+            self.make_task(2, 2, dependencies=[1]),
+            self.make_task(3, 4, importance=3),
+            self.make_task(4, 1, dependencies=[5]),
+            self.make_task(5, 1, dependencies=[4]),
+        ]
+
+        plan = plan_tasks(tasks, daily_hours=8, horizon_days=2, context=self.context)
+
+        self.assertEqual([t.id for t in plan.unscheduled], [1])
+        self.assertEqual([(t.id, waiting) for t, waiting in plan.blocked], [(2, [1]), (4, [5]), (5, [4])])
+        self.assertEqual([t.id for t, _, _ in plan.days[0].entries], [3])
+
+    def test_dependency_order_at_scale(self):
+        """Test that 50k tasks over 90 days are planned quickly without breaking dependency order"""
+        tasks = [
+            TaskRecord(id=task.id, title=task.title, due_date=task.due_date,
+                       estimated_hours=task.estimated_hours, importance=task.importance,
+                       dependencies=[dep for dep in task.dependencies if dep < task.id])
+            for task in make_random_tasks(50000, seed=9)
+        ]
+
+        start = time.perf_counter()
+        plan = plan_tasks(tasks, daily_hours=8, horizon_days=90, context=ScoringContext())
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 2.0, f"Took {elapsed:.2f}s")
+        self.assertTrue(all(day.hours <= 8 + 1e-6 for day in plan.days))
+        finished = set()
+        for day in plan.days:
+            for task, _, completes in day.entries:
+                for blocker_id in task.dependencies:
+                    self.assertIn(blocker_id, finished, f"Task {task.id} started before {blocker_id}")
+                if completes:
+                    finished.add(task.id)
+
+    def test_plan_endpoint(self):
+        """Test that /plan/ returns days, validates its parameters and reports blocked tasks"""
+        payload = {
+            'tasks': [
+                {'title': 'Write', 'due_date': '2025-11-28', 'estimated_hours': 6, 'importance': 8},
+                {'title': 'Review', 'due_date': '2025-11-28', 'estimated_hours': 3, 'importance': 5,
+                 'dependencies': [1]},
+            ],
+            'daily_hours': 4,
+            'horizon_days': 3,
+            'reference_date': '2025-11-28'
+        }
+
+        def post(**changes):
+            return self.client.post('/api/tasks/plan/', json.dumps({**payload, **changes}),
+                                    content_type='application/json')
+
+        data = post().json()
+
+        self.assertEqual(data['start_date'], '2025-11-28')
+        self.assertEqual([day['planned_hours'] for day in data['days']], [4, 4, 1])
+        review = data['days'][1]['tasks'][1]
+        self.assertEqual((review['id'], review['hours'], review['completes']), (2, 2, False))
+        self.assertTrue(data['days'][2]['tasks'][0]['late'])
+        self.assertEqual((data['unscheduled'], data['blocked']), ([], []))
+        self.assertEqual(post(daily_hours=0).status_code, 400)
+        self.assertEqual(post(horizon_days=400).status_code, 400)
+
+
+class AsyncViewsTestCase(TestCase):
+    """Test cases for the native async scoring endpoints"""
+
+    def setUp(self):
+        get_result_cache().clear()
+        self.factory = AsyncRequestFactory()
+
+    def request(self, path, body):
+        return self.factory.post(path, json.dumps(body), content_type='application/json')
+
+    async def test_small_payloads_run_inline(self):
+        """Test that small bodies are scored on the event loop with the sync view's output"""
+        body = {'tasks': make_payload_tasks(20), 'reference_date': '2025-11-28'}
+        expected = json.loads(views.analyze_tasks(RequestFactory().post(
+            '/api/tasks/analyze/', json.dumps(body), content_type='application/json')).content)
+        get_result_cache().clear()
+
+        with mock.patch.object(async_views, 'get_executor') as get_executor:
+            response = await async_views.analyze_tasks(self.request('/api/tasks/analyze/', body))
+
+        self.assertFalse(get_executor.called)
+        self.assertEqual(json.loads(response.content), expected)
+
+    async def test_large_payloads_use_the_executor(self):
+        """Test that large bodies are handed to the bounded executor"""
+        body = {'tasks': make_payload_tasks(300), 'limit': 5, 'reference_date': '2025-11-28'}
+
+        with override_settings(TASKS_ASYNC_INLINE_MAX_BYTES=1024), \
+                mock.patch.object(async_views, 'get_executor', wraps=async_views.get_executor) as get_executor:
+            response = await async_views.suggest_tasks(self.request('/api/tasks/suggest/', body))
+            invalid = await async_views.plan_tasks(self.factory.post('/api/tasks/plan/', 'x' * 2048,
+                                                                     content_type='application/json'))
+
+        self.assertEqual(get_executor.call_count, 2)
+        self.assertEqual(len(json.loads(response.content)['suggestions']), 5)
+        self.assertEqual(invalid.status_code, 400)
+
+    async def test_ndjson_streams_asynchronously(self):
+        """Test that streamed responses are served through an async iterator"""
+        body = {'tasks': make_payload_tasks(50), 'format': 'ndjson'}
+
+        response = await async_views.analyze_tasks(self.request('/api/tasks/analyze/', body))
+        lines = b''.join([chunk async for chunk in response.streaming_content]).splitlines()
+
+        self.assertTrue(response.is_async)
+        self.assertEqual(len(lines), 51)
+
+    async def test_streamed_chunks_are_produced_off_the_event_loop(self):
+        """Test that the sync chunk generator never runs on the event loop thread"""
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def chunks():
+            for chunk in (b'a', b'b', b'c'):
+                threads.append(threading.get_ident())
+                yield chunk
+
+        served = [chunk async for chunk in async_views._iterate(chunks())]
+
+        self.assertEqual(served, [b'a', b'b', b'c'])
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+
+
+class BenchmarkSuiteTestCase(TestCase):
+    """Test cases for the benchmark generator and baseline comparison"""
+
+    def test_generator_is_seeded(self):
+        """Test that the synthetic payload only depends on its parameters"""
+        from benchmarks.generator import generate_payload
+
+        first = generate_payload(200, seed=3, density='dense', spread='wide', today=date(2025, 1, 1))
+        second = generate_payload(200, seed=3, density='dense', spread='wide', today=date(2025, 1, 1))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, generate_payload(200, seed=4, density='dense', spread='wide',
+                                                    today=date(2025, 1, 1)))
+        self.assertGreater(sum(len(task['dependencies']) for task in first), 400)
+
+    def test_compare_flags_only_slow_cases(self):
+        """Test that only cases slower than the threshold count as regressions"""
+        from benchmarks.suite import compare
+
+        baseline = {'a': {'median_s': 1.0}, 'b': {'median_s': 1.0}, 'c': {'median_s': 1.0}}
+        results = {'a': {'median_s': 1.2}, 'b': {'median_s': 1.3}, 'd': {'median_s': 9.0}}
+
+        self.assertEqual([name for name, *_ in compare(results, baseline, 0.25)], ['b'])
+
+
+class RequestMetricsTestCase(TestCase):
+    """Test cases for the Server-Timing header and the metrics endpoint"""
+
+    def setUp(self):
+        get_result_cache().clear()
+        views.get_registry().clear()
+        due_date = (date.today() + timedelta(days=3)).isoformat()
+        self.body = json.dumps({'tasks': [
+            {'title': f'Task {i}', 'due_date': due_date, 'estimated_hours': 2, 'importance': 5}
+            for i in range(150)
+        ]})
+
+    def test_server_timing_lists_phases(self):
+        """Test that scoring responses report each phase and the total"""
+        response = self.client.post('/api/tasks/analyze/', self.body, content_type='application/json')
+        phases = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+
+        for phase in ('parse', 'validate', 'build', 'dependencies', 'score', 'sort', 'serialize', 'encode'):
+            self.assertIn(phase, phases)
+        self.assertEqual(phases[-1], 'total')
+
+    def test_metrics_endpoint_renders_histograms(self):
+        """Test that latency is exported by endpoint and payload size"""
+        self.client.post('/api/tasks/analyze/', self.body, content_type='application/json')
+        self.client.post('/api/tasks/suggest/', self.body, content_type='application/json')
+        self.client.post('/api/tasks/suggest/', 'not json', content_type='application/json')
+
+        response = self.client.get('/api/tasks/metrics/')
+        text = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('tasks_request_duration_seconds_count{endpoint="analyze",size="101-1000"} 1', text)
+        self.assertIn('tasks_request_duration_seconds_count{endpoint="suggest",size="101-1000"} 1', text)
+        self.assertIn('tasks_request_duration_seconds_count{endpoint="suggest",size="1-100"} 1', text)
+        self.assertIn('tasks_request_duration_seconds_bucket{endpoint="analyze",size="101-1000",le="+Inf"} 1', text)
+        self.assertIn('tasks_phase_seconds_total{endpoint="analyze",phase="score"}', text)
+        self.assertIn('tasks_result_cache_requests_total{result="miss"}', text)
+
+    def test_metrics_can_be_disabled(self):
+        """Test that disabled metrics add no header and record nothing"""
+        with override_settings(TASKS_METRICS_ENABLED=False):
+            response = self.client.post('/api/tasks/analyze/', self.body, content_type='application/json')
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertNotIn('endpoint="analyze"', self.client.get('/api/tasks/metrics/').content.decode())
+
+
+class ApiSettingsProfileTestCase(TestCase):
+    """Test cases for the API-only settings profile"""
+
+    def test_api_profile_serves_only_the_task_api(self):
+        """Test that the lean URLconf and middleware still serve the endpoints"""
+        from backend import settings_api
+
+        body = json.dumps({'tasks': [{
+            'title': 'Task', 'due_date': date.today().isoformat(), 'estimated_hours': 1, 'importance': 5
+        }]})
+        with override_settings(ROOT_URLCONF=settings_api.ROOT_URLCONF, MIDDLEWARE=settings_api.MIDDLEWARE):
+            response = self.client.post('/api/tasks/analyze/', body, content_type='application/json')
+            admin_response = self.client.get('/admin/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertEqual(admin_response.status_code, 404)
+        self.assertNotIn('django.contrib.sessions', settings_api.INSTALLED_APPS)
+
+
+class ScoreBreakdownTestCase(TestCase):
+    """Test cases for score breakdowns kept from the scoring pass"""
+
+    def assert_breakdowns_match(self, tasks):
+        for task in tasks:
+            breakdown = task.score_breakdown
+            self.assertEqual(breakdown.score, task.priority_score)
+            self.assertEqual(breakdown.days_until_due, task.days_until_due())
+            self.assertEqual(breakdown.urgency, calculate_urgency_score(task))
+
+    def test_breakdowns_match_scores(self):
+        """Test that every component agrees with the scalar scoring functions"""
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+            self.assert_breakdowns_match(score_tasks(make_random_tasks(200), explain=True))
+
+    @skipUnless(batch_scoring.is_available(), "NumPy is not installed")
+    def test_batch_breakdowns_match_scores(self):
+        """Test that the vectorized engine keeps identical components"""
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=1):
+            self.assert_breakdowns_match(score_tasks(make_random_tasks(200), explain=True))
+            tasks = make_random_tasks(200)
+            top_tasks = select_top_tasks(tasks, 5, explain=True)
+
+        self.assert_breakdowns_match(top_tasks)
+        self.assertEqual(sum(getattr(task, 'score_breakdown', None) is not None for task in tasks), 5)
+
+    def test_top_tasks_only_break_down_winners(self):
+        """Test that only the selected tasks get a breakdown"""
+        tasks = make_random_tasks(500)
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+            top_tasks = select_top_tasks(tasks, 3, explain=True)
+
+        self.assert_breakdowns_match(top_tasks)
+        self.assertEqual(sum(getattr(task, 'score_breakdown', None) is not None for task in tasks), 3)
+
+    def test_analyze_and_suggest_explain(self):
+        """Test that explain=true returns per-component contributions"""
+        today = date.today()
+        body = {'explain': True, 'tasks': [
+            {'title': 'Blocker', 'due_date': today.isoformat(), 'estimated_hours': 1, 'importance': 8},
+            {'title': 'Blocked', 'due_date': (today + timedelta(days=9)).isoformat(),
+             'estimated_hours': 30, 'importance': 3, 'dependencies': [1]},
+        ]}
+
+        analyzed = self.client.post('/api/tasks/analyze/', json.dumps(body), content_type='application/json').json()
+        suggested = self.client.post('/api/tasks/suggest/', json.dumps(body), content_type='application/json').json()
+        invalid = self.client.post('/api/tasks/analyze/', json.dumps({**body, 'explain': 'yes'}),
+                                   content_type='application/json')
+
+        top = analyzed['tasks'][0]
+        components = top['score_breakdown']['components']
+        self.assertEqual(top['score_breakdown']['blocked_count'], 1)
+        self.assertEqual(components['urgency'], {'score': 100.0, 'weight': 1.2, 'contribution': 120.0})
+        self.assertEqual(components['dependencies']['contribution'], 4.5)
+        self.assertAlmostEqual(sum(c['contribution'] for c in components.values()), top['priority_score'])
+        self.assertIn('Due TODAY', top['explanation'])
+        self.assertEqual(suggested['suggestions'][0]['score_breakdown'], top['score_breakdown'])
+        self.assertEqual(invalid.status_code, 400)
+
+
+class SnapshotPaginationTestCase(TestCase):
+    """Test cases for paged /analyze/ results served from stored snapshots"""
+
+    def setUp(self):
+        get_snapshot_store().clear()
+        today = date.today()
+        self.tasks = [
+            {'title': f'Task {i}', 'due_date': (today + timedelta(days=i)).isoformat(),
+             'estimated_hours': 1 + i % 5, 'importance': 1 + i % 10}
+            for i in range(7)
+        ]
+
+    def analyze(self, **options):
+        return self.client.post('/api/tasks/analyze/', json.dumps({'tasks': self.tasks, **options}),
+                                content_type='application/json')
+
+    def test_pages_match_full_ranking(self):
+        """Test that following cursors returns the full ranking exactly once"""
+        full = self.analyze().json()['tasks']
+        first = self.analyze(page_size=3).json()
+
+        pages = [first]
+        with mock.patch('tasks.views.score_tasks') as rescored:
+            while pages[-1]['next_cursor'] is not None:
+                pages.append(self.client.get(
+                    f"/api/tasks/snapshots/{first['snapshot_id']}/",
+                    {'cursor': pages[-1]['next_cursor'], 'page_size': 3}
+                ).json())
+
+        self.assertFalse(rescored.called)
+        self.assertEqual(first['count'], 7)
+        self.assertEqual([len(page['tasks']) for page in pages], [3, 3, 1])
+        self.assertEqual([task for page in pages for task in page['tasks']], full)
+
+    def test_invalid_requests(self):
+        """Test page size, cursor and output format validation"""
+        snapshot_id = self.analyze(page_size=3).json()['snapshot_id']
+
+        self.assertEqual(self.analyze(page_size=0).status_code, 400)
+        self.assertEqual(self.analyze(page_size=3, format='columnar').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/tasks/snapshots/{snapshot_id}/', {'cursor': '99'}).status_code, 400)
+        self.assertEqual(self.client.get(f'/api/tasks/snapshots/{snapshot_id}/', {'page_size': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(f'/api/tasks/snapshots/{worker_tag()}-unknown/').status_code, 404)
+
+    def test_snapshots_expire_and_are_evicted(self):
+        """Test the TTL and the least-recently-used memory cap"""
+        from tasks.snapshots import RECORD_BYTES
+
+        with override_settings(TASKS_SNAPSHOT_TTL_SECONDS=0):
+            expired = self.analyze(page_size=3).json()['snapshot_id']
+        self.assertEqual(self.client.get(f'/api/tasks/snapshots/{expired}/').status_code, 404)
+
+        with override_settings(TASKS_SNAPSHOT_MAX_BYTES=RECORD_BYTES * 7 * 2):
+            first = self.analyze(page_size=3).json()['snapshot_id']
+            second = self.analyze(page_size=4).json()['snapshot_id']
+            third = self.analyze(page_size=5).json()['snapshot_id']
+
+            self.assertEqual(self.client.get(f'/api/tasks/snapshots/{first}/').status_code, 404)
+            self.assertEqual(self.client.get(f'/api/tasks/snapshots/{second}/').status_code, 200)
+            self.assertEqual(self.client.get(f'/api/tasks/snapshots/{third}/').status_code, 200)
+
+
+    def test_first_page_is_cached_while_its_snapshot_lives(self):
+        """Test that a repeated paged request reuses its first page until the snapshot is gone"""
+        first = self.analyze(page_size=3)
+        repeat = self.analyze(page_size=3)
+
+        self.assertEqual(repeat['X-Cache'], 'HIT')
+        self.assertEqual(repeat.content, first.content)
+
+        get_snapshot_store().pop(first.json()['snapshot_id'])
+        rebuilt = self.analyze(page_size=3)
+        self.assertEqual(rebuilt['X-Cache'], 'MISS')
+        self.assertNotEqual(rebuilt.json()['snapshot_id'], first.json()['snapshot_id'])
+        self.assertEqual(self.client.get(f"/api/tasks/snapshots/{rebuilt.json()['snapshot_id']}/").status_code, 200)
+
+    def test_snapshots_of_other_workers_are_misdirected(self):
+        """Test that an id created by another process gets 421 rather than 404"""
+        snapshot_id = self.analyze(page_size=3).json()['snapshot_id']
+        foreign = 'ffffffff-' + snapshot_id.partition('-')[2]
+
+        page = self.client.get(f'/api/tasks/snapshots/{foreign}/')
+        delta = self.client.post(f'/api/tasks/snapshots/{foreign}/delta/', '{}', content_type='application/json')
+
+        self.assertTrue(snapshot_id.startswith(worker_tag() + '-'))
+        self.assertEqual(page.status_code, 421)
+        self.assertIn('sticky routing', page.json()['message'])
+        self.assertEqual(delta.status_code, 421)
+
+
+class SnapshotDeltaTestCase(TestCase):
+    """Test cases for incremental delta updates of stored snapshots"""
+
+    def setUp(self):
+        get_snapshot_store().clear()
+
+    def make_snapshot(self, count, seed=5):
+        tasks = [
+            TaskRecord(id=task.id, title=task.title, due_date=task.due_date, estimated_hours=task.estimated_hours,
+                       importance=task.importance, dependencies=task.dependencies)
+            for task in make_random_tasks(count, seed)
+        ]
+        snapshot = Snapshot('test', score_tasks(tasks), ScoringContext(), False, 'priority', 'direct', None)
+        deltas.prepare(snapshot)
+        return snapshot
+
+    def test_deltas_match_full_rescoring(self):
+        """Test that random deltas leave the same ranking as scoring from scratch"""
+        rng = random.Random(11)
+        snapshot = self.make_snapshot(300)
+        today = date.today()
+
+        def random_task():
+            return {
+                'title': 'New', 'due_date': (today + timedelta(days=rng.randint(0, 40))).isoformat(),
+                'estimated_hours': rng.choice([1, 4, 30]), 'importance': rng.randint(1, 10),
+                'dependencies': rng.sample(sorted(snapshot.by_id), 2)
+            }
+
+        for _ in range(25):
+            ids = rng.sample(sorted(snapshot.by_id), 3)
+            delta = {
+                'added': [random_task()],
+                'removed': [ids[0]],
+                'modified': [{'id': ids[1], **random_task()}],
+            }
+            deltas.apply_delta(snapshot, *deltas.parse_delta(snapshot, delta))
+
+            fresh = [
+                TaskRecord(id=task.id, title=task.title, due_date=task.due_date,
+                           estimated_hours=task.estimated_hours, importance=task.importance,
+                           dependencies=task.dependencies)
+                for task in sorted(snapshot.by_id.values(), key=lambda task: task.id)
+            ]
+            expected = [(task.id, task.priority_score) for task in score_tasks(fresh)]
+            self.assertEqual([(task.id, task.priority_score) for task in snapshot.tasks], expected)
+
+    def test_single_edit_only_rescores_touched_tasks(self):
+        """Test that a one-task edit re-scores the task and its blockers only"""
+        snapshot = self.make_snapshot(2000)
+        delta = {'added': [{'title': 'New', 'due_date': date.today().isoformat(), 'estimated_hours': 1,
+                            'importance': 9, 'dependencies': [1, 2]}]}
+
+        with mock.patch('tasks.deltas.calculate_priority_score', wraps=calculate_priority_score) as scored:
+            moved = deltas.apply_delta(snapshot, *deltas.parse_delta(snapshot, delta))
+
+        self.assertEqual(scored.call_count, 3)
+        self.assertEqual({entry['id'] for entry in moved}, {1, 2, 2001})
+        self.assertEqual(len(snapshot.tasks), 2001)
+
+    def test_delta_endpoint(self):
+        """Test the delta round trip through the API"""
+        today = date.today()
+        tasks = [
+            {'title': f'Task {i}', 'due_date': (today + timedelta(days=i)).isoformat(),
+             'estimated_hours': 2, 'importance': 5}
+            for i in range(5)
+        ]
+        first = self.client.post('/api/tasks/analyze/', json.dumps({'tasks': tasks, 'page_size': 2}),
+                                 content_type='application/json').json()
+        url = f"/api/tasks/snapshots/{first['snapshot_id']}/delta/"
+
+        invalid = self.client.post(url, json.dumps({'removed': [42]}), content_type='application/json')
+        response = self.client.post(url, json.dumps({
+            'removed': [1],
+            'added': [{'title': 'Urgent', 'due_date': today.isoformat(), 'estimated_hours': 1, 'importance': 10}],
+            'page_size': 2,
+        }), content_type='application/json').json()
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertNotEqual(response['snapshot_id'], first['snapshot_id'])
+        self.assertEqual(response['count'], 5)
+        self.assertEqual([task['title'] for task in response['tasks']], ['Urgent', 'Task 1'])
+        self.assertEqual(response['moved'], [
+            {'id': 6, 'title': 'Urgent', 'priority_score': response['tasks'][0]['priority_score'],
+             'from': None, 'to': 0},
+            {'id': 1, 'title': 'Task 0', 'priority_score': first['tasks'][0]['priority_score'],
+             'from': 0, 'to': None},
+        ])
+        self.assertEqual(self.client.post(url, '{}', content_type='application/json').status_code, 404)
+
+    @override_settings(TASKS_SNAPSHOT_MAX_BYTES=5 * (RECORD_BYTES + DELTA_INDEX_BYTES))
+    def test_failed_delta_keeps_the_snapshot(self):
+        """Test that a delta failing after validation leaves the snapshot stored and unchanged"""
+        today = date.today().isoformat()
+        tasks = [{'title': f'Task {i}', 'due_date': today, 'estimated_hours': i + 1, 'importance': 5}
+                 for i in range(5)]
+        first = self.client.post('/api/tasks/analyze/', json.dumps({'tasks': tasks, 'page_size': 5}),
+                                 content_type='application/json').json()
+        url = f"/api/tasks/snapshots/{first['snapshot_id']}/"
+        modified = {'modified': [{'id': 5, 'title': 'Changed', 'due_date': today,
+                                  'estimated_hours': 1, 'importance': 10}]}
+
+        with mock.patch('tasks.deltas.calculate_priority_score', side_effect=RuntimeError('boom')):
+            failed = self.client.post(url + 'delta/', json.dumps(modified), content_type='application/json')
+        too_big = self.client.post(url + 'delta/', json.dumps({'added': tasks[:1]}),
+                                   content_type='application/json')
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(too_big.status_code, 413)
+        self.assertEqual(self.client.get(url).json()['tasks'], first['tasks'])
+        response = self.client.post(url + 'delta/', json.dumps({**modified, 'page_size': 1}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['tasks'][0]['title'], 'Changed')
+
+
+TEAM_PROFILES = {
+    'deadline_heavy': {
+        'weights': {'urgency': 2.0, 'effort': 0.2},
+        'urgency_decay': 1.1,
+        'effort_buckets': [[1, 60], [4, 40], [16, 20]],
+        'dependency_points': 10,
+        'max_dependency_score': 40,
+    },
+}
+
+
+class DefaultProfileCacheTestCase(TestCase):
+    """Test cases for the compiled profiles with TASKS_SCORING_PROFILES unset"""
+
+    def test_profiles_compile_once_without_the_setting(self):
+        """Test that contexts reuse the compiled profiles when no custom ones are configured"""
+        self.assertFalse(hasattr(settings, 'TASKS_SCORING_PROFILES'))
+
+        with mock.patch('tasks.strategies.ScoringProfile', wraps=ScoringProfile) as compiled:
+            get_profile()
+            first = ScoringContext().profile
+            for _ in range(100):
+                calculate_priority_score(Task(title='T', due_date=date.today(), estimated_hours=1, importance=5))
+
+        self.assertIs(get_profile(), get_profile())
+        self.assertIs(first, get_profile())
+        self.assertLessEqual(compiled.call_count, 1)
+
+
+@override_settings(TASKS_SCORING_PROFILES=TEAM_PROFILES)
+class ScoringProfileTestCase(TestCase):
+    """Test cases for named scoring profiles compiled by tasks.strategies"""
+
+    def expected_score(self, task, dependents_index, today):
+        # The deadline_heavy formula written out by hand
+        days = (task.due_date - today).days
+        urgency = 100.0 if days <= 0 else 90.0 if days == 1 else round(100 / math.pow(1 + days, 1.1), 2)
+        hours = task.estimated_hours
+        effort = 60 if hours <= 1 else 40 if hours <= 4 else 20 if hours <= 16 else 5.0
+        dependencies = min(len(dependents_index.get(task.id, ())) * 10, 40)
+        return round(urgency * 2.0 + task.importance * 10.0 * 1.0 + effort * 0.2 + dependencies * 0.3, 2)
+
+    def test_profiles_share_the_compiled_scorer(self):
+        """Test that custom and built-in profiles run the same code with their own tables"""
+        default, custom = get_profile(), get_profile('deadline_heavy')
+
+        self.assertIs(custom.score_task.__code__, default.score_task.__code__)
+        self.assertEqual(default.urgency_table[5], calculate_urgency_score(
+            Task(due_date=date.today() + timedelta(days=5))))
+        self.assertEqual(custom.blocked_limit, 4)
+        self.assertEqual(profile_names(), ['default', 'deadline_heavy'])
+        with self.assertRaises(ValueError):
+            get_profile('missing')
+
+    def test_every_engine_scores_with_the_profile(self):
+        """Test that the scalar, top-k, batch and parallel paths agree with the profile's formula"""
+        tasks = make_random_tasks(300)
+        index = build_dependents_index(tasks)
+        context = ScoringContext(date.today(), 'deadline_heavy')
+        expected = {task.id: self.expected_score(task, index, context.today) for task in tasks}
+        ranked = sorted(tasks, key=lambda task: -expected[task.id])
+
+        with override_settings(TASKS_BATCH_SCORING_THRESHOLD=10 ** 9):
+            scalar = score_tasks(list(tasks), context)
+            self.assertEqual({t.id: t.priority_score for t in scalar}, expected)
+            self.assertEqual(select_top_tasks(list(tasks), 5, context), ranked[:5])
+        if batch_scoring.is_available():
+            with override_settings(TASKS_BATCH_SCORING_THRESHOLD=1):
+                self.assertEqual(score_tasks(list(tasks), context, explain=True), ranked)
+                self.assertEqual(select_top_tasks(list(tasks), 5, context), ranked[:5])
+        if parallel.is_available():
+            self.assertEqual(parallel.score_tasks_parallel(list(tasks), context, index, workers=2), ranked)
+
+    def test_endpoints_accept_profile_by_name(self):
+        """Test that requests pick a profile and report its weights in breakdowns"""
+        today = date.today()
+        body = {'explain': True, 'profile': 'deadline_heavy', 'tasks': [
+            {'title': 'Soon', 'due_date': (today + timedelta(days=2)).isoformat(), 'estimated_hours': 3,
+             'importance': 5},
+        ]}
+
+        analyzed = self.client.post('/api/tasks/analyze/', json.dumps(body), content_type='application/json')
+        default = self.client.post('/api/tasks/analyze/', json.dumps({**body, 'profile': None}),
+                                   content_type='application/json')
+        unknown = self.client.post('/api/tasks/suggest/', json.dumps({**body, 'profile': 'nope'}),
+                                   content_type='application/json')
+
+        task = analyzed.json()['tasks'][0]
+        self.assertEqual(task['score_breakdown']['components']['urgency']['weight'], 2.0)
+        self.assertAlmostEqual(task['priority_score'], 2 * round(100 / math.pow(3, 1.1), 2) + 50 + 8)
+        self.assertNotEqual(default.json()['tasks'][0]['priority_score'], task['priority_score'])
+        self.assertEqual(unknown.status_code, 400)
+        self.assertIn('deadline_heavy', unknown.json()['message'])
+
+    def test_invalid_profiles_are_rejected(self):
+        """Test that specs are validated when the profiles are compiled"""
+        for spec in (
+            {'weights': {'urgency': -1}},
+            {'weights': {'speed': 1}},
+            {'effort_buckets': [[8, 30], [2, 50]]},
+            {'dependency_points': 0},
+            {'decay': 0.5},
+        ):
+            with self.subTest(spec=spec), override_settings(TASKS_SCORING_PROFILES={'bad': spec}):
+                with self.assertRaises(ImproperlyConfigured):
+                    get_profile('bad')
+        with override_settings(TASKS_SCORING_PROFILES={'default': {}}):
+            with self.assertRaises(ImproperlyConfigured):
+                get_profile()
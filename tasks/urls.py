@@ -1,7 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASGI deployments serve the scoring endpoints from native async views
+if getattr(settings, 'TASKS_ASYNC_VIEWS', False):
+    from . import async_views as scoring_views
+else:
+    scoring_views = views
+
 urlpatterns = [
-    path('analyze/', views.analyze_tasks, name='analyze_tasks'),
-    path('suggest/', views.suggest_tasks, name='suggest_tasks'),
+    path('', views.task_list, name='task_list'),
+    path('<int:task_id>/', views.task_detail, name='task_detail'),
+    path('analyze/', scoring_views.analyze_tasks, name='analyze_tasks'),
+    path('suggest/', scoring_views.suggest_tasks, name='suggest_tasks'),
+    path('plan/', scoring_views.plan_tasks, name='plan_tasks'),
+    path('snapshots/<str:snapshot_id>/', views.snapshot_page, name='snapshot_page'),
+    path('snapshots/<str:snapshot_id>/delta/', views.snapshot_delta, name='snapshot_delta'),
+    path('bulk/', views.bulk_import_tasks, name='bulk_import_tasks'),
+    path('cache/', views.cache_stats, name='cache_stats'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Validation rules for incoming task items.
+
+TaskBatchValidator checks a whole task list in one pass and is shared by
+/analyze/, /suggest/ and the bulk importers, so every entry point accepts
+exactly the same tasks. Date bounds are resolved once per validator and
+due dates are parsed once per distinct string.
+"""
+import math
+from datetime import timedelta
+
+from django.utils.dateparse import parse_date
+
+REQUIRED_FIELDS = ('title', 'due_date', 'estimated_hours', 'importance')
+
+# Due dates may be at most this many days in the past
+# (Future dates are OK - they'll naturally get lower priority scores)
+MAX_PAST_DAYS = 30
+
+
+class TaskValidationError(ValueError):
+    """Raised with a user-facing message when a task item is invalid."""
+
+
+def earliest_allowed_date(today):
+    """Return the oldest due date accepted relative to today."""
+    return today - timedelta(days=MAX_PAST_DAYS)
+
+
+class TaskBatchValidator:
+    """
+    Validate task items against one reference date.
+
+    validate() checks every item and returns the normalized fields of the
+    valid ones plus a complete list of per-index errors, rather than
+    stopping at the first bad item.
+    """
+
+    def __init__(self, today):
+        self.today = today
+        self.earliest_allowed = earliest_allowed_date(today)
+        # Task lists reuse a handful of due dates; parse each string once
+        self._parsed_dates = {}
+
+    def parse_due_date(self, value):
+        """Parse a YYYY-MM-DD string, memoized per distinct value."""
+        if type(value) is str:
+            parsed = self._parsed_dates.get(value)
+            if parsed is None:
+                parsed = self._parsed_dates[value] = parse_date(value)
+            return parsed
+        return parse_date(value)
+
+    def validate_item(self, task_data, position):
+        """
+        Validate one task item and return its normalized fields.
+
+        position is the 1-based number used in error messages.
+        """
+        if type(task_data) is not dict:
+            raise TaskValidationError(f'Task {position} has invalid data: expected an object')
+        
+        # Validate required fields
+        for field in REQUIRED_FIELDS:
+            if field not in task_data:
+                raise TaskValidationError(f'Task {position} is missing required fields')
+        
+        try:
+            # Parse due_date
+            due_date = self.parse_due_date(task_data['due_date'])
+            if not due_date:
+                raise TaskValidationError(f'Task {position} has invalid due_date format. Use YYYY-MM-DD')
+            
+            # Validate date range - only check for dates too far in the past
+            if due_date < self.earliest_allowed:
+                raise TaskValidationError(
+                    f'Task {position} due_date is too far in the past (more than {MAX_PAST_DAYS} days ago). '
+                    'Please use a more recent date.'
+                )
+            
+            # Validate importance range (ints skip the conversion)
+            importance = task_data['importance']
+            if type(importance) is not int:
+                importance = int(importance)
+            if importance < 1 or importance > 10:
+                raise TaskValidationError(f'Task {position} importance must be between 1 and 10')
+            
+            # Validate estimated_hours
+            estimated_hours = task_data['estimated_hours']
+            if type(estimated_hours) is not float:
+                estimated_hours = float(estimated_hours)
+            # NaN and infinity pass the comparison and are not valid JSON
+            if not math.isfinite(estimated_hours):
+                raise TaskValidationError(f'Task {position} estimated_hours must be a finite number')
+            if estimated_hours < 0.1:
+                raise TaskValidationError(f'Task {position} estimated_hours must be at least 0.1')
+            
+        except TaskValidationError:
+            raise
+        except (ValueError, TypeError, OverflowError) as e:
+            raise TaskValidationError(f'Task {position} has invalid data: {str(e)}')
+        
+        dependencies = task_data.get('dependencies', [])
+        if type(dependencies) is not list:
+            raise TaskValidationError(f'Task {position} dependencies must be a list')
+        # Ids are matched against task ids, so null, bools and strings would
+        # either never match or all match tasks that have no id yet
+        for blocker_id in dependencies:
+            if type(blocker_id) is not int:
+                raise TaskValidationError(f'Task {position} dependencies must be integer task ids')
+        
+        return {
+            'title': task_data['title'],
+            'due_date': due_date,
+            'estimated_hours': estimated_hours,
+            'importance': importance,
+            'dependencies': dependencies
+        }
+
+    def validate(self, items):
+        """
+        Validate a list of task items in one pass.
+
+        Returns (fields, errors): the normalized fields of every item in
+        order, and a list of {'index', 'message'} dicts. fields is only
+        complete when errors is empty.
+        """
+        validate_item = self.validate_item
+        fields = []
+        errors = []
+        for index, task_data in enumerate(items):
+            try:
+                fields.append(validate_item(task_data, index + 1))
+            except TaskValidationError as e:
+                errors.append({'index': index, 'message': str(e)})
+        return fields, errors
@@ -1,135 +1,734 @@
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.dateparse import parse_date
+from functools import partial
 import json
-from datetime import datetime, date, timedelta
+import math
 
+from . import services
+from .cache import get_result_cache
+from .graph import DEPENDENCY_MODES, SCORING_BLOCKED_LIMIT, DependencyGraph
+from .metrics import PROMETHEUS_CONTENT_TYPE, PhaseTimer, get_registry, metrics_enabled
 from .models import Task
-from .scoring import calculate_priority_score, score_tasks, get_top_tasks_for_today
+from .ranking import get_ranked_index
+from .records import TaskRecord
+from .scoring import (
+    SORT_OPTIONS,
+    ScoringContext,
+    get_top_tasks_for_today,
+    order_tasks,
+    ordering_permutation,
+    score_tasks
+)
+from .serializers import (
+    iter_ndjson,
+    serialize_breakdown,
+    serialize_columnar,
+    serialize_page,
+    serialize_plan,
+    serialize_stored_task,
+    serialize_task
+)
+from .snapshots import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    get_page_size,
+    get_snapshot_store,
+    is_local_snapshot,
+    parse_page_size
+)
+from .strategies import get_profile
+from .validation import REQUIRED_FIELDS, TaskBatchValidator
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+def get_scoring_context(data):
+    # One reference date per request; clients may pin it for reproducible
+    # scores, and pick a scoring profile by name
+    profile = data.get('profile')
+    if profile is not None and not isinstance(profile, str):
+        raise ValueError('profile must be a string')
+    profile = get_profile(profile)
+    
+    reference_date = data.get('reference_date')
+    if reference_date is None:
+        return ScoringContext(profile=profile)
+    
+    parsed = parse_date(reference_date) if isinstance(reference_date, str) else None
+    if not parsed:
+        raise ValueError('reference_date must use YYYY-MM-DD format')
+    return ScoringContext(parsed, profile)
+
+
+def build_task_records(tasks_data, context, timer=None):
+    # Returns (records, None) or (None, error response)
+    timer = timer or PhaseTimer()
+    if not isinstance(tasks_data, list):
+        return None, JsonResponse({
+            'status': 'error',
+            'message': 'tasks must be a list'
+        }, status=400)
+    
+    with timer.phase('validate'):
+        fields, errors = TaskBatchValidator(context.today).validate(tasks_data)
+    if errors:
+        return None, JsonResponse({
+            'status': 'error',
+            'message': errors[0]['message'],
+            'errors': errors
+        }, status=400)
+    
+    # Lightweight records (nothing is saved to the database); positional
+    # IDs are what dependencies refer to
+    with timer.phase('build'):
+        records = [TaskRecord(id=idx + 1, **task_fields) for idx, task_fields in enumerate(fields)]
+    return records, None
+
+
+def get_dependency_mode(data):
+    # 'direct' counts immediate dependents; the graph modes weigh whole chains
+    mode = data.get('dependency_mode', 'direct')
+    if not isinstance(mode, str) or mode not in DEPENDENCY_MODES:
+        raise ValueError(f'dependency_mode must be one of: {", ".join(DEPENDENCY_MODES)}')
+    return mode
+
+
+def get_explain(data):
+    # explain=true adds per-component contributions to the returned tasks
+    explain = data.get('explain', False)
+    if not isinstance(explain, bool):
+        raise ValueError('explain must be a boolean')
+    return explain
+
+
+def analyze_dependencies(tasks, mode, blocked_limit=SCORING_BLOCKED_LIMIT):
+    # Returns (dependents index for scoring, warnings). None lets the scorer
+    # build its own direct index. Counts stop at blocked_limit, past which
+    # the scoring profile adds no more points.
+    graph = DependencyGraph(tasks)
+    dependents_index = None
+    if mode != 'direct':
+        dependents_index = graph.blocked_counts(mode, blocked_limit)
+    return dependents_index, graph.warnings()
+
+
+def handle_json_post(request, handler, endpoint):
+    # Parse the JSON body and turn failures into the endpoints' error
+    # responses. The *_response handlers are shared with tasks/async_views.py.
+    # Phases are timed into a Server-Timing header and the latency metrics.
+    timer = PhaseTimer()
+    task_count = 0
+    try:
+        with timer.phase('parse'):
+            data = json.loads(request.body)
+        if isinstance(data, dict) and isinstance(data.get('tasks'), list):
+            task_count = len(data['tasks'])
+        response = handler(request, data, timer)
+    except json.JSONDecodeError:
+        response = JsonResponse({
+            'status': 'error',
+            'message': 'Invalid JSON in request body'
+        }, status=400)
+    except Exception as e:
+        response = JsonResponse({
+            'status': 'error',
+            'message': f'Server error: {str(e)}'
+        }, status=500)
+    
+    if metrics_enabled():
+        total = timer.total()
+        response['Server-Timing'] = timer.server_timing(total)
+        get_registry().observe(endpoint, task_count, timer, total)
+    return response
+
+
+def lookup_cached_response(result_cache, endpoint, data, context, timer, is_live=None):
+    # Before validation: an identical resend is answered from its raw
+    # request hash. Returns (raw key, cached response or None); a miss is
+    # counted by lookup_validated_response
+    with timer.phase('cache'):
+        raw_key = result_cache.make_key(endpoint, data, context.today)
+        return raw_key, result_cache.get_response(raw_key, is_live, count_miss=False)
+
+
+def lookup_validated_response(result_cache, endpoint, data, tasks, context, timer, raw_key, is_live=None):
+    # After validation: requests with the same normalized tasks share one
+    # entry, and the raw key becomes an alias of it. Returns (cache key,
+    # cached response or None)
+    with timer.phase('cache'):
+        cache_key = result_cache.make_normalized_key(endpoint, data, tasks, context)
+        result_cache.add_alias(raw_key, cache_key)
+        return cache_key, result_cache.get_response(cache_key, is_live)
+
+
+def encode_response(response_data, result_cache, cache_key, timer):
+    # JSON-encode the response and keep a copy in the result cache
+    with timer.phase('encode'):
+        response = JsonResponse(response_data)
+        if result_cache is not None:
+            result_cache.store_response(cache_key, response)
+    return response
+
+
+def wants_ndjson(request, data):
+    # Opt in with {"format": "ndjson"} or an Accept: application/x-ndjson header
+    if data.get('format') == 'ndjson':
+        return True
+    return NDJSON_CONTENT_TYPE in request.headers.get('Accept', '')
+
+
+def analyze_response(request, data, timer):
+    tasks_data = data.get('tasks', [])
+    sort_by = data.get('sort_by', 'priority')
+    
+    if not tasks_data:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No tasks provided'
+        }, status=400)
+    
+    if isinstance(sort_by, list) and (not sort_by or not all(name in SORT_OPTIONS for name in sort_by)):
+        return JsonResponse({
+            'status': 'error',
+            'message': f'sort_by entries must be one of: {", ".join(SORT_OPTIONS)}'
+        }, status=400)
+    
+    try:
+        context = get_scoring_context(data)
+        dependency_mode = get_dependency_mode(data)
+        explain = get_explain(data)
+        page_size = data.get('page_size')
+        if page_size is not None:
+            page_size = get_page_size(page_size)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    
+    # A page_size keeps the ranking as a server-side snapshot and returns
+    # its first page; later pages come from snapshot_page
+    streaming = wants_ndjson(request, data)
+    snapshot_store = None
+    if page_size is not None:
+        if isinstance(sort_by, list) or streaming or data.get('format') == 'columnar':
+            return JsonResponse({
+                'status': 'error',
+                'message': 'page_size cannot be combined with several orderings, columnar or NDJSON output'
+            }, status=400)
+        snapshot_store = get_snapshot_store()
+        if snapshot_store is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Paged results are disabled on this server'
+            }, status=400)
+    
+    # Identical requests on the same day reuse the stored response bytes.
+    # A cached first page is only reused while its snapshot is still here
+    result_cache = None if streaming else get_result_cache()
+    cache_key = None
+    if result_cache is not None:
+        is_live = None if snapshot_store is None else partial(snapshot_is_stored, snapshot_store)
+        cache_key, cached_response = lookup_cached_response(result_cache, 'analyze', data, context, timer, is_live)
+        if cached_response is not None:
+            return cached_response
+    
+    # Validate everything in one pass and report every bad item
+    tasks, error_response = build_task_records(tasks_data, context, timer)
+    if error_response is not None:
+        return error_response
+    
+    if result_cache is not None:
+        cache_key, cached_response = lookup_validated_response(
+            result_cache, 'analyze', data, tasks, context, timer, cache_key, is_live
+        )
+        if cached_response is not None:
+            return cached_response
+    
+    # Score all tasks; cycles, dangling ids and self-references are
+    # reported alongside the results
+    with timer.phase('dependencies'):
+        dependents_index, dependency_warnings = analyze_dependencies(tasks, dependency_mode, context.profile.blocked_limit)
+    with timer.phase('score'):
+        scored_tasks = score_tasks(tasks, context, dependents_index, explain)
+    
+    # Apply sorting strategy. A list of strategies returns one copy of
+    # the ranked tasks plus an index permutation per ordering.
+    orderings = None
+    with timer.phase('sort'):
+        if isinstance(sort_by, list):
+            orderings = {name: ordering_permutation(scored_tasks, name) for name in sort_by}
+        else:
+            scored_tasks = order_tasks(scored_tasks, sort_by)
+    
+    if snapshot_store is not None:
+        snapshot = snapshot_store.create(scored_tasks, context, explain, sort_by, dependency_mode)
+        if snapshot is None:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Too many tasks to keep as a snapshot; request them without page_size'
+            }, status=413)
+        with timer.phase('serialize'):
+            response_data = {'status': 'success', **serialize_page(snapshot, 0, page_size)}
+            if dependency_warnings:
+                response_data['dependency_warnings'] = dependency_warnings
+        with timer.phase('encode'):
+            response = JsonResponse(response_data)
+            if result_cache is not None:
+                result_cache.store_response(cache_key, response, snapshot.expires_at, snapshot.id)
+        return response
+    
+    # Stream one task per line instead of building the whole response
+    if streaming:
+        header = {'status': 'success', 'count': len(scored_tasks)}
+        if orderings is not None:
+            header['orderings'] = orderings
+        if dependency_warnings:
+            header['dependency_warnings'] = dependency_warnings
+        return StreamingHttpResponse(
+            iter_ndjson(header, scored_tasks, context, explain=explain),
+            content_type=NDJSON_CONTENT_TYPE
+        )
+    
+    with timer.phase('serialize'):
+        if data.get('format') == 'columnar':
+            # Compact columnar layout: one array per field plus a ranked index
+            response_data = {
+                'status': 'success',
+                'count': len(scored_tasks),
+                'format': 'columnar',
+                **serialize_columnar(tasks, scored_tasks, context, orderings, explain)
+            }
+        else:
+            # Build response
+            response_tasks = [serialize_task(task, context, explain) for task in scored_tasks]
+            
+            response_data = {
+                'status': 'success',
+                'count': len(response_tasks),
+                'tasks': response_tasks
+            }
+            if orderings is not None:
+                response_data['orderings'] = orderings
+        
+        if dependency_warnings:
+            response_data['dependency_warnings'] = dependency_warnings
+    
+    return encode_response(response_data, result_cache, cache_key, timer)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def analyze_tasks(request):
+    return handle_json_post(request, analyze_response, 'analyze')
+
+
+def suggest_response(request, data, timer):
+    tasks_data = data.get('tasks', [])
+    limit = data.get('limit', 3)
+    
+    if not tasks_data:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No tasks provided'
+        }, status=400)
+    
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'limit must be a positive integer'
+        }, status=400)
+    
     try:
-        # Parse request body
-        data = json.loads(request.body)
-        tasks_data = data.get('tasks', [])
-        sort_by = data.get('sort_by', 'priority')
-        
-        if not tasks_data:
+        context = get_scoring_context(data)
+        dependency_mode = get_dependency_mode(data)
+        explain = get_explain(data)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    
+    result_cache = get_result_cache()
+    cache_key = None
+    if result_cache is not None:
+        cache_key, cached_response = lookup_cached_response(result_cache, 'suggest', data, context, timer)
+        if cached_response is not None:
+            return cached_response
+    
+    # Validate with the same rules as /analyze/
+    tasks, error_response = build_task_records(tasks_data, context, timer)
+    if error_response is not None:
+        return error_response
+    
+    if result_cache is not None:
+        cache_key, cached_response = lookup_validated_response(
+            result_cache, 'suggest', data, tasks, context, timer, cache_key
+        )
+        if cached_response is not None:
+            return cached_response
+    
+    # Get top N tasks with explanations
+    dependents_index = None
+    if dependency_mode != 'direct':
+        with timer.phase('dependencies'):
+            dependents_index = DependencyGraph(tasks).blocked_counts(dependency_mode, context.profile.blocked_limit)
+    with timer.phase('score'):
+        top_tasks = get_top_tasks_for_today(tasks, limit=limit, context=context, dependents_index=dependents_index)
+    
+    # Build response
+    with timer.phase('serialize'):
+        suggestions = []
+        for task, explanation in top_tasks:
+            suggestion = {
+                'task': {
+                    'title': task.title,
+                    'due_date': task.due_date.isoformat(),
+                    'estimated_hours': task.estimated_hours,
+                    'importance': task.importance,
+                    'priority_score': task.priority_score,
+                    'days_until_due': task.score_breakdown.days_until_due
+                },
+                'explanation': explanation
+            }
+            if explain:
+                suggestion['score_breakdown'] = serialize_breakdown(task.score_breakdown)
+            suggestions.append(suggestion)
+    
+    return encode_response({
+        'status': 'success',
+        'suggestions': suggestions
+    }, result_cache, cache_key, timer)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def suggest_tasks(request):
+    return handle_json_post(request, suggest_response, 'suggest')
+
+
+def plan_response(request, data, timer):
+    # Imported on first use; workers that never plan skip loading it
+    from . import planner
+    
+    tasks_data = data.get('tasks', [])
+    daily_hours = data.get('daily_hours', planner.DEFAULT_DAILY_HOURS)
+    horizon_days = data.get('horizon_days', planner.DEFAULT_HORIZON_DAYS)
+    
+    if not tasks_data:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No tasks provided'
+        }, status=400)
+    
+    if isinstance(daily_hours, bool) or not isinstance(daily_hours, (int, float)) or not 0 < daily_hours <= 24:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'daily_hours must be a number between 0 and 24'
+        }, status=400)
+    
+    if (isinstance(horizon_days, bool) or not isinstance(horizon_days, int)
+            or not 1 <= horizon_days <= planner.MAX_HORIZON_DAYS):
+        return JsonResponse({
+            'status': 'error',
+            'message': f'horizon_days must be an integer between 1 and {planner.MAX_HORIZON_DAYS}'
+        }, status=400)
+    
+    try:
+        context = get_scoring_context(data)
+        dependency_mode = get_dependency_mode(data)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    
+    result_cache = get_result_cache()
+    cache_key = None
+    if result_cache is not None:
+        cache_key, cached_response = lookup_cached_response(result_cache, 'plan', data, context, timer)
+        if cached_response is not None:
+            return cached_response
+    
+    # Validate with the same rules as /analyze/
+    tasks, error_response = build_task_records(tasks_data, context, timer)
+    if error_response is not None:
+        return error_response
+    
+    if result_cache is not None:
+        cache_key, cached_response = lookup_validated_response(
+            result_cache, 'plan', data, tasks, context, timer, cache_key
+        )
+        if cached_response is not None:
+            return cached_response
+    
+    # Pack the ranked tasks into days, blockers first
+    with timer.phase('dependencies'):
+        dependents_index, dependency_warnings = analyze_dependencies(tasks, dependency_mode, context.profile.blocked_limit)
+    with timer.phase('plan'):
+        plan = planner.plan_tasks(tasks, daily_hours, horizon_days, context, dependents_index)
+    
+    with timer.phase('serialize'):
+        response_data = {
+            'status': 'success',
+            'start_date': context.today.isoformat(),
+            'daily_hours': daily_hours,
+            'horizon_days': horizon_days,
+            **serialize_plan(plan, context)
+        }
+        if dependency_warnings:
+            response_data['dependency_warnings'] = dependency_warnings
+    
+    return encode_response(response_data, result_cache, cache_key, timer)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def plan_tasks(request):
+    return handle_json_post(request, plan_response, 'plan')
+
+
+def snapshot_is_stored(snapshot_store, snapshot_id):
+    return snapshot_store.get(snapshot_id) is not None
+
+
+def missing_snapshot_response(snapshot_id):
+    # Snapshots are per process: an id made by another worker means the
+    # request was routed to the wrong one, not that the snapshot expired
+    if not is_local_snapshot(snapshot_id):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Snapshot belongs to another server process; paged requests need sticky routing'
+        }, status=421)
+    return JsonResponse({
+        'status': 'error',
+        'message': 'Snapshot not found or expired'
+    }, status=404)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def snapshot_page(request, snapshot_id):
+    # Later pages of a paged /analyze/ response, sliced from the stored
+    # ranking without rescoring
+    snapshot_store = get_snapshot_store()
+    snapshot = snapshot_store.get(snapshot_id) if snapshot_store is not None else None
+    if snapshot is None:
+        return missing_snapshot_response(snapshot_id)
+    
+    try:
+        page_size = parse_page_size(request.GET.get('page_size', str(DEFAULT_PAGE_SIZE)))
+        offset = decode_cursor(request.GET.get('cursor'), snapshot)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        **serialize_page(snapshot, offset, page_size)
+    })
+
+
+def delta_response(request, data, timer, snapshot_id):
+    # Imported on first use, like the planner and the importer
+    from . import deltas
+    
+    page_size = data.get('page_size')
+    if page_size is not None:
+        try:
+            page_size = get_page_size(page_size)
+        except ValueError as e:
             return JsonResponse({
                 'status': 'error',
-                'message': 'No tasks provided'
+                'message': str(e)
             }, status=400)
-        
-        # Create temporary Task objects (not saved to database)
-        tasks = []
-        for idx, task_data in enumerate(tasks_data):
+    
+    # Taking the snapshot out of the store makes concurrent deltas on it
+    # fail with 404 instead of interleaving
+    snapshot_store = get_snapshot_store()
+    snapshot = snapshot_store.take(snapshot_id) if snapshot_store is not None else None
+    if snapshot is None:
+        return missing_snapshot_response(snapshot_id)
+    
+    # Any failure before the updated ranking is stored puts the snapshot
+    # back: apply_delta changes nothing unless it succeeds
+    stored = False
+    try:
+        with timer.phase('validate'):
             try:
-                # Validate required fields
-                if not all(k in task_data for k in ['title', 'due_date', 'estimated_hours', 'importance']):
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Task {idx + 1} is missing required fields'
-                    }, status=400)
-                
-                # Parse due_date
-                due_date = parse_date(task_data['due_date'])
-                if not due_date:
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Task {idx + 1} has invalid due_date format. Use YYYY-MM-DD'
-                    }, status=400)
-                
-                # Validate date range - only check for dates too far in the past
-                # (Future dates are OK - they'll naturally get lower priority scores)
-                today = date.today()
-                max_past_days = 30  # Allow up to 30 days in the past
-                
-                earliest_allowed = today - timedelta(days=max_past_days)
-                
-                if due_date < earliest_allowed:
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Task {idx + 1} due_date is too far in the past (more than {max_past_days} days ago). Please use a more recent date.'
-                    }, status=400)
-                
-                # Validate importance range
-                importance = int(task_data['importance'])
-                if importance < 1 or importance > 10:
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Task {idx + 1} importance must be between 1 and 10'
-                    }, status=400)
-                
-                # Validate estimated_hours
-                estimated_hours = float(task_data['estimated_hours'])
-                if estimated_hours < 0.1:
-                    return JsonResponse({
-                        'status': 'error',
-                        'message': f'Task {idx + 1} estimated_hours must be at least 0.1'
-                    }, status=400)
-                
-                # Create task object
-                task = Task(
-                    id=idx + 1,  # Temporary ID for dependency tracking
-                    title=task_data['title'],
-                    due_date=due_date,
-                    estimated_hours=estimated_hours,
-                    importance=importance,
-                    dependencies=task_data.get('dependencies', [])
-                )
-                tasks.append(task)
-                
-            except (ValueError, TypeError) as e:
-                return JsonResponse({
+                deltas.prepare(snapshot)
+                added, removed, modified = deltas.parse_delta(snapshot, data)
+            except deltas.DeltaError as e:
+                response_data = {
                     'status': 'error',
-                    'message': f'Task {idx + 1} has invalid data: {str(e)}'
-                }, status=400)
+                    'message': str(e)
+                }
+                if e.errors:
+                    response_data['errors'] = e.errors
+                return JsonResponse(response_data, status=400)
+        
+        if snapshot.estimated_size(len(snapshot.tasks) + len(added) - len(removed)) > snapshot_store.max_bytes:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Too many tasks to keep as a snapshot; request them without page_size'
+            }, status=413)
         
-        # Score all tasks
-        scored_tasks = score_tasks(tasks)
+        # Re-score only the changed tasks and the blockers they touch
+        with timer.phase('score'):
+            moved = deltas.apply_delta(snapshot, added, removed, modified)
         
-        # Apply sorting strategy
-        if sort_by == 'deadline' or sort_by == 'due_date':
-            # Deadline Driven: Sort by due date (earliest first)
-            scored_tasks.sort(key=lambda t: t.due_date)
-        elif sort_by == 'fastest_wins':
-            # Fastest Wins: Sort by estimated hours (quickest first)
-            scored_tasks.sort(key=lambda t: t.estimated_hours)
-        elif sort_by == 'importance':
-            # Importance First: Sort by importance level (highest first)
-            scored_tasks.sort(key=lambda t: t.importance, reverse=True)
-        # else: 'priority' - already sorted by priority score from score_tasks()
+        # The updated ranking gets a new id; cursors of the old one are void.
+        # Its size was checked above, so the store accepts it
+        snapshot_store.store(snapshot)
+        stored = True
+    finally:
+        if not stored:
+            snapshot_store.restore(snapshot)
+    
+    with timer.phase('serialize'):
+        if page_size is not None:
+            response_data = {'status': 'success', **serialize_page(snapshot, 0, page_size)}
+        else:
+            response_data = {
+                'status': 'success',
+                'snapshot_id': snapshot.id,
+                'expires_at': snapshot.expires_at.isoformat(),
+                'count': len(snapshot.tasks)
+            }
+        response_data['moved'] = moved
+    
+    return encode_response(response_data, None, None, timer)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def snapshot_delta(request, snapshot_id):
+    return handle_json_post(request, partial(delta_response, snapshot_id=snapshot_id), 'delta')
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics(request):
+    # Prometheus scrape target: latency histograms, phase totals and the
+    # result cache counters
+    result_cache = get_result_cache()
+    return HttpResponse(
+        get_registry().render(result_cache.stats() if result_cache is not None else None),
+        content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def cache_stats(request):
+    result_cache = get_result_cache()
+    return JsonResponse({
+        'status': 'success',
+        'enabled': result_cache is not None,
+        'stats': result_cache.stats() if result_cache is not None else None
+    })
+
+
+def apply_task_fields(task, data, partial=False):
+    # Copy request fields onto a persisted Task and run the model validators
+    if not partial:
+        missing = [field for field in REQUIRED_FIELDS if field not in data]
+        if missing:
+            raise ValidationError({field: 'This field is required.' for field in missing})
+    
+    try:
+        if 'title' in data:
+            task.title = data['title']
+        if 'due_date' in data:
+            due_date = parse_date(data['due_date'])
+            if not due_date:
+                raise ValidationError({'due_date': 'Invalid due_date format. Use YYYY-MM-DD'})
+            task.due_date = due_date
+        if 'estimated_hours' in data:
+            task.estimated_hours = float(data['estimated_hours'])
+            if not math.isfinite(task.estimated_hours):
+                raise ValidationError({'estimated_hours': 'estimated_hours must be a finite number'})
+        if 'importance' in data:
+            task.importance = int(data['importance'])
+        if 'dependencies' in data:
+            dependencies = data['dependencies']
+            if not isinstance(dependencies, list) or not all(
+                    isinstance(d, int) and not isinstance(d, bool) for d in dependencies):
+                raise ValidationError({'dependencies': 'dependencies must be a list of task IDs'})
+            task.dependencies = dependencies
+    except (ValueError, TypeError, OverflowError) as e:
+        raise ValidationError(f'Invalid task data: {str(e)}')
+    
+    task.full_clean(exclude=['priority_score'])
+    return task
+
+
+def validation_error_response(error):
+    messages = error.message_dict if hasattr(error, 'error_dict') else {'__all__': error.messages}
+    first_field, first_messages = next(iter(messages.items()))
+    return JsonResponse({
+        'status': 'error',
+        'message': first_messages[0] if first_field == '__all__' else f'{first_field}: {first_messages[0]}',
+        'errors': messages
+    }, status=400)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def task_list(request):
+    try:
+        context = ScoringContext()
         
-        # Build response
-        response_tasks = []
-        for task in scored_tasks:
-            response_tasks.append({
-                'title': task.title,
-                'due_date': task.due_date.isoformat(),
-                'estimated_hours': task.estimated_hours,
-                'importance': task.importance,
-                'dependencies': task.dependencies,
-                'priority_score': task.priority_score,
-                'days_until_due': task.days_until_due(),
-                'is_overdue': task.is_overdue(),
-                'recommendation': "💡 Tip: This is a large task. Consider breaking it down into smaller sub-tasks (e.g., 4-8 hours each) to improve flow." if task.estimated_hours > 24 else None
+        if request.method == 'GET':
+            limit = request.GET.get('limit')
+            if limit is not None:
+                try:
+                    limit = int(limit)
+                    if limit < 1:
+                        raise ValueError
+                except ValueError:
+                    return JsonResponse({
+                        'status': 'error',
+                        'message': 'limit must be a positive integer'
+                    }, status=400)
+            
+            # Stored scores are kept current on every write, so the ranked
+            # backlog comes from the in-memory index, or an ordered read
+            # when the index is disabled or the table too large for it
+            ranked_index = get_ranked_index()
+            tasks = ranked_index.top(limit) if ranked_index is not None else None
+            if tasks is None:
+                tasks = Task.objects.all()[:limit] if limit is not None else Task.objects.all()
+            
+            response_tasks = [serialize_stored_task(task, context) for task in tasks]
+            return JsonResponse({
+                'status': 'success',
+                'count': len(response_tasks),
+                'tasks': response_tasks
             })
         
+        data = json.loads(request.body)
+        task = apply_task_fields(Task(), data)
+        services.create_task(task, context)
+        
         return JsonResponse({
             'status': 'success',
-            'count': len(response_tasks),
-            'tasks': response_tasks
-        })
+            'task': serialize_stored_task(task, context)
+        }, status=201)
         
     except json.JSONDecodeError:
         return JsonResponse({
             'status': 'error',
             'message': 'Invalid JSON in request body'
         }, status=400)
+    except ValidationError as e:
+        return validation_error_response(e)
     except Exception as e:
         return JsonResponse({
             'status': 'error',
@@ -138,62 +737,40 @@ def analyze_tasks(request):
 
 
 @csrf_exempt
-@require_http_methods(["POST"])
-def suggest_tasks(request):
+@require_http_methods(["GET", "PUT", "PATCH", "DELETE"])
+def task_detail(request, task_id):
     try:
-        # Parse request body
-        data = json.loads(request.body)
-        tasks_data = data.get('tasks', [])
+        context = ScoringContext()
         
-        if not tasks_data:
+        try:
+            task = Task.objects.get(id=task_id)
+        except Task.DoesNotExist:
             return JsonResponse({
                 'status': 'error',
-                'message': 'No tasks provided'
-            }, status=400)
+                'message': f'Task {task_id} not found'
+            }, status=404)
         
-        # Create temporary Task objects
-        tasks = []
-        for idx, task_data in enumerate(tasks_data):
-            try:
-                due_date = parse_date(task_data['due_date'])
-                
-                task = Task(
-                    id=idx + 1,
-                    title=task_data['title'],
-                    due_date=due_date,
-                    estimated_hours=float(task_data['estimated_hours']),
-                    importance=int(task_data['importance']),
-                    dependencies=task_data.get('dependencies', [])
-                )
-                tasks.append(task)
-                
-            except (ValueError, TypeError, KeyError) as e:
-                return JsonResponse({
-                    'status': 'error',
-                    'message': f'Task {idx + 1} has invalid data: {str(e)}'
-                }, status=400)
+        if request.method == 'GET':
+            ranked_index = get_ranked_index()
+            rank = ranked_index.rank_of(task.id) if ranked_index is not None else None
+            return JsonResponse({
+                'status': 'success',
+                'task': serialize_stored_task(task, context),
+                'rank': rank + 1 if rank is not None else None
+            })
         
-        # Get top 3 tasks with explanations
-        top_tasks = get_top_tasks_for_today(tasks, limit=3)
+        if request.method == 'DELETE':
+            services.delete_task(task, context)
+            return JsonResponse({'status': 'success'})
         
-        # Build response
-        suggestions = []
-        for task, explanation in top_tasks:
-            suggestions.append({
-                'task': {
-                    'title': task.title,
-                    'due_date': task.due_date.isoformat(),
-                    'estimated_hours': task.estimated_hours,
-                    'importance': task.importance,
-                    'priority_score': task.priority_score,
-                    'days_until_due': task.days_until_due()
-                },
-                'explanation': explanation
-            })
+        data = json.loads(request.body)
+        previous_blocker_ids = services.blocker_ids_for(task)
+        apply_task_fields(task, data, partial=request.method == 'PATCH')
+        services.update_task(task, previous_blocker_ids, context)
         
         return JsonResponse({
             'status': 'success',
-            'suggestions': suggestions
+            'task': serialize_stored_task(task, context)
         })
         
     except json.JSONDecodeError:
@@ -201,8 +778,44 @@ def suggest_tasks(request):
             'status': 'error',
             'message': 'Invalid JSON in request body'
         }, status=400)
+    except ValidationError as e:
+        return validation_error_response(e)
     except Exception as e:
         return JsonResponse({
             'status': 'error',
             'message': f'Server error: {str(e)}'
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def bulk_import_tasks(request):
+    # JSONL bodies (Content-Type: application/x-ndjson) are read line by line;
+    # JSON bodies may be an array or an {"tasks": [...]} object
+    from .importer import import_tasks, iter_items
+    
+    file_format = 'jsonl' if request.content_type == NDJSON_CONTENT_TYPE else 'json'
+    try:
+        result = import_tasks(iter_items(request, file_format))
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    except IntegrityError as e:
+        # Ids are checked before each batch, but a row written concurrently
+        # can still collide; earlier batches stay committed
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Import stopped by a conflicting row, earlier batches were kept: {e}'
+        }, status=409)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Server error: {str(e)}'
+        }, status=500)
+    
+    return JsonResponse({
+        'status': 'success',
+        **result.as_dict()
+    }, status=201)